@@ -0,0 +1,124 @@
+"""Add SHA-256 content digests to skill versions and files
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+skill_files = sa.table(
+    "skill_files",
+    sa.column("id", sa.Uuid()),
+    sa.column("skill_version_id", sa.Uuid()),
+    sa.column("path", sa.String()),
+    sa.column("content", sa.Text()),
+    sa.column("content_digest", sa.String()),
+)
+
+skill_versions = sa.table(
+    "skill_versions",
+    sa.column("id", sa.Uuid()),
+    sa.column("content", sa.Text()),
+    sa.column("content_digest", sa.String()),
+    sa.column("digest", sa.String()),
+)
+
+
+# Frozen copies of app.utils.digest so this migration never changes behaviour.
+def _sha256_hex(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _version_digest(content_digest: str, file_digests: dict[str, str]) -> str:
+    h = hashlib.sha256()
+    h.update(b"SKILL.md\0" + content_digest.encode() + b"\n")
+    for path in sorted(file_digests):
+        h.update(path.encode() + b"\0" + file_digests[path].encode() + b"\n")
+    return h.hexdigest()
+
+
+def _backfill_files(bind) -> None:
+    stmt = (
+        skill_files.update()
+        .where(skill_files.c.id == sa.bindparam("_id"))
+        .values(content_digest=sa.bindparam("_digest"))
+    )
+    while True:
+        rows = bind.execute(
+            sa.select(skill_files.c.id, skill_files.c.content)
+            .where(skill_files.c.content_digest.is_(None))
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(stmt, [{"_id": row.id, "_digest": _sha256_hex(row.content)} for row in rows])
+
+
+def _backfill_versions(bind) -> None:
+    stmt = (
+        skill_versions.update()
+        .where(skill_versions.c.id == sa.bindparam("_id"))
+        .values(content_digest=sa.bindparam("_content_digest"), digest=sa.bindparam("_digest"))
+    )
+    while True:
+        rows = bind.execute(
+            sa.select(skill_versions.c.id, skill_versions.c.content)
+            .where(skill_versions.c.digest.is_(None))
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        files_by_version: dict = {row.id: {} for row in rows}
+        file_rows = bind.execute(
+            sa.select(skill_files.c.skill_version_id, skill_files.c.path, skill_files.c.content_digest)
+            .where(skill_files.c.skill_version_id.in_(list(files_by_version)))
+        ).all()
+        for f in file_rows:
+            files_by_version[f.skill_version_id][f.path] = f.content_digest
+        params = []
+        for row in rows:
+            content_digest = _sha256_hex(row.content)
+            params.append({
+                "_id": row.id,
+                "_content_digest": content_digest,
+                "_digest": _version_digest(content_digest, files_by_version[row.id]),
+            })
+        bind.execute(stmt, params)
+
+
+def upgrade() -> None:
+    op.add_column("skill_files", sa.Column("content_digest", sa.String(64), nullable=True))
+    op.add_column("skill_versions", sa.Column("content_digest", sa.String(64), nullable=True))
+    op.add_column("skill_versions", sa.Column("digest", sa.String(64), nullable=True))
+
+    bind = op.get_bind()
+    _backfill_files(bind)
+    _backfill_versions(bind)
+
+    op.alter_column("skill_files", "content_digest", nullable=False)
+    op.alter_column("skill_versions", "content_digest", nullable=False)
+    op.alter_column("skill_versions", "digest", nullable=False)
+    op.create_index("ix_skill_files_content_digest", "skill_files", ["content_digest"])
+    op.create_index("ix_skill_versions_content_digest", "skill_versions", ["content_digest"])
+    op.create_index("ix_skill_versions_digest", "skill_versions", ["digest"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_skill_versions_digest", table_name="skill_versions")
+    op.drop_index("ix_skill_versions_content_digest", table_name="skill_versions")
+    op.drop_index("ix_skill_files_content_digest", table_name="skill_files")
+    op.drop_column("skill_versions", "digest")
+    op.drop_column("skill_versions", "content_digest")
+    op.drop_column("skill_files", "content_digest")
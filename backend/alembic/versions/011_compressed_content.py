@@ -0,0 +1,95 @@
+"""Store SKILL.md and attached file content as tagged, compressed bytes
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18
+"""
+import gzip
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 200
+MIN_BYTES = 1024
+
+# Frozen copy of the app.utils.compression storage format: <tag byte><payload>.
+RAW = b"\x00"
+GZIP = b"\x01"
+
+TABLES = ("skill_versions", "skill_files")
+
+
+def _table(name: str):
+    return sa.table(name, sa.column("id", sa.Uuid()), sa.column("content", sa.LargeBinary()))
+
+
+def _rewrite(bind, name: str, transform, where) -> None:
+    """Walk the table in id order, rewriting content in batches."""
+    table = _table(name)
+    stmt = table.update().where(table.c.id == sa.bindparam("_id")).values(content=sa.bindparam("_content"))
+    last_id = None
+    while True:
+        query = sa.select(table.c.id, table.c.content).where(where(table)).order_by(table.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+        rows = bind.execute(query).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        params = []
+        for row in rows:
+            new = transform(bytes(row.content))
+            if new is not None:
+                params.append({"_id": row.id, "_content": new})
+        if params:
+            bind.execute(stmt, params)
+
+
+def _compress(stored: bytes) -> bytes | None:
+    raw = stored[1:]
+    packed = GZIP + gzip.compress(raw, compresslevel=6, mtime=0)
+    return packed if len(packed) < len(stored) else None
+
+
+def _decompress(stored: bytes) -> bytes:
+    if stored[:1] == GZIP:
+        return RAW + gzip.decompress(stored[1:])
+    import zstandard  # rows written with CONTENT_COMPRESSION=zstd
+
+    return RAW + zstandard.ZstdDecompressor().decompress(stored[1:])
+
+
+def upgrade() -> None:
+    for name in TABLES:
+        op.alter_column(
+            name, "content",
+            type_=sa.LargeBinary(),
+            postgresql_using="'\\x00'::bytea || convert_to(content, 'UTF8')",
+        )
+
+    bind = op.get_bind()
+    for name in TABLES:
+        _rewrite(
+            bind, name, _compress,
+            lambda t: sa.and_(sa.func.length(t.c.content) > MIN_BYTES, sa.func.substr(t.c.content, 1, 1) == RAW),
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for name in TABLES:
+        _rewrite(bind, name, _decompress, lambda t: sa.func.substr(t.c.content, 1, 1) != RAW)
+
+    for name in TABLES:
+        op.alter_column(
+            name, "content",
+            type_=sa.Text(),
+            postgresql_using="convert_from(substring(content from 2), 'UTF8')",
+        )
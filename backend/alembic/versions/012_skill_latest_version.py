@@ -0,0 +1,45 @@
+"""Add skills.latest_version_id pointer to the newest version
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("skills", sa.Column("latest_version_id", sa.Uuid(), nullable=True))
+    op.create_foreign_key(
+        "fk_skills_latest_version_id", "skills", "skill_versions",
+        ["latest_version_id"], ["id"], ondelete="SET NULL",
+    )
+
+    skills = sa.table("skills", sa.column("id", sa.Uuid()), sa.column("latest_version_id", sa.Uuid()))
+    versions = sa.table(
+        "skill_versions",
+        sa.column("id", sa.Uuid()),
+        sa.column("skill_id", sa.Uuid()),
+        sa.column("created_at", sa.DateTime(timezone=True)),
+    )
+    latest = (
+        sa.select(versions.c.id)
+        .where(versions.c.skill_id == skills.c.id)
+        .order_by(versions.c.created_at.desc(), versions.c.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    op.execute(skills.update().values(latest_version_id=latest))
+
+
+def downgrade() -> None:
+    op.drop_constraint("fk_skills_latest_version_id", "skills", type_="foreignkey")
+    op.drop_column("skills", "latest_version_id")
@@ -0,0 +1,39 @@
+"""Add skill_change_events table for the plugin SSE change feed
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "skill_change_events",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column("event_type", sa.String(30), nullable=False),
+        sa.Column("skill_id", sa.Uuid(), nullable=True),
+        sa.Column("skill_name", sa.String(100), nullable=True),
+        sa.Column("user_id", sa.Uuid(), nullable=True),
+        sa.Column("version", sa.String(50), nullable=True),
+        sa.Column("digest", sa.String(64), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_skill_change_events_skill_id_id", "skill_change_events", ["skill_id", "id"])
+    op.create_index("ix_skill_change_events_user_id_id", "skill_change_events", ["user_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_skill_change_events_user_id_id", table_name="skill_change_events")
+    op.drop_index("ix_skill_change_events_skill_id_id", table_name="skill_change_events")
+    op.drop_table("skill_change_events")
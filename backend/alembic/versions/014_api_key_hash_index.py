@@ -0,0 +1,25 @@
+"""Add a unique index on api_keys.key_hash
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # New keys embed their id and are looked up by primary key; legacy keys are still found by hash.
+    op.create_index("ix_api_keys_key_hash", "api_keys", ["key_hash"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_api_keys_key_hash", table_name="api_keys")
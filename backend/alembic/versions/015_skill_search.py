@@ -0,0 +1,121 @@
+"""Add a weighted full-text search document for skills
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-18
+"""
+import gzip
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 200
+BODY_MAX_CHARS = 256 * 1024
+
+# Frozen copy of the app.utils.compression storage format: <tag byte><payload>.
+RAW = 0x00
+GZIP = 0x01
+
+# Frozen copy of app.services.skill_search's document weights.
+PG_VECTOR = """
+    setweight(to_tsvector('simple'::regconfig, :name), 'A') ||
+    setweight(to_tsvector('simple'::regconfig, :display_name), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, :tags), 'C') ||
+    setweight(to_tsvector('simple'::regconfig, :description), 'D') ||
+    setweight(to_tsvector('simple'::regconfig, :body), 'D')
+"""
+
+
+def _decompress(stored: bytes | None) -> str:
+    if not stored:
+        return ""
+    tag, payload = stored[0], stored[1:]
+    if tag == RAW:
+        return payload.decode()
+    if tag == GZIP:
+        return gzip.decompress(payload).decode()
+    import zstandard  # rows written with CONTENT_COMPRESSION=zstd
+
+    return zstandard.ZstdDecompressor().decompress(payload).decode()
+
+
+def _documents(bind):
+    """Yield the search document of every skill, in id order and in batches."""
+    skills = sa.table(
+        "skills",
+        sa.column("id", sa.Uuid()),
+        sa.column("name", sa.String()),
+        sa.column("display_name", sa.String()),
+        sa.column("tags", sa.JSON()),
+        sa.column("description", sa.Text()),
+        sa.column("latest_version_id", sa.Uuid()),
+    )
+    versions = sa.table("skill_versions", sa.column("id", sa.Uuid()), sa.column("content", sa.LargeBinary()))
+    last_id = None
+    while True:
+        query = (
+            sa.select(skills, versions.c.content)
+            .select_from(skills.outerjoin(versions, versions.c.id == skills.c.latest_version_id))
+            .order_by(skills.c.id)
+            .limit(BATCH_SIZE)
+        )
+        if last_id is not None:
+            query = query.where(skills.c.id > last_id)
+        rows = bind.execute(query).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        docs = []
+        for row in rows:
+            tags = row.tags if isinstance(row.tags, list) else json.loads(row.tags or "[]")
+            docs.append({
+                "id": row.id,
+                "name": row.name.replace("-", " "),
+                "display_name": row.display_name or "",
+                "tags": " ".join(tags),
+                "description": row.description or "",
+                "body": _decompress(row.content)[:BODY_MAX_CHARS],
+            })
+        yield docs
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    is_postgres = bind.dialect.name == "postgresql"
+    op.add_column("skills", sa.Column("search_vector", postgresql.TSVECTOR() if is_postgres else sa.Text(), nullable=True))
+
+    if is_postgres:
+        update = sa.text(f"UPDATE skills SET search_vector = {PG_VECTOR} WHERE id = :id")
+        for docs in _documents(bind):
+            bind.execute(update, docs)
+        op.create_index("ix_skills_search_vector", "skills", ["search_vector"], postgresql_using="gin")
+        return
+
+    # SQLite has no tsvector: search goes through an FTS5 table and the column stays empty.
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS skills_fts USING fts5("
+        "skill_id UNINDEXED, name, display_name, tags, description, body, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    insert = sa.text(
+        "INSERT INTO skills_fts (skill_id, name, display_name, tags, description, body) "
+        "VALUES (:skill_id, :name, :display_name, :tags, :description, :body)"
+    )
+    for docs in _documents(bind):
+        bind.execute(insert, [{"skill_id": doc.pop("id").hex, **doc} for doc in docs])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_skills_search_vector", table_name="skills")
+    else:
+        op.execute("DROP TABLE IF EXISTS skills_fts")
+    op.drop_column("skills", "search_vector")
@@ -0,0 +1,25 @@
+"""Add a composite (updated_at, id) index for keyset pagination of skills
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GET /api/skills orders by (updated_at DESC, id DESC) and seeks past the cursor row.
+    op.create_index("ix_skills_updated_at_id", "skills", ["updated_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_skills_updated_at_id", table_name="skills")
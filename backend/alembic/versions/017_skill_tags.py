@@ -0,0 +1,54 @@
+"""Normalize skill tags into an indexed skill_tags table
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-18
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "017"
+down_revision: Union[str, None] = "016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    skill_tags = op.create_table(
+        "skill_tags",
+        sa.Column("skill_id", sa.Uuid(), sa.ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("tag", sa.String(255), primary_key=True),
+    )
+    # Tag filters look up skills by tag; facet counts group by it.
+    op.create_index("ix_skill_tags_tag_skill_id", "skill_tags", ["tag", "skill_id"])
+
+    # skills.tags (JSON) stays as the ordered display copy; copy it over in id order.
+    bind = op.get_bind()
+    skills = sa.table("skills", sa.column("id", sa.Uuid()), sa.column("tags", sa.JSON()))
+    last_id = None
+    while True:
+        query = sa.select(skills.c.id, skills.c.tags).order_by(skills.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(skills.c.id > last_id)
+        rows = bind.execute(query).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        values = []
+        for row in rows:
+            tags = row.tags if isinstance(row.tags, list) else json.loads(row.tags or "[]")
+            values.extend({"skill_id": row.id, "tag": tag} for tag in dict.fromkeys(tags))
+        if values:
+            bind.execute(skill_tags.insert(), values)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_skill_tags_tag_skill_id", table_name="skill_tags")
+    op.drop_table("skill_tags")
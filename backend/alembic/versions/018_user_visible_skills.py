@@ -0,0 +1,47 @@
+"""Add the user_visible_skills index of team-granted skill access
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "018"
+down_revision: Union[str, None] = "017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.services.visible_skills.team_grants().
+BACKFILL = """
+    INSERT INTO user_visible_skills (user_id, skill_id)
+    SELECT tm.user_id, svt.skill_id
+    FROM team_members tm
+    JOIN skill_visibility_teams svt ON svt.team_id = tm.team_id
+    JOIN skills s ON s.id = svt.skill_id
+    UNION
+    SELECT tm.user_id, s.id
+    FROM team_members tm
+    JOIN skills s ON s.team_id = tm.team_id
+    WHERE NOT EXISTS (SELECT 1 FROM skill_visibility_teams svt WHERE svt.skill_id = s.id)
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_visible_skills",
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("skill_id", sa.Uuid(), sa.ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True),
+    )
+    # Skill-side refreshes delete by skill_id; reads use the (user_id, skill_id) primary key.
+    op.create_index("ix_user_visible_skills_skill_id", "user_visible_skills", ["skill_id"])
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_visible_skills_skill_id", table_name="user_visible_skills")
+    op.drop_table("user_visible_skills")
@@ -5,10 +5,12 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.crypto import encrypt_api_key, decrypt_api_key
-from app.core.security import generate_api_key, get_current_user
+from app.core.principal import Principal
+from app.core.security import generate_api_key, get_current_principal, get_current_user
 from app.database import get_db
 from app.models.api_key import ApiKey
 from app.models.user import User
+from app.services.principal_cache import principal_cache
 from app.schemas.skill import (
     ApiKeyCreate,
     ApiKeyCreatedResponse,
@@ -26,9 +28,11 @@ async def create_api_key(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    raw_key, key_hash = generate_api_key()
+    key_id = uuid.uuid4()
+    raw_key, key_hash = generate_api_key(key_id)
 
     api_key = ApiKey(
+        id=key_id,
         user_id=user.id,
         key_hash=key_hash,
         key_encrypted=encrypt_api_key(raw_key),
@@ -54,7 +58,7 @@ async def create_api_key(
 @router.get("", response_model=list[ApiKeyResponse])
 async def list_api_keys(
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     result = await db.execute(
         select(ApiKey).where(ApiKey.user_id == user.id).order_by(ApiKey.created_at.desc())
@@ -66,7 +70,7 @@ async def list_api_keys(
 async def get_api_key_detail(
     key_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     result = await db.execute(select(ApiKey).where(ApiKey.id == key_id, ApiKey.user_id == user.id))
     api_key = result.scalar_one_or_none()
@@ -109,6 +113,7 @@ async def update_api_key(
         api_key.allowed_tags = data.allowed_tags
 
     await db.commit()
+    principal_cache.invalidate_key(api_key.id)
     await db.refresh(api_key)
     return api_key
 
@@ -125,3 +130,4 @@ async def delete_api_key(
         raise HTTPException(status_code=404, detail="API key not found")
     await db.delete(api_key)
     await db.commit()
+    principal_cache.invalidate_key(key_id)
@@ -1,14 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import uuid
+
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.config import settings
-from app.core.security import create_access_token, get_current_user, hash_password, verify_password
+from app.core.principal import Principal
+from app.core.security import (
+    bearer_scheme,
+    create_access_token,
+    create_refresh_token,
+    get_current_user,
+    hash_password,
+    password_needs_rehash,
+    verify_password,
+    verify_token,
+)
 from app.database import get_db
 from app.models.user import User
 from app.models.team_member import TeamMember
-from app.schemas.auth import LoginRequest, TokenResponse
+from app.services.refresh_tokens import revoke_refresh_token
+from app.services.token_revocations import token_revocations
+from app.schemas.auth import LoginRequest, LogoutRequest, RefreshRequest, TokenResponse
 from app.schemas.user import UserCreate, UserResponse, UserTeamInfo
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -28,7 +43,7 @@ async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
     user = User(
         username=data.username,
         email=data.email,
-        password_hash=hash_password(data.password),
+        password_hash=await hash_password(data.password),
     )
     db.add(user)
     await db.commit()
@@ -43,15 +58,75 @@ async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
     )
 
 
+def _issue_tokens(user: User) -> TokenResponse:
+    """Token pair for ``user``; with JWT_STATELESS its team memberships must be loaded."""
+    if not settings.JWT_STATELESS:
+        return TokenResponse(access_token=create_access_token(user.id))
+    return TokenResponse(
+        access_token=create_access_token(user.id, Principal.from_model(user)),
+        refresh_token=create_refresh_token(user.id),
+        expires_in=settings.JWT_ACCESS_EXPIRE_MINUTES * 60,
+    )
+
+
 @router.post("/login", response_model=TokenResponse)
 async def login(data: LoginRequest, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(User).where(User.username == data.username))
+    query = select(User).where(User.username == data.username)
+    if settings.JWT_STATELESS:
+        query = query.options(selectinload(User.team_memberships))
+    result = await db.execute(query)
     user = result.scalar_one_or_none()
-    if not user or not verify_password(data.password, user.password_hash):
+    if not user or not await verify_password(data.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-    token = create_access_token(user.id)
-    return TokenResponse(access_token=token)
+    if password_needs_rehash(user.password_hash):
+        # BCRYPT_ROUNDS changed since this hash was made; upgrade it while we have the plain password.
+        user.password_hash = await hash_password(data.password)
+        await db.commit()
+
+    return _issue_tokens(user)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(data: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Exchange a refresh token for a new token pair carrying the user's current role and teams.
+
+    Refresh tokens are single use: the presented one is revoked for all workers.
+    """
+    payload = verify_token(data.refresh_token, typ="refresh")
+    result = await db.execute(
+        select(User).where(User.id == uuid.UUID(payload["sub"])).options(selectinload(User.team_memberships))
+    )
+    user = result.scalar_one_or_none()
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    if not await revoke_refresh_token(db, payload):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    await db.commit()
+    return _issue_tokens(user)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    data: LogoutRequest | None = Body(default=None),
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db),
+):
+    """Revoke the presented access token and, if given, the refresh token."""
+    if credentials is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    payload = verify_token(credentials.credentials)
+    if data is not None and data.refresh_token:
+        refresh_payload = verify_token(data.refresh_token, typ="refresh")
+        if refresh_payload["sub"] != payload["sub"]:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Refresh token belongs to another user")
+        # Already rotated or revoked elsewhere is fine: either way it can no longer be used.
+        await revoke_refresh_token(db, refresh_payload)
+        await db.commit()
+    # Tokens issued before revocation support have no id and simply run until they expire.
+    if "jti" in payload:
+        token_revocations.revoke(payload["jti"], payload["exp"])
 
 
 @router.get("/me", response_model=UserResponse)
@@ -1,197 +1,458 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+import asyncio
+import base64
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import LargeBinary, or_, select, type_coerce
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.permissions import can_access_skill
+from app.core.permissions import can_access_skill, skill_access_filter
+from app.config import settings
+from app.core.principal import Principal
 from app.core.security import get_api_key_with_user
 from app.database import get_db
-from app.models.api_key import ApiKey
-from app.models.skill import Skill, SkillFile, SkillVersion
+from app.models.skill import Skill, SkillVersion
 from app.models.subscription import SkillSubscription
-from app.models.usage_log import SkillUsageLog
 from app.models.user import User
 from app.schemas.skill import (
     CatalogItem,
     CatalogResponse,
+    LockedSkill,
+    LockRequest,
+    LockResponse,
     ResolvedSkill,
     ResolveRequest,
     ResolveResponse,
 )
+from app.services.bundles import ensure_bundle
+from app.services.catalog import catalog_etag, etag_matches, get_catalog_revision
+from app.services.catalog_cache import catalog_cache
+from app.services.change_feed import fetch_events, format_event, latest_event_id
+from app.services.principal_cache import CachedApiKey
+from app.services.resolver import (
+    allowed_tags_filter,
+    get_subscribed_skill_ids,
+    is_known_version,
+    latest_version_summary,
+    lock_specs,
+    pick_version,
+    plan_specs,
+    resolve_locked,
+    resolve_specs,
+)
+from app.services.tags import tag_like, tagged
+from app.services.usage_writer import record_usage
+from app.services.version_cache import CachedVersion, encode_json, load_versions
+from app.utils.compression import gzip_payload
+from app.utils.sql import escape_like
 
 router = APIRouter(prefix="/api/v1/skills", tags=["plugin"])
 
+CATALOG_CACHE_CONTROL = "private, no-cache"
+BUNDLE_CACHE_CONTROL = "private, max-age=31536000, immutable"  # a version's bundle never changes
+# Lock-pinned content never changes, but access to it is checked per caller: only the client may keep it.
+LOCKED_CACHE_CONTROL = "private, max-age=31536000, immutable"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CATALOG_MAX_LIMIT = 500
+STREAM_BATCH_SIZE = 8  # versions loaded (and held in memory) at a time when streaming
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+EVENTS_RETRY_MS = 3000  # reconnect delay suggested to EventSource clients
+
+
+def _encode_resolved_skill(
+    skill: Skill, version: CachedVersion, spec: str | None = None, *, pinned: bool = False
+) -> bytes:
+    """Encode one ResolvedSkill, splicing in the version's pre-encoded content and files.
+
+    ``pinned`` leaves out the skill's (editable) description, so the body
+    depends only on the version.
+    """
+    envelope = encode_json({
+        "name": skill.name,
+        "version": version.version,
+        "digest": version.digest,
+        "description": None if pinned else skill.description,
+        "spec": spec,
+    })
+    return b"".join((
+        envelope[:-1],
+        b',"content":', version.content_json,
+        b',"files":', version.files_json,
+        b"}",
+    ))
+
+
+def _encode_resolve_response(skills: list[bytes], unchanged: list[str], revoked: list[str]) -> bytes:
+    return b"".join((
+        b'{"skills":[', b",".join(skills), b"]",
+        b',"unchanged":', encode_json(unchanged),
+        b',"revoked":', encode_json(revoked),
+        b"}",
+    ))
+
+
+def _accepts_gzip(accept_encoding: str | None) -> bool:
+    """Whether ``Accept-Encoding`` allows gzip; an explicit ``gzip`` entry overrides ``*``."""
+    accepted = {}
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        name = name.strip().lower()
+        if name in ("gzip", "*"):
+            accepted.setdefault(name, params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"))
+    return accepted.get("gzip", accepted.get("*", False))
+
+
+async def _markdown_response(db: AsyncSession, version: CachedVersion, accept_encoding: str | None) -> Response:
+    media_type = "text/markdown; charset=utf-8"
+    headers = {"Vary": "Accept-Encoding"}
+    if _accepts_gzip(accept_encoding):
+        stored = (await db.execute(
+            select(type_coerce(SkillVersion.content, LargeBinary)).where(SkillVersion.id == version.id)
+        )).scalar_one_or_none()
+        payload = gzip_payload(stored)
+        if payload is not None:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=payload, media_type=media_type, headers=headers)
+    return Response(content=version.content, media_type=media_type, headers=headers)
+
+
+def _revoked_specs(planned, known: dict[str, str]) -> list[str]:
+    """Known specs whose skill is gone or no longer accessible.
+
+    A spec whose skill is still accessible is never revoked, even if its pin
+    matches nothing (e.g. a mistyped version).
+    """
+    return list(dict.fromkeys(spec for spec, skill, _ in planned if skill is None and spec in known))
+
+
+def _record_resolve(db: AsyncSession, skill: Skill, version: str, user_id, api_key_id):
+    record_usage(
+        db,
+        skill_id=skill.id,
+        skill_name=skill.name,
+        skill_version=version,
+        user_id=user_id,
+        api_key_id=api_key_id,
+        action="resolve",
+    )
+
 
 @router.post("/resolve", response_model=ResolveResponse)
 async def resolve_skills(
     data: ResolveRequest,
+    accept: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
-    auth: tuple[User, ApiKey] = Depends(get_api_key_with_user),
+    auth: tuple[Principal, CachedApiKey] = Depends(get_api_key_with_user),
 ):
-    """Batch resolve skills by name, optionally with version pinning."""
+    """Batch resolve skills by name, optionally with version pinning.
+
+    ``known`` maps specs (as given in ``skills``) to the version or digest the
+    client holds for them. Specs whose known version is still current are
+    listed in ``unchanged`` instead of being sent again, and known specs whose
+    skill is no longer accessible are listed in ``revoked``. Each resolved
+    skill carries the ``spec`` it answers.
+
+    With ``Accept: application/x-ndjson`` the response is streamed: one
+    ResolvedSkill per line, then a final ``{"unchanged": [...], "revoked": [...]}``
+    line that also marks the end of the stream.
+
+    With ``lock`` (entries from ``POST /lock``) instead of ``skills``, exactly the
+    pinned versions are served from the immutable version cache; entries that
+    are no longer accessible or whose digest does not match are listed in
+    ``revoked``. Lock mode always answers with a plain JSON body.
+    """
     user, api_key = auth
 
-    # Get user's subscribed skill IDs (enabled only)
-    sub_result = await db.execute(
-        select(SkillSubscription.skill_id).where(
-            SkillSubscription.user_id == user.id,
-            SkillSubscription.enabled == True,
+    if data.lock:
+        pairs, revoked = await resolve_locked(
+            db, user, [(e.name, e.version, e.digest) for e in data.lock], api_key.allowed_tags
         )
-    )
-    subscribed_skill_ids = {row[0] for row in sub_result.all()}
-
-    if not subscribed_skill_ids:
-        return ResolveResponse(skills=[])
+        entries = [(skill.name, None, skill, version) for skill, version in pairs]
+    elif accept and NDJSON_MEDIA_TYPE in accept:
+        planned = await plan_specs(db, user, data.skills, api_key.allowed_tags)
+        # Release the request session's connection; the stream uses its own session.
+        await db.commit()
+        return StreamingResponse(
+            _stream_resolved(db.bind, planned, data, user.id, api_key.id),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    else:
+        specs = await resolve_specs(db, user, data.skills, api_key.allowed_tags)
+        entries = [(spec, spec, skill, version) for spec, skill, version in specs if version]
+        revoked = _revoked_specs(specs, data.known)
 
+    # Lock entries are known by name; specs by the spec string.
     resolved = []
+    unchanged = []
+    for key, spec, skill, version in entries:
+        _record_resolve(db, skill, version.version, user.id, api_key.id)
 
-    for spec in data.skills:
-        # Parse "skill-name" or "skill-name@1.2.0"
-        if "@" in spec:
-            name, ver = spec.split("@", 1)
-        else:
-            name, ver = spec, None
-
-        result = await db.execute(
-            select(Skill)
-            .where(Skill.name == name, Skill.is_published == True)
-            .options(selectinload(Skill.visibility_teams))
-        )
-        skill = result.scalar_one_or_none()
-        if not skill:
+        if is_known_version(data.known.get(key), version):
+            unchanged.append(key)
             continue
 
-        # Subscription filtering
-        if skill.id not in subscribed_skill_ids:
-            continue
-        if not can_access_skill(skill, user):
-            continue
+        resolved.append(_encode_resolved_skill(skill, version, spec))
 
-        # Get specific version or latest
-        if ver:
-            ver_result = await db.execute(
-                select(SkillVersion)
-                .where(SkillVersion.skill_id == skill.id, SkillVersion.version == ver)
-                .options(selectinload(SkillVersion.files))
-            )
-        else:
-            ver_result = await db.execute(
-                select(SkillVersion)
-                .where(SkillVersion.skill_id == skill.id)
-                .order_by(SkillVersion.created_at.desc())
-                .limit(1)
-                .options(selectinload(SkillVersion.files))
-            )
-
-        version = ver_result.scalar_one_or_none()
-        if not version:
-            continue
+    if entries:
+        await db.commit()
+    # Skill bodies are served as cached JSON fragments instead of being re-validated and re-encoded.
+    body = _encode_resolve_response(resolved, list(dict.fromkeys(unchanged)), list(dict.fromkeys(revoked)))
+    return Response(content=body, media_type="application/json")
 
-        files_dict = {f.path: f.content for f in version.files}
-        resolved.append(
-            ResolvedSkill(
-                name=skill.name,
-                version=version.version,
-                description=skill.description,
-                content=version.content,
-                files=files_dict,
-            )
-        )
 
-        # Log usage
-        db.add(SkillUsageLog(
-            skill_id=skill.id,
-            skill_name=skill.name,
-            skill_version=version.version,
-            user_id=user.id,
-            api_key_id=api_key.id,
-            action="resolve",
-        ))
+async def _stream_resolved(bind, planned: list[tuple[str, Skill | None, str | None]], data: ResolveRequest,
+                           user_id, api_key_id):
+    """Yield NDJSON lines, loading at most STREAM_BATCH_SIZE versions at a time."""
+    unchanged = []
+    recorded = False
+    found = [(spec, skill, ver) for spec, skill, ver in planned if skill and ver]
+    async with AsyncSession(bind, expire_on_commit=False) as db:
+        for start in range(0, len(found), STREAM_BATCH_SIZE):
+            batch = found[start:start + STREAM_BATCH_SIZE]
+            versions = await load_versions(db, {(skill.id, ver) for _, skill, ver in batch})
+            for spec, skill, ver in batch:
+                version = versions.get((skill.id, ver))
+                if not version:
+                    continue
+                recorded = True
+                _record_resolve(db, skill, version.version, user_id, api_key_id)
 
-    await db.commit()
-    return ResolveResponse(skills=resolved)
+                if is_known_version(data.known.get(spec), version):
+                    unchanged.append(spec)
+                    continue
+
+                yield _encode_resolved_skill(skill, version, spec) + b"\n"
+
+        if recorded:
+            await db.commit()
+
+    yield encode_json({
+        "unchanged": list(dict.fromkeys(unchanged)),
+        "revoked": _revoked_specs(planned, data.known),
+    }) + b"\n"
+
+
+@router.post("/lock", response_model=LockResponse)
+async def lock_skills(
+    data: LockRequest,
+    db: AsyncSession = Depends(get_db),
+    auth: tuple[Principal, CachedApiKey] = Depends(get_api_key_with_user),
+):
+    """Pin a manifest of specs (names, exact versions or ranges) to exact versions and digests.
+
+    The result can be sent back as ``lock`` to ``/resolve``, or each entry fetched
+    from the HTTP-cacheable ``GET /{name}/locked/{digest}``.
+    """
+    user, api_key = auth
+    locked, unresolved = await lock_specs(db, user, data.skills, api_key.allowed_tags)
+    return LockResponse(
+        skills=[LockedSkill(name=skill.name, version=ver, digest=digest) for skill, ver, digest in locked],
+        unresolved=unresolved,
+    )
 
 
 @router.get("/catalog", response_model=CatalogResponse)
 async def catalog(
+    q: str | None = Query(None, max_length=100),
+    tag: str | None = Query(None, max_length=50),
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=CATALOG_MAX_LIMIT),
+    if_none_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
-    auth: tuple[User, ApiKey] = Depends(get_api_key_with_user),
+    auth: tuple[Principal, CachedApiKey] = Depends(get_api_key_with_user),
 ):
-    """List all published skills that the user is subscribed to."""
+    """List all published skills that the user is subscribed to.
+
+    ``q`` matches names, descriptions and tags; ``tag`` selects an exact tag.
+    With ``limit`` the list is paginated by name: pass ``next_cursor`` back as
+    ``cursor`` for the next page. Skills outside the API key's ``allowed_tags``
+    are never listed.
+    """
     user, api_key = auth
+    record_usage(
+        db,
+        skill_name="*",
+        user_id=user.id,
+        api_key_id=api_key.id,
+        action="catalog",
+    )
+    after = _decode_catalog_cursor(cursor) if cursor else None
+    allowed_tags = sorted(api_key.allowed_tags or [])
+    # API keys restricted to different tags see different catalogs.
+    variant = encode_json(allowed_tags).decode() if allowed_tags else ""
+    filtered = any((q, tag, cursor, limit))
 
-    # Get user's subscribed skill IDs (enabled only)
-    sub_result = await db.execute(
-        select(SkillSubscription.skill_id).where(
-            SkillSubscription.user_id == user.id,
-            SkillSubscription.enabled == True,
+    # The revision is bumped whenever an input of this user's catalog changes,
+    # so a matching validator can be answered without touching skills/versions.
+    revision = await get_catalog_revision(db, user.id)
+    view = encode_json([variant, q, tag, cursor, limit]).decode() if filtered else variant
+    etag = catalog_etag(user.id, revision, view)
+    headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        await db.commit()
+        return Response(status_code=304, headers=headers)
+
+    # ... and the encoded catalog built at the same revision can be served as is.
+    # Only full catalogs are cached; searches and pages are small and cheap to build.
+    body = None if filtered else catalog_cache.get(user.id, revision, variant)
+    if body is None:
+        items, next_after = await _catalog_items(
+            db, user, q=q, tag=tag, allowed_tags=allowed_tags, after=after, limit=limit
         )
-    )
-    subscribed_skill_ids = {row[0] for row in sub_result.all()}
+        response = CatalogResponse(
+            skills=items,
+            next_cursor=_encode_catalog_cursor(next_after) if next_after else None,
+        )
+        body = encode_json(response.model_dump(mode="json"))
+        if not filtered:
+            catalog_cache.put(user.id, revision, body, variant)
+    await db.commit()
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _encode_catalog_cursor(name: str) -> str:
+    return base64.urlsafe_b64encode(name.encode()).decode().rstrip("=")
+
 
+def _decode_catalog_cursor(cursor: str) -> str:
+    try:
+        return base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _catalog_items(
+    db: AsyncSession,
+    user: Principal,
+    *,
+    q: str | None = None,
+    tag: str | None = None,
+    allowed_tags=(),
+    after: str | None = None,
+    limit: int | None = None,
+) -> tuple[list[CatalogItem], str | None]:
+    """One page of the user's catalog ordered by name, and the name to continue after (if any)."""
+    # Get user's subscribed skill IDs (enabled only)
+    subscribed_skill_ids = await get_subscribed_skill_ids(db, user)
     if not subscribed_skill_ids:
-        # Log usage even when empty
-        db.add(SkillUsageLog(
-            skill_name="*",
-            user_id=user.id,
-            api_key_id=api_key.id,
-            action="catalog",
-        ))
-        await db.commit()
-        return CatalogResponse(skills=[])
+        return [], None
 
-    result = await db.execute(
+    query = (
         select(Skill)
         .where(
             Skill.is_published == True,
+            Skill.latest_version_id.is_not(None),
             Skill.id.in_(subscribed_skill_ids),
+            skill_access_filter(user),
         )
-        .options(selectinload(Skill.versions), selectinload(Skill.visibility_teams))
+        .options(latest_version_summary())
         .order_by(Skill.name)
     )
-    skills = result.scalars().all()
-
-    items = []
-    for skill in skills:
-        if not can_access_skill(skill, user):
-            continue
-        latest = skill.versions[0] if skill.versions else None
-        if latest:
-            items.append(
-                CatalogItem(
-                    name=skill.name,
-                    description=skill.description,
-                    version=latest.version,
-                    tags=skill.tags or [],
-                )
-            )
-
-    # Log usage
-    db.add(SkillUsageLog(
-        skill_name="*",
-        user_id=user.id,
-        api_key_id=api_key.id,
-        action="catalog",
-    ))
-    await db.commit()
+    if q:
+        pattern = f"%{escape_like(q)}%"
+        query = query.where(or_(
+            Skill.name.ilike(pattern, escape="\\"),
+            Skill.description.ilike(pattern, escape="\\"),
+            tag_like(pattern),
+        ))
+    if tag:
+        query = query.where(tagged([tag]))
+    query = allowed_tags_filter(query, allowed_tags)
+    if after is not None:
+        query = query.where(Skill.name > after)
+    if limit is not None:
+        query = query.limit(limit + 1)
 
-    return CatalogResponse(skills=items)
+    skills = (await db.execute(query)).scalars().all()
+    items = [
+        CatalogItem(
+            name=skill.name,
+            description=skill.description,
+            version=skill.latest_version.version,
+            digest=skill.latest_version.digest,
+            tags=skill.tags or [],
+        )
+        for skill in skills
+    ]
+    if limit is not None and len(items) > limit:
+        return items[:limit], items[limit - 1].name
+    return items, None
 
 
-@router.get("/{name}/raw")
-async def get_skill_raw(
-    name: str,
-    version: str | None = None,
+@router.get("/events")
+async def skill_events(
+    last_event_id: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
-    auth: tuple[User, ApiKey] = Depends(get_api_key_with_user),
+    auth: tuple[Principal, CachedApiKey] = Depends(get_api_key_with_user),
 ):
-    """Get raw SKILL.md content for a skill."""
+    """Server-Sent Events feed of changes to the user's subscribed skills.
+
+    Without ``Last-Event-ID`` the feed starts at the current position. Streams
+    end after ``EVENTS_MAX_STREAM_SECONDS``; clients reconnect with the last id
+    they received and get everything recorded since.
+    """
     user, api_key = auth
+    if last_event_id is None:
+        after_id = await latest_event_id(db)
+    else:
+        try:
+            after_id = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    # Release the request's connection; each poll below uses a short-lived session of its own.
+    await db.commit()
+    return StreamingResponse(
+        _stream_events(db.bind, user.id, after_id, list(api_key.allowed_tags or [])),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
+async def _stream_events(bind, user_id, after_id: int, allowed_tags: list[str]):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.EVENTS_MAX_STREAM_SECONDS
+    last_sent = loop.time()
+    user = None
+    yield f"retry: {EVENTS_RETRY_MS}\n\n".encode()
+    while True:
+        async with AsyncSession(bind, expire_on_commit=False) as db:
+            if user is None:
+                result = await db.execute(
+                    select(User).where(User.id == user_id).options(selectinload(User.team_memberships))
+                )
+                user = result.scalar_one_or_none()
+                if user is None:
+                    return
+            events, examined_id = await fetch_events(db, user, after_id, allowed_tags)
+        for event in events:
+            yield format_event(event)
+            if event.event_type == "access_changed":
+                # Later events must be filtered with the user's new team memberships.
+                examined_id = event.id
+                user = None
+                break
+        after_id = examined_id
+
+        now = loop.time()
+        if events:
+            last_sent = now
+        elif now - last_sent >= settings.EVENTS_HEARTBEAT_SECONDS:
+            yield b": keepalive\n\n"
+            last_sent = now
+        if now >= deadline:
+            return
+        if user is not None:
+            await asyncio.sleep(min(settings.EVENTS_POLL_INTERVAL, deadline - now))
+
+
+async def _get_subscribed_skill(db: AsyncSession, user: Principal, api_key: CachedApiKey, name: str) -> Skill:
+    """Load a published skill the user is subscribed to and may access, or raise 404/403."""
     result = await db.execute(
         select(Skill)
         .where(Skill.name == name, Skill.is_published == True)
-        .options(selectinload(Skill.visibility_teams))
+        .options(selectinload(Skill.visibility_teams), latest_version_summary())
     )
     skill = result.scalar_one_or_none()
     if not skill:
@@ -209,32 +470,135 @@ async def get_skill_raw(
         raise HTTPException(status_code=403, detail="Not subscribed to this skill")
     if not can_access_skill(skill, user):
         raise HTTPException(status_code=403, detail="Access denied")
+    if api_key.allowed_tags and not set(api_key.allowed_tags) & set(skill.tags or []):
+        raise HTTPException(status_code=403, detail="API key is not allowed to access this skill")
+    return skill
 
-    if version:
-        ver_result = await db.execute(
-            select(SkillVersion).where(SkillVersion.skill_id == skill.id, SkillVersion.version == version)
-        )
-    else:
-        ver_result = await db.execute(
-            select(SkillVersion)
-            .where(SkillVersion.skill_id == skill.id)
-            .order_by(SkillVersion.created_at.desc())
-            .limit(1)
-        )
 
-    ver = ver_result.scalar_one_or_none()
+@router.get("/{name}/raw")
+async def get_skill_raw(
+    name: str,
+    version: str | None = None,
+    format: Literal["json", "markdown"] = "json",
+    accept_encoding: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    auth: tuple[Principal, CachedApiKey] = Depends(get_api_key_with_user),
+):
+    """Get raw SKILL.md content for a skill.
+
+    ``format=markdown`` returns the bare SKILL.md; if the client accepts gzip
+    and the row is stored gzip-compressed, the stored bytes are sent as-is.
+    """
+    user, api_key = auth
+    skill = await _get_subscribed_skill(db, user, api_key, name)
+
+    version = await pick_version(db, skill, version)
+    ver = None
+    if version:
+        ver = (await load_versions(db, {(skill.id, version)})).get((skill.id, version))
     if not ver:
         raise HTTPException(status_code=404, detail="No version found")
 
     # Log usage
-    db.add(SkillUsageLog(
+    record_usage(
+        db,
         skill_id=skill.id,
         skill_name=skill.name,
         skill_version=ver.version,
         user_id=user.id,
         api_key_id=api_key.id,
         action="raw",
-    ))
+    )
     await db.commit()
 
-    return {"name": skill.name, "version": ver.version, "content": ver.content}
+    if format == "markdown":
+        return await _markdown_response(db, ver, accept_encoding)
+
+    envelope = encode_json({"name": skill.name, "version": ver.version})
+    body = b"".join((envelope[:-1], b',"content":', ver.content_json, b"}"))
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/{name}/versions/{ver}/bundle")
+async def get_skill_bundle(
+    name: str,
+    ver: str,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    auth: tuple[Principal, CachedApiKey] = Depends(get_api_key_with_user),
+):
+    """Download SKILL.md plus all files of a version as a deterministic tar.gz.
+
+    The bundle is built on first request and stored under STORAGE_PATH keyed by
+    the version digest, which also serves as its (strong) ETag.
+    """
+    user, api_key = auth
+    skill = await _get_subscribed_skill(db, user, api_key, name)
+
+    version = (await load_versions(db, {(skill.id, ver)})).get((skill.id, ver))
+    if not version:
+        raise HTTPException(status_code=404, detail="Version not found")
+
+    record_usage(
+        db,
+        skill_id=skill.id,
+        skill_name=skill.name,
+        skill_version=version.version,
+        user_id=user.id,
+        api_key_id=api_key.id,
+        action="bundle",
+    )
+    await db.commit()
+
+    etag = f'"{version.digest}"'
+    headers = {"ETag": etag, "Cache-Control": BUNDLE_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    path = await ensure_bundle(version)
+    return FileResponse(
+        path,
+        media_type="application/gzip",
+        filename=f"{skill.name}-{version.version}.tar.gz",
+        headers=headers,
+    )
+
+
+@router.get("/{name}/locked/{digest}", response_model=ResolvedSkill)
+async def get_locked_skill(
+    name: str,
+    digest: str,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    auth: tuple[Principal, CachedApiKey] = Depends(get_api_key_with_user),
+):
+    """Serve one lockfile entry by content digest.
+
+    The body for a given URL never changes (it carries no editable skill
+    fields, and of several versions with the same digest the first published
+    one is served), so the client may cache it as immutable. Access is
+    checked per caller, so shared caches may not store it.
+    """
+    user, api_key = auth
+    skill = await _get_subscribed_skill(db, user, api_key, name)
+
+    ver = (await db.execute(
+        select(SkillVersion.version)
+        .where(SkillVersion.skill_id == skill.id, SkillVersion.digest == digest)
+        .order_by(SkillVersion.created_at, SkillVersion.version)
+        .limit(1)
+    )).scalar_one_or_none()
+    version = (await load_versions(db, {(skill.id, ver)})).get((skill.id, ver)) if ver else None
+    if not version:
+        raise HTTPException(status_code=404, detail="Version not found")
+
+    _record_resolve(db, skill, version.version, user.id, api_key.id)
+    await db.commit()
+
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": LOCKED_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=_encode_resolved_skill(skill, version, pinned=True), media_type="application/json", headers=headers
+    )
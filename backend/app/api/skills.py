@@ -1,14 +1,19 @@
+import base64
 import json
+import posixpath
+import uuid
 from datetime import datetime, timezone
+from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select, func, or_
+from sqlalchemy import literal, select, func, tuple_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, undefer
 
-from app.core.permissions import check_skill_access, check_skill_edit, get_user_team_ids
-from app.core.security import get_current_user
+from app.core.permissions import check_skill_access, check_skill_edit, get_user_team_ids, skill_access_filter
+from app.core.principal import Principal
+from app.core.security import get_current_principal, get_current_user
 from app.database import get_db
 from app.models.edit_log import SkillEditLog
 from app.models.skill import Skill, SkillFile, SkillVersion, SkillVisibilityTeam
@@ -21,19 +26,29 @@ from app.schemas.skill import (
     SkillCreate,
     SkillEditLogResponse,
     SkillListResponse,
+    TagFacet,
     SkillResponse,
     SkillUpdate,
     VersionCreate,
     VersionResponse,
 )
+from app.services.catalog import bump_catalog_revision
+from app.services.change_feed import record_access_revoked, record_change, record_skill_deleted, subscribers_with_access
+from app.services.resolver import latest_version_summary
+from app.services.skill_counts import skill_count_cache
+from app.services.skill_search import SEARCH_FIELDS, index_skill, remove_skill, search_clauses, search_terms
+from app.services.tags import set_skill_tags, tag_facets as tag_facets_of, tagged
+from app.services.visible_skills import refresh_skills
+from app.services.version_cache import load_versions
+from app.services.version_index import version_index
+from app.utils.digest import sha256_hex, version_digest
 from app.utils.skill_parser import parse_skill_md, validate_semver, validate_skill_name
+from app.utils.sql import comparable_timestamp, estimate_row_count
 
 router = APIRouter(prefix="/api/skills", tags=["skills"])
 
-
-def _escape_like(s: str) -> str:
-    """Escape special characters for SQL LIKE."""
-    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+# Large, deferred SkillVersion columns that list_versions returns only on request.
+VERSION_DETAIL_FIELDS = ("content", "metadata_json")
 
 
 def _dump_detail(payload: dict | None) -> str | None:
@@ -99,53 +114,96 @@ def _skill_to_response(
     )
 
 
+def _version_to_response(
+    version, files: dict[str, str] | None = None, fields=VERSION_DETAIL_FIELDS
+) -> VersionResponse:
+    """``fields`` names the deferred columns of ``version`` that were loaded and should be returned."""
+    return VersionResponse(
+        id=version.id,
+        skill_id=version.skill_id,
+        version=version.version,
+        content=version.content if "content" in fields else None,
+        content_digest=version.content_digest,
+        digest=version.digest,
+        changelog=version.changelog,
+        metadata_json=version.metadata_json if "metadata_json" in fields else None,
+        created_at=version.created_at,
+        published_at=version.published_at,
+        files=files or {},
+    )
+
+
 @router.get("", response_model=SkillListResponse)
 async def list_skills(
     q: str | None = None,
-    tag: str | None = None,
+    tag: list[str] = Query(default=[]),
+    tag_mode: Literal["all", "any"] = "all",
     visibility: str | None = None,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    total: Literal["exact", "cached", "estimate", "none"] = "cached",
+    facets: bool = False,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
-    query = select(Skill)
-
-    # Filter by visibility: show public, user's own, and team skills (multi-team)
-    user_team_ids = get_user_team_ids(user)
-    conditions = [Skill.visibility == "public", Skill.author_id == user.id]
-    if user_team_ids:
-        team_visible_skill_ids = (
-            select(SkillVisibilityTeam.skill_id)
-            .where(SkillVisibilityTeam.team_id.in_(user_team_ids))
-        )
-        conditions.append((Skill.visibility == "team") & Skill.id.in_(team_visible_skill_ids))
-    if user.role == "admin":
-        conditions = []  # admin sees all
-        query = select(Skill)
-    else:
-        query = query.where(or_(*conditions))
-
-    if q:
-        escaped_q = _escape_like(q)
-        query = query.where(
-            or_(Skill.name.ilike(f"%{escaped_q}%"), Skill.display_name.ilike(f"%{escaped_q}%"), Skill.description.ilike(f"%{escaped_q}%"))
-        )
+    """List visible skills, newest first (by relevance when ``q`` is given).
+
+    ``tag`` may be repeated; ``tag_mode`` says whether a skill needs all or any
+    of them. Pass ``next_cursor`` back as ``cursor`` to page without OFFSET;
+    ``page`` is kept for jumping to a page number. ``total`` selects how the
+    total is computed: ``exact`` counts, ``cached`` reuses a recent exact count,
+    ``estimate`` asks the PostgreSQL planner (``cached`` on other databases)
+    and ``none`` skips it. ``facets`` adds tag counts over all matching skills.
+    """
+    query = select(Skill).where(skill_access_filter(user))
+
+    rank = None
+    terms = search_terms(q) if q else ""
+    if q and not terms:
+        # Only punctuation: nothing can match, rather than every skill.
+        return SkillListResponse(items=[], total=None if total == "none" else 0, tag_facets=[] if facets else None)
+    if terms:
+        match, rank = search_clauses(terms)
+        query = query.where(match)
     if tag:
-        query = query.where(Skill.tags.contains([tag]))
+        query = query.where(tagged(tag, tag_mode))
     if visibility:
         query = query.where(Skill.visibility == visibility)
 
-    # Count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
-
-    # Paginate
-    query = query.order_by(Skill.updated_at.desc()).offset((page - 1) * size).limit(size)
-    query = query.options(selectinload(Skill.versions), selectinload(Skill.author), selectinload(Skill.visibility_teams))
+    # Team access comes from user_visible_skills; membership changes invalidate the cache.
+    scope = ("admin",) if user.role == "admin" else (user.id,)
+    total_count = await _count_skills(db, query, total, (*scope, terms, tuple(tag), tag_mode, visibility))
+    tag_facets = None
+    if facets:
+        tag_facets = [TagFacet(tag=name, count=count) for name, count in await tag_facets_of(db, query)]
+
+    # Paginate: keyset on (updated_at, id); relevance is not indexable, so ranked results page by position.
+    position = _decode_list_cursor(cursor, ranked=rank is not None) if cursor else None
+    offset = (page - 1) * size
+    if rank is None:
+        order_by = [Skill.updated_at.desc(), Skill.id.desc()]
+        if position is not None:
+            updated_at, skill_id = position
+            query = query.where(
+                tuple_(comparable_timestamp(Skill.updated_at), Skill.id)
+                < tuple_(comparable_timestamp(literal(updated_at, Skill.updated_at.type)), literal(skill_id, Skill.id.type))
+            )
+            offset = 0
+    else:
+        order_by = [rank.desc(), Skill.updated_at.desc(), Skill.id.desc()]
+        if position is not None:
+            offset = position
+    query = query.order_by(*order_by).offset(offset).limit(size + 1)
+    query = query.options(latest_version_summary(), selectinload(Skill.author), selectinload(Skill.visibility_teams))
     result = await db.execute(query)
     skills = result.scalars().all()
 
+    next_cursor = None
+    if len(skills) > size:
+        skills = skills[:size]
+        next_cursor = _encode_list_cursor(offset + size if rank is not None else (skills[-1].updated_at, skills[-1].id))
+
     # Batch fetch subscriptions for these skills
     skill_ids = [s.id for s in skills]
     sub_map = {}
@@ -161,7 +219,7 @@ async def list_skills(
 
     items = []
     for skill in skills:
-        latest = skill.versions[0].version if skill.versions else None
+        latest = skill.latest_version.version if skill.latest_version else None
         sub = sub_map.get(skill.id)
         items.append(_skill_to_response(
             skill,
@@ -170,7 +228,43 @@ async def list_skills(
             subscription_enabled=sub.enabled if sub else None,
         ))
 
-    return SkillListResponse(items=items, total=total)
+    return SkillListResponse(items=items, total=total_count, next_cursor=next_cursor, tag_facets=tag_facets)
+
+
+def _encode_list_cursor(position: int | tuple[datetime, uuid.UUID]) -> str:
+    data = {"o": position} if isinstance(position, int) else {"u": position[0].isoformat(), "i": position[1].hex}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def _decode_list_cursor(cursor: str, ranked: bool) -> int | tuple[datetime, uuid.UUID]:
+    """Offset for relevance-ranked lists, ``(updated_at, id)`` of the last row otherwise."""
+    try:
+        data = json.loads(base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True))
+        if ranked:
+            offset = data["o"]
+            if isinstance(offset, int) and offset >= 0:
+                return offset
+        else:
+            return datetime.fromisoformat(data["u"]), uuid.UUID(hex=data["i"])
+    except (ValueError, TypeError, KeyError):
+        pass
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _count_skills(db: AsyncSession, query, mode: str, cache_key: tuple) -> int | None:
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        estimate = await estimate_row_count(db, query)
+        if estimate is not None:
+            return estimate
+    if mode != "exact":
+        cached = skill_count_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    count = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar() or 0
+    skill_count_cache.put(cache_key, count)
+    return count
 
 
 @router.post("", response_model=SkillResponse, status_code=status.HTTP_201_CREATED)
@@ -220,6 +314,11 @@ async def create_skill(
     if requested_team_ids:
         for tid in requested_team_ids:
             db.add(SkillVisibilityTeam(skill_id=skill.id, team_id=tid))
+    if requested_team_ids or skill.team_id:
+        await refresh_skills(db, [skill.id])
+
+    await set_skill_tags(db, skill.id, skill.tags)
+    await index_skill(db, skill, body="")
 
     # Auto-subscribe the author
     subscription = SkillSubscription(user_id=user.id, skill_id=skill.id, enabled=True)
@@ -238,6 +337,7 @@ async def create_skill(
     )
 
     await db.commit()
+    skill_count_cache.invalidate()
     created_result = await db.execute(
         select(Skill).where(Skill.id == skill.id).options(selectinload(Skill.visibility_teams), selectinload(Skill.author))
     )
@@ -266,12 +366,12 @@ async def parse_skill_content(
 async def get_skill(
     name: str,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     result = await db.execute(
         select(Skill)
         .where(Skill.name == name)
-        .options(selectinload(Skill.versions), selectinload(Skill.author), selectinload(Skill.visibility_teams))
+        .options(latest_version_summary(), selectinload(Skill.author), selectinload(Skill.visibility_teams))
     )
     skill = result.scalar_one_or_none()
     if not skill:
@@ -287,7 +387,7 @@ async def get_skill(
     )
     sub = sub_result.scalar_one_or_none()
 
-    latest = skill.versions[0].version if skill.versions else None
+    latest = skill.latest_version.version if skill.latest_version else None
     return _skill_to_response(
         skill, latest,
         is_subscribed=sub is not None,
@@ -309,6 +409,10 @@ async def update_skill(
     check_skill_edit(skill, user)
 
     incoming = data.model_dump(exclude_unset=True)
+    # Subscribers who can read the skill now; those who lose access get a revocation event.
+    readers = set()
+    if incoming.keys() & {"visibility", "team_id", "team_ids"}:
+        readers = await subscribers_with_access(db, skill.id)
     new_visibility = incoming.get("visibility")
     if hasattr(new_visibility, "value"):
         new_visibility = new_visibility.value
@@ -363,8 +467,20 @@ async def update_skill(
             action="skill_updated",
             detail={"changes": changes},
         )
+        await bump_catalog_revision(db, skill_id=skill.id)
+        record_change(db, "skill_updated", skill=skill)
+        if "tags" in changes:
+            await set_skill_tags(db, skill.id, skill.tags)
+        if "team_ids" in changes:
+            await refresh_skills(db, [skill.id])
+        if changes.keys() & {"visibility", "team_ids"}:
+            await record_access_revoked(db, skill, readers)
+        if changes.keys() & SEARCH_FIELDS:
+            await index_skill(db, skill)
 
     await db.commit()
+    if changes:
+        skill_count_cache.invalidate()
     updated_result = await db.execute(
         select(Skill).where(Skill.id == skill.id).options(selectinload(Skill.visibility_teams), selectinload(Skill.author))
     )
@@ -383,8 +499,14 @@ async def delete_skill(
     if not skill:
         raise HTTPException(status_code=404, detail="Skill not found")
     check_skill_edit(skill, user)
+    await bump_catalog_revision(db, skill_id=skill.id)
+    await record_skill_deleted(db, skill)
+    await remove_skill(db, skill.id)
     await db.delete(skill)
+    await refresh_skills(db, [skill.id])
     await db.commit()
+    skill_count_cache.invalidate()
+    version_index.invalidate(skill.id)
 
 
 # --- Subscribe / Unsubscribe ---
@@ -414,6 +536,8 @@ async def subscribe_skill(
     else:
         sub = SkillSubscription(user_id=user.id, skill_id=skill.id, enabled=True)
         db.add(sub)
+    await bump_catalog_revision(db, user_ids=[user.id])
+    record_change(db, "subscribed", skill=skill, user_ids=[user.id])
 
     await db.commit()
     return {"detail": "Subscribed", "enabled": True}
@@ -439,6 +563,8 @@ async def unsubscribe_skill(
     sub = sub_result.scalar_one_or_none()
     if sub:
         sub.enabled = False
+        await bump_catalog_revision(db, user_ids=[user.id])
+        record_change(db, "unsubscribed", skill=skill, user_ids=[user.id])
         await db.commit()
 
     return {"detail": "Unsubscribed", "enabled": False}
@@ -454,7 +580,10 @@ async def create_version(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    result = await db.execute(select(Skill).where(Skill.name == name).options(selectinload(Skill.visibility_teams)))
+    # Lock the skill row so concurrent publishes update latest_version_id in order.
+    result = await db.execute(
+        select(Skill).where(Skill.name == name).options(selectinload(Skill.visibility_teams)).with_for_update()
+    )
     skill = result.scalar_one_or_none()
     if not skill:
         raise HTTPException(status_code=404, detail="Skill not found")
@@ -465,26 +594,40 @@ async def create_version(
 
     # Check duplicate version
     existing = await db.execute(
-        select(SkillVersion).where(SkillVersion.skill_id == skill.id, SkillVersion.version == data.version)
+        select(SkillVersion.id).where(SkillVersion.skill_id == skill.id, SkillVersion.version == data.version)
     )
     if existing.scalar_one_or_none():
         raise HTTPException(status_code=409, detail="Version already exists")
 
-    # Snapshot previous latest version/files for change detection.
-    previous_version_result = await db.execute(
-        select(SkillVersion)
-        .where(SkillVersion.skill_id == skill.id)
-        .order_by(SkillVersion.created_at.desc())
-        .limit(1)
-        .options(selectinload(SkillVersion.files))
-    )
-    previous_version = previous_version_result.scalar_one_or_none()
-    previous_files = {f.path: f.content for f in previous_version.files} if previous_version else {}
+    # Snapshot previous latest version/file digests for change detection; contents stay in the database.
+    previous_version = None
+    previous_files: dict[str, str] = {}  # path -> content_digest
+    if skill.latest_version_id:
+        previous_version = await db.get(SkillVersion, skill.latest_version_id)
+    if previous_version:
+        previous_files_result = await db.execute(
+            select(SkillFile.path, SkillFile.content_digest).where(SkillFile.skill_version_id == previous_version.id)
+        )
+        previous_files = dict(previous_files_result.all())
+
+    # Normalize and check for path traversal
+    normalized_files: dict[str, str] = {}
+    for path, content in (data.files or {}).items():
+        normalized = posixpath.normpath(path)
+        if normalized.startswith("/") or normalized.startswith("..") or "/../" in normalized:
+            raise HTTPException(status_code=400, detail=f"Invalid file path: {path}")
+        normalized_files[normalized] = content
+
+    # Content digests are computed once at publish time; versions are immutable.
+    file_digests = {path: sha256_hex(content) for path, content in normalized_files.items()}
+    content_digest = sha256_hex(data.content)
 
     version = SkillVersion(
         skill_id=skill.id,
         version=data.version,
         content=data.content,
+        content_digest=content_digest,
+        digest=version_digest(content_digest, file_digests),
         changelog=data.changelog,
         metadata_json=data.metadata_json,
         published_at=datetime.now(timezone.utc),
@@ -493,29 +636,37 @@ async def create_version(
     await db.flush()  # ensure version.id is available for FK references
 
     # Add files if provided
-    if data.files:
-        for path, content in data.files.items():
-            # Normalize and check for path traversal
-            import posixpath
-            normalized = posixpath.normpath(path)
-            if normalized.startswith("/") or normalized.startswith("..") or "/../" in normalized:
-                raise HTTPException(status_code=400, detail=f"Invalid file path: {path}")
-            skill_file = SkillFile(
-                skill_version_id=version.id,
-                path=normalized,
-                content=content,
-                file_type=path.rsplit(".", 1)[-1] if "." in path else None,
-            )
-            db.add(skill_file)
+    for path, content in normalized_files.items():
+        skill_file = SkillFile(
+            skill_version_id=version.id,
+            path=path,
+            content=content,
+            content_digest=file_digests[path],
+            file_type=path.rsplit(".", 1)[-1] if "." in path else None,
+        )
+        db.add(skill_file)
 
-    new_files = data.files or {}
+    new_files = normalized_files
     from_version = previous_version.version if previous_version else None
-    previous_content = previous_version.content if previous_version else None
 
     added_paths = [path for path in new_files if path not in previous_files]
-    modified_paths = [path for path in new_files if path in previous_files and previous_files[path] != new_files[path]]
+    modified_paths = [path for path in new_files if path in previous_files and previous_files[path] != file_digests[path]]
     deleted_paths = [path for path in previous_files if path not in new_files]
-    skill_md_changed = previous_content != data.content
+    skill_md_changed = previous_version is None or previous_version.content_digest != content_digest
+
+    # Only the previous contents that changed are read, for the old_length of the edit logs.
+    previous_content = None
+    previous_lengths: dict[str, int] = {}
+    if previous_version and skill_md_changed:
+        previous_content = await db.scalar(select(SkillVersion.content).where(SkillVersion.id == previous_version.id))
+    if previous_version and (modified_paths or deleted_paths):
+        changed_result = await db.execute(
+            select(SkillFile.path, SkillFile.content).where(
+                SkillFile.skill_version_id == previous_version.id,
+                SkillFile.path.in_(modified_paths + deleted_paths),
+            )
+        )
+        previous_lengths = {path: len(content) for path, content in changed_result.all()}
 
     await _append_edit_log(
         db,
@@ -581,7 +732,7 @@ async def create_version(
             from_version=from_version,
             to_version=data.version,
             detail={
-                "old_length": len(previous_files[path]),
+                "old_length": previous_lengths[path],
                 "new_length": len(new_files[path]),
             },
         )
@@ -596,42 +747,47 @@ async def create_version(
             target_path=path,
             from_version=from_version,
             to_version=data.version,
-            detail={"old_length": len(previous_files[path])},
+            detail={"old_length": previous_lengths[path]},
         )
 
     skill.is_published = True
+    skill.latest_version_id = version.id
+    await index_skill(db, skill, body=data.content)
+    await bump_catalog_revision(db, skill_id=skill.id)
+    record_change(db, "version_published", skill=skill, version=version.version, digest=version.digest)
     try:
         await db.commit()
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=409, detail="Version already exists")
-    await db.refresh(version)
+    version_index.invalidate(skill.id)
+    await db.refresh(version, ["created_at"])
 
-    files_dict = {}
-    if data.files:
-        result = await db.execute(select(SkillFile).where(SkillFile.skill_version_id == version.id))
-        for f in result.scalars().all():
-            files_dict[f.path] = f.content
-
-    return VersionResponse(
-        id=version.id,
-        skill_id=version.skill_id,
-        version=version.version,
-        content=version.content,
-        changelog=version.changelog,
-        metadata_json=version.metadata_json,
-        created_at=version.created_at,
-        published_at=version.published_at,
-        files=files_dict,
-    )
+    return _version_to_response(version, normalized_files)
 
 
 @router.get("/{name}/versions", response_model=list[VersionResponse])
 async def list_versions(
     name: str,
+    summary: bool = False,
+    fields: str | None = None,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
+    """Versions of a skill, newest first, without their files.
+
+    ``summary=true`` leaves out ``content`` and ``metadata_json``; ``fields``
+    (comma-separated) picks which of the two to return instead. By default both
+    are returned.
+    """
+    if fields is not None:
+        detail_fields = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = set(detail_fields) - set(VERSION_DETAIL_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    else:
+        detail_fields = () if summary else VERSION_DETAIL_FIELDS
+
     result = await db.execute(select(Skill).where(Skill.name == name).options(selectinload(Skill.visibility_teams)))
     skill = result.scalar_one_or_none()
     if not skill:
@@ -642,21 +798,10 @@ async def list_versions(
         select(SkillVersion)
         .where(SkillVersion.skill_id == skill.id)
         .order_by(SkillVersion.created_at.desc())
+        .options(*(undefer(getattr(SkillVersion, field)) for field in detail_fields))
     )
     versions = result.scalars().all()
-    return [
-        VersionResponse(
-            id=v.id,
-            skill_id=v.skill_id,
-            version=v.version,
-            content=v.content,
-            changelog=v.changelog,
-            metadata_json=v.metadata_json,
-            created_at=v.created_at,
-            published_at=v.published_at,
-        )
-        for v in versions
-    ]
+    return [_version_to_response(v, fields=detail_fields) for v in versions]
 
 
 @router.get("/{name}/versions/{ver}", response_model=VersionResponse)
@@ -664,7 +809,7 @@ async def get_version(
     name: str,
     ver: str,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     result = await db.execute(select(Skill).where(Skill.name == name).options(selectinload(Skill.visibility_teams)))
     skill = result.scalar_one_or_none()
@@ -672,27 +817,10 @@ async def get_version(
         raise HTTPException(status_code=404, detail="Skill not found")
     check_skill_access(skill, user)
 
-    result = await db.execute(
-        select(SkillVersion)
-        .where(SkillVersion.skill_id == skill.id, SkillVersion.version == ver)
-        .options(selectinload(SkillVersion.files))
-    )
-    version = result.scalar_one_or_none()
+    version = (await load_versions(db, {(skill.id, ver)})).get((skill.id, ver))
     if not version:
         raise HTTPException(status_code=404, detail="Version not found")
-
-    files_dict = {f.path: f.content for f in version.files}
-    return VersionResponse(
-        id=version.id,
-        skill_id=version.skill_id,
-        version=version.version,
-        content=version.content,
-        changelog=version.changelog,
-        metadata_json=version.metadata_json,
-        created_at=version.created_at,
-        published_at=version.published_at,
-        files=files_dict,
-    )
+    return _version_to_response(version, version.files)
 
 
 @router.get("/{name}/edit-logs", response_model=list[SkillEditLogResponse])
@@ -700,7 +828,7 @@ async def list_edit_logs(
     name: str,
     limit: int = Query(100, ge=1, le=500),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     skill_result = await db.execute(select(Skill).where(Skill.name == name).options(selectinload(Skill.visibility_teams)))
     skill = skill_result.scalar_one_or_none()
@@ -713,6 +841,7 @@ async def list_edit_logs(
         .where(SkillEditLog.skill_id == skill.id)
         .order_by(SkillEditLog.created_at.desc())
         .limit(limit)
+        .options(undefer(SkillEditLog.detail))
     )
     logs = result.scalars().all()
 
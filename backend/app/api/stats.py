@@ -4,17 +4,27 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_current_user
+from app.core.permissions import require_admin
+from app.core.principal import Principal
+from app.core.security import get_current_principal
 from app.database import get_db
 from app.models.api_key import ApiKey
 from app.models.usage_log import SkillUsageLog
-from app.models.user import User
 from app.schemas.skill import StatsOverviewResponse, StatsPopularItem, StatsTrendItem
+from app.services.catalog_cache import catalog_cache
+from app.services.change_feed import event_gaps
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.skill_counts import skill_count_cache
+from app.services.token_revocations import token_revocations
+from app.services.usage_writer import usage_writer
+from app.services.version_cache import version_cache
+from app.services.version_index import version_index
 
 router = APIRouter(prefix="/api/stats", tags=["stats"])
 
 
-def _user_key_ids_subquery(user: User):
+def _user_key_ids_subquery(user: Principal):
     """Subquery that returns all api_key IDs belonging to the user."""
     return select(ApiKey.id).where(ApiKey.user_id == user.id).scalar_subquery()
 
@@ -22,7 +32,7 @@ def _user_key_ids_subquery(user: User):
 @router.get("/overview", response_model=StatsOverviewResponse)
 async def stats_overview(
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     """Get usage statistics overview, scoped to current user's API keys."""
     now = datetime.now(timezone.utc)
@@ -61,7 +71,7 @@ async def stats_popular(
     days: int = Query(30, ge=1, le=365),
     limit: int = Query(10, ge=1, le=50),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     """Get popular skills by call count, scoped to current user's API keys."""
     since = datetime.now(timezone.utc) - timedelta(days=days)
@@ -98,7 +108,7 @@ async def stats_popular(
 async def stats_trend(
     days: int = Query(30, ge=1, le=365),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     """Get daily call count trend, scoped to current user's API keys."""
     since = datetime.now(timezone.utc) - timedelta(days=days)
@@ -133,3 +143,20 @@ async def stats_trend(
         current += timedelta(days=1)
 
     return trend
+
+
+@router.get("/cache")
+async def stats_cache(user: Principal = Depends(get_current_principal)):
+    """In-process cache and buffer counters for this worker (admin only)."""
+    require_admin(user)
+    return {
+        "versions": version_cache.stats(),
+        "catalog": catalog_cache.stats(),
+        "api_keys": principal_cache.stats(),
+        "skill_counts": skill_count_cache.stats(),
+        "token_revocations": token_revocations.stats(),
+        "version_index": version_index.stats(),
+        "event_gaps": event_gaps.stats(),
+        "usage_log": usage_writer.stats(),
+        "password_hasher": password_hasher.stats(),
+    }
@@ -3,7 +3,8 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.security import get_current_user
+from app.core.principal import Principal
+from app.core.security import get_current_principal, get_current_user
 from app.database import get_db
 from app.models.team import Team
 from app.models.team_member import TeamMember
@@ -11,6 +12,12 @@ from app.models.subscription import SkillSubscription
 from app.models.skill import Skill, SkillVisibilityTeam
 from app.models.user import User
 from app.schemas.skill import TeamCreate, TeamResponse, TeamDetailResponse, TeamMemberResponse
+from app.services.catalog import bump_catalog_revision
+from app.services.change_feed import record_change
+from app.services.principal_cache import principal_cache
+from app.services.skill_counts import skill_count_cache
+from app.services.token_revocations import token_revocations
+from app.services.visible_skills import refresh_users
 
 router = APIRouter(prefix="/api/teams", tags=["teams"])
 
@@ -32,7 +39,10 @@ async def create_team(
     # Creator becomes admin of the team
     membership = TeamMember(user_id=user.id, team_id=team.id, role="admin")
     db.add(membership)
+    await refresh_users(db, [user.id])
     await db.commit()
+    principal_cache.invalidate_users([user.id])
+    token_revocations.revoke_user(user.id)
     await db.refresh(team)
     return team
 
@@ -40,7 +50,7 @@ async def create_team(
 @router.get("", response_model=list[TeamResponse])
 async def list_teams(
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     result = await db.execute(select(Team).order_by(Team.name))
     return result.scalars().all()
@@ -49,7 +59,7 @@ async def list_teams(
 @router.get("/my", response_model=list[TeamDetailResponse])
 async def my_teams(
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     """List teams the current user belongs to."""
     result = await db.execute(
@@ -76,7 +86,7 @@ async def my_teams(
 async def get_team(
     slug: str,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     result = await db.execute(
         select(Team).where(Team.slug == slug).options(
@@ -131,7 +141,13 @@ async def join_team(
 
     membership = TeamMember(user_id=user.id, team_id=team.id, role="member")
     db.add(membership)
+    await refresh_users(db, [user.id])
+    await bump_catalog_revision(db, user_ids=[user.id])
+    record_change(db, "access_changed", user_ids=[user.id])
     await db.commit()
+    principal_cache.invalidate_users([user.id])
+    token_revocations.revoke_user(user.id)
+    skill_count_cache.invalidate()
 
     return TeamDetailResponse(
         id=team.id,
@@ -188,8 +204,14 @@ async def leave_team(
         )
         for sub in sub_result.scalars().all():
             sub.enabled = False
+    await refresh_users(db, [user.id])
+    await bump_catalog_revision(db, user_ids=[user.id])
+    record_change(db, "access_changed", user_ids=[user.id])
 
     await db.commit()
+    principal_cache.invalidate_users([user.id])
+    token_revocations.revoke_user(user.id)
+    skill_count_cache.invalidate()
     return {"detail": "Left team successfully"}
 
 
@@ -241,6 +263,12 @@ async def remove_member(
         )
         for sub in sub_result.scalars().all():
             sub.enabled = False
+    await refresh_users(db, [target_user_id])
+    await bump_catalog_revision(db, user_ids=[target_user_id])
+    record_change(db, "access_changed", user_ids=[target_user_id])
 
     await db.commit()
+    principal_cache.invalidate_users([target_user_id])
+    token_revocations.revoke_user(target_user_id)
+    skill_count_cache.invalidate()
     return {"detail": "Member removed"}
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -6,7 +8,30 @@ class Settings(BaseSettings):
     JWT_SECRET: str = "change-this-to-a-random-secret-key"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 1440
+    JWT_STATELESS: bool = False  # embed role and team ids in access tokens; read-only endpoints skip the users table
+    JWT_ACCESS_EXPIRE_MINUTES: int = 15  # lifetime of access tokens when JWT_STATELESS is on
+    JWT_REFRESH_EXPIRE_MINUTES: int = 10080
+    BCRYPT_ROUNDS: int = 12  # cost of new password hashes; older hashes are upgraded on the next login
+    BCRYPT_MAX_CONCURRENCY: int = 4  # concurrent bcrypt calls per worker (dedicated threads)
+    BCRYPT_QUEUE_TIMEOUT: float = 5  # seconds a login/register waits for a bcrypt slot before answering 503
     STORAGE_PATH: str = "/data/skills"
+    CONTENT_COMPRESSION: Literal["none", "gzip", "zstd"] = "gzip"  # at-rest codec for SKILL.md / files
+    CONTENT_COMPRESSION_MIN_BYTES: int = 1024  # smaller rows are stored uncompressed
+    VERSION_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # in-process cache of published skill versions
+    VERSION_INDEX_MAX_ENTRIES: int = 10000  # skills whose sorted version lists are kept per worker; 0 disables
+    CATALOG_CACHE_MAX_ENTRIES: int = 10000  # per-user encoded plugin catalogs kept per worker; 0 disables
+    API_KEY_CACHE_TTL: float = 60  # seconds an authenticated API key (and its user's teams) is cached; 0 disables
+    API_KEY_CACHE_MAX_ENTRIES: int = 10000
+    SKILL_COUNT_CACHE_TTL: float = 30  # seconds a GET /api/skills total (total=cached) is reused; 0 disables
+    SKILL_COUNT_CACHE_MAX_ENTRIES: int = 10000
+    USAGE_LOG_QUEUE_SIZE: int = 10000  # buffered usage events; further events are dropped
+    USAGE_LOG_BATCH_SIZE: int = 500
+    USAGE_LOG_FLUSH_INTERVAL: float = 1.0  # seconds
+    USAGE_LOG_DEDUP_SECONDS: float = 0  # collapse identical events within this window; 0 disables
+    EVENTS_POLL_INTERVAL: float = 2.0  # seconds between change-feed polls per SSE connection
+    EVENTS_HEARTBEAT_SECONDS: float = 15  # keepalive comment interval on idle SSE streams
+    EVENTS_MAX_STREAM_SECONDS: int = 300  # SSE streams end after this; clients reconnect with Last-Event-ID
+    EVENTS_GAP_TIMEOUT_SECONDS: float = 10  # feed cursors wait this long for an uncommitted (lower) event id
     ALLOW_REGISTRATION: bool = True
     TESTING: bool = False
     DEFAULT_ADMIN_USERNAME: str = "admin"
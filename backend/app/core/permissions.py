@@ -1,20 +1,23 @@
 from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, select, true
+from sqlalchemy.sql.expression import ColumnElement
 
+from app.core.principal import Principal
 from app.models.user import User
-from app.models.skill import Skill
+from app.models.skill import Skill, UserVisibleSkill
 
 
-def require_admin(user: User):
+def require_admin(user: User | Principal):
     if user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
 
 
-def get_user_team_ids(user: User) -> set:
+def get_user_team_ids(user: User | Principal) -> set:
     """Get set of team IDs the user belongs to."""
-    return {tm.team_id for tm in (user.team_memberships or [])}
+    return set(user.team_ids)
 
 
-def can_access_skill(skill: Skill, user: User) -> bool:
+def can_access_skill(skill: Skill, user: User | Principal) -> bool:
     """Return whether user can view the skill."""
     if user.role == "admin":
         return True
@@ -31,14 +34,33 @@ def can_access_skill(skill: Skill, user: User) -> bool:
     return False
 
 
-def check_skill_access(skill: Skill, user: User):
+def skill_access_filter(user: User | Principal) -> ColumnElement[bool]:
+    """SQL form of :func:`can_access_skill`, to filter Skill queries before rows are loaded.
+
+    Team access is read from the ``user_visible_skills`` index (see
+    app.services.visible_skills), which follows the user's memberships in the
+    database rather than the team ids carried by a token or cached principal,
+    so it is consulted even when those are empty. The two must stay
+    equivalent; tests compare them on randomized data.
+    """
+    if user.role == "admin":
+        return true()
+    team_visible_skill_ids = select(UserVisibleSkill.skill_id).where(UserVisibleSkill.user_id == user.id)
+    return or_(
+        Skill.visibility == "public",
+        Skill.author_id == user.id,
+        and_(Skill.visibility == "team", Skill.id.in_(team_visible_skill_ids)),
+    )
+
+
+def check_skill_access(skill: Skill, user: User | Principal):
     """Check if user can view this skill."""
     if can_access_skill(skill, user):
         return
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
 
-def check_skill_edit(skill: Skill, user: User):
+def check_skill_edit(skill: Skill, user: User | Principal):
     """Check if user can edit this skill."""
     if skill.author_id == user.id:
         return
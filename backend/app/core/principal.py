@@ -0,0 +1,25 @@
+"""Lightweight authenticated principal used by permission checks.
+
+Both API-key and JWT authentication can produce a ``Principal`` without
+holding on to an ORM ``User``; ``app.core.permissions`` only reads the fields
+below, so read-only endpoints never need to load the users table.
+"""
+
+import uuid
+from dataclasses import dataclass
+
+from app.models.user import User
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Snapshot of the fields of a ``User`` that permission checks read."""
+
+    id: uuid.UUID
+    username: str
+    role: str
+    team_ids: frozenset[uuid.UUID]
+
+    @classmethod
+    def from_model(cls, user: User) -> "Principal":
+        return cls(id=user.id, username=user.username, role=user.role, team_ids=frozenset(user.team_ids))
@@ -1,67 +1,129 @@
 import hashlib
+import hmac
 import secrets
+import time
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
-import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.config import settings
+from app.core.principal import Principal
 from app.database import get_db
 from app.models.api_key import ApiKey
 from app.models.user import User
+from app.services.password_hasher import PasswordHasherBusy, hash_rounds, password_hasher
+from app.services.principal_cache import CachedApiKey, principal_cache
+from app.services.token_revocations import token_revocations
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent logins, retry shortly",
+        headers={"Retry-After": "1"},
+    )
 
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return bcrypt.checkpw(plain.encode(), hashed.encode())
+async def hash_password(password: str) -> str:
+    """bcrypt hash at ``BCRYPT_ROUNDS``, computed off the event loop."""
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
 
 
-def create_access_token(user_id: uuid.UUID) -> str:
-    expire = datetime.now(timezone.utc) + timedelta(minutes=settings.JWT_EXPIRE_MINUTES)
-    payload = {"sub": str(user_id), "exp": expire}
+async def verify_password(plain: str, hashed: str) -> bool:
+    try:
+        return await password_hasher.verify(plain, hashed)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    return hash_rounds(hashed) != settings.BCRYPT_ROUNDS
+
+
+def _encode_token(user_id: uuid.UUID, typ: str, minutes: int, claims: dict | None = None) -> str:
+    # ``iat`` keeps sub-second precision so a token issued right after ``revoke_user`` is not rejected.
+    now = time.time()
+    payload = {"sub": str(user_id), "typ": typ, "jti": uuid.uuid4().hex, "iat": now, "exp": int(now + minutes * 60)}
+    payload.update(claims or {})
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 
+def create_access_token(user_id: uuid.UUID, principal: Principal | None = None) -> str:
+    """Access token; with ``principal`` its role and team ids are embedded and the token is short lived."""
+    if principal is None:
+        return _encode_token(user_id, "access", settings.JWT_EXPIRE_MINUTES)
+    claims = {
+        "username": principal.username,
+        "role": principal.role,
+        "teams": sorted(str(team_id) for team_id in principal.team_ids),
+    }
+    return _encode_token(user_id, "access", settings.JWT_ACCESS_EXPIRE_MINUTES, claims)
+
+
+def create_refresh_token(user_id: uuid.UUID) -> str:
+    return _encode_token(user_id, "refresh", settings.JWT_REFRESH_EXPIRE_MINUTES)
+
+
 def decode_token(token: str) -> dict:
     return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
 
 
-def generate_api_key() -> tuple[str, str]:
-    """Returns (raw_key, key_hash)."""
-    raw_key = f"skh_{secrets.token_urlsafe(32)}"
-    key_hash = hashlib.sha256(raw_key.encode()).hexdigest()
-    return raw_key, key_hash
+def verify_token(token: str, typ: str = "access") -> dict:
+    """Decode ``token`` and check its type and the revocation list. Tokens without ``typ`` are access tokens."""
+    try:
+        payload = decode_token(token)
+        uuid.UUID(payload["sub"])
+    except (JWTError, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    if payload.get("typ", "access") != typ:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
+    if token_revocations.is_revoked(payload):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    return payload
+
+
+API_KEY_PREFIX = "skh_"
+
+
+def generate_api_key(key_id: uuid.UUID) -> tuple[str, str]:
+    """Returns (raw_key, key_hash). The key embeds ``key_id`` so it is looked up by primary key."""
+    raw_key = f"{API_KEY_PREFIX}{key_id.hex}_{secrets.token_urlsafe(32)}"
+    return raw_key, hash_api_key(raw_key)
 
 
 def hash_api_key(raw_key: str) -> str:
     return hashlib.sha256(raw_key.encode()).hexdigest()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
+def parse_api_key_id(raw_key: str) -> uuid.UUID | None:
+    """Key id embedded in a ``skh_<id hex>_<secret>`` key; None for legacy keys without one."""
+    body = raw_key.removeprefix(API_KEY_PREFIX)
+    if len(body) == len(raw_key) or len(body) < 34 or body[32] != "_":
+        return None
+    try:
+        return uuid.UUID(hex=body[:32])
+    except ValueError:
+        return None
+
+
+def _access_token_payload(credentials: HTTPAuthorizationCredentials | None) -> dict:
     if credentials is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    token = credentials.credentials
-    try:
-        payload = decode_token(token)
-        user_id = uuid.UUID(payload["sub"])
-    except (JWTError, ValueError, KeyError):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return verify_token(credentials.credentials)
+
 
+async def _load_user(db: AsyncSession, user_id: uuid.UUID) -> User:
     result = await db.execute(
         select(User).where(User.id == user_id).options(selectinload(User.team_memberships))
     )
@@ -71,66 +133,87 @@ async def get_current_user(
     return user
 
 
-async def get_api_key_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
     db: AsyncSession = Depends(get_db),
 ) -> User:
-    """Authenticate via API Key (Bearer token)."""
-    if credentials is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    payload = _access_token_payload(credentials)
+    return await _load_user(db, uuid.UUID(payload["sub"]))
 
-    key_hash = hash_api_key(credentials.credentials)
-    result = await db.execute(
-        select(ApiKey).where(ApiKey.key_hash == key_hash)
-    )
-    api_key = result.scalar_one_or_none()
-
-    if api_key is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
-
-    if api_key.expires_at and api_key.expires_at < datetime.now(timezone.utc):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="API key expired")
-
-    # Check read scope (all plugin endpoints need at least read)
-    if "read" not in (api_key.scopes or []):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="API key lacks 'read' scope")
 
-    result = await db.execute(
-        select(User).where(User.id == api_key.user_id).options(selectinload(User.team_memberships))
-    )
-    user = result.scalar_one_or_none()
-    if user is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """Authenticated user for read-only endpoints.
+
+    Built from the token claims when the access token embeds them
+    (``JWT_STATELESS``), so no database query is made; otherwise the user is
+    loaded like ``get_current_user``.
+    """
+    payload = _access_token_payload(credentials)
+    user_id = uuid.UUID(payload["sub"])
+    if "role" in payload and "teams" in payload:
+        try:
+            team_ids = frozenset(uuid.UUID(team_id) for team_id in payload["teams"])
+        except (TypeError, ValueError, AttributeError):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        return Principal(id=user_id, username=payload.get("username", ""), role=payload["role"], team_ids=team_ids)
+    return Principal.from_model(await _load_user(db, user_id))
+
+
+async def _load_api_key(db: AsyncSession, raw_key: str, key_hash: str) -> ApiKey | None:
+    """Load an API key with its user and team memberships in one query."""
+    query = select(ApiKey).options(joinedload(ApiKey.user).joinedload(User.team_memberships))
+    key_id = parse_api_key_id(raw_key)
+    if key_id is None:
+        # Legacy keys have no embedded id and are found by their (unique, indexed) hash.
+        query = query.where(ApiKey.key_hash == key_hash)
+    else:
+        query = query.where(ApiKey.id == key_id)
+    api_key = (await db.execute(query)).unique().scalar_one_or_none()
+    if api_key is None or not hmac.compare_digest(api_key.key_hash, key_hash):
+        return None
+    return api_key
 
 
 async def get_api_key_with_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
     db: AsyncSession = Depends(get_db),
-) -> tuple[User, ApiKey]:
-    """Authenticate via API Key and return both user and api_key."""
+) -> tuple[Principal, CachedApiKey]:
+    """Authenticate via API Key and return both user and api_key.
+
+    The principal is served from ``principal_cache`` when possible; expiry and
+    scopes are checked on every request.
+    """
     if credentials is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
     key_hash = hash_api_key(credentials.credentials)
-    result = await db.execute(
-        select(ApiKey).where(ApiKey.key_hash == key_hash)
-    )
-    api_key = result.scalar_one_or_none()
-
-    if api_key is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+    cached = principal_cache.get(key_hash)
+    if cached is None:
+        api_key = await _load_api_key(db, credentials.credentials, key_hash)
+        if api_key is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+        if api_key.user is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        cached = CachedApiKey.from_model(api_key), Principal.from_model(api_key.user)
+        principal_cache.put(key_hash, *cached)
+    api_key, user = cached
 
     if api_key.expires_at and api_key.expires_at < datetime.now(timezone.utc):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="API key expired")
 
-    if "read" not in (api_key.scopes or []):
+    # Check read scope (all plugin endpoints need at least read)
+    if "read" not in api_key.scopes:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="API key lacks 'read' scope")
-
-    result = await db.execute(
-        select(User).where(User.id == api_key.user_id).options(selectinload(User.team_memberships))
-    )
-    user = result.scalar_one_or_none()
-    if user is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user, api_key
+
+
+async def get_api_key_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """Authenticate via API Key (Bearer token)."""
+    user, _ = await get_api_key_with_user(credentials, db)
+    return user
@@ -8,6 +8,7 @@ from app.config import settings
 from app.core.security import hash_password
 from app.database import async_session, engine, Base
 from app.models import *  # noqa: F401, F403 - ensure all models are loaded
+from app.services.usage_writer import usage_writer
 
 
 async def create_default_admin():
@@ -18,7 +19,7 @@ async def create_default_admin():
             admin = User(
                 username=settings.DEFAULT_ADMIN_USERNAME,
                 email=settings.DEFAULT_ADMIN_EMAIL,
-                password_hash=hash_password(settings.DEFAULT_ADMIN_PASSWORD),
+                password_hash=await hash_password(settings.DEFAULT_ADMIN_PASSWORD),
                 role="admin",
             )
             db.add(admin)
@@ -31,7 +32,9 @@ async def lifespan(app: FastAPI):
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
         await create_default_admin()
+    usage_writer.start(async_session)
     yield
+    await usage_writer.stop()
 
 
 app = FastAPI(title="Skills Hub", version="0.1.0", lifespan=lifespan)
@@ -1,14 +1,17 @@
 from app.models.user import User
 from app.models.team import Team
 from app.models.team_member import TeamMember
-from app.models.skill import Skill, SkillVersion, SkillFile, SkillVisibilityTeam
+from app.models.skill import Skill, SkillVersion, SkillFile, SkillTag, SkillVisibilityTeam, UserVisibleSkill
 from app.models.subscription import SkillSubscription
 from app.models.api_key import ApiKey
 from app.models.category import Category
 from app.models.usage_log import SkillUsageLog
 from app.models.edit_log import SkillEditLog
+from app.models.change_event import SkillChangeEvent
+from app.models.revoked_token import RevokedRefreshToken
 
 __all__ = [
-    "User", "Team", "TeamMember", "Skill", "SkillVersion", "SkillFile", "SkillVisibilityTeam",
-    "SkillSubscription", "ApiKey", "Category", "SkillUsageLog", "SkillEditLog",
+    "User", "Team", "TeamMember", "Skill", "SkillVersion", "SkillFile", "SkillTag", "SkillVisibilityTeam",
+    "UserVisibleSkill", "SkillSubscription", "ApiKey", "Category", "SkillUsageLog", "SkillEditLog",
+    "SkillChangeEvent", "RevokedRefreshToken",
 ]
@@ -12,7 +12,7 @@ class ApiKey(Base):
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("users.id", ondelete="CASCADE"))
-    key_hash: Mapped[str] = mapped_column(String(255))
+    key_hash: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     key_encrypted: Mapped[str | None] = mapped_column(String(500), nullable=True)
     name: Mapped[str] = mapped_column(String(100))
     scopes: Mapped[list[str]] = mapped_column(JSON, default=lambda: ["read"])
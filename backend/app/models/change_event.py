@@ -0,0 +1,31 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, Uuid, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class SkillChangeEvent(Base):
+    """Ordered feed of catalog-affecting changes, streamed to plugins over SSE.
+
+    Skill-scoped events (``user_id`` NULL) go to the skill's subscribers;
+    user-scoped events go to that user only.
+    """
+
+    __tablename__ = "skill_change_events"
+    __table_args__ = (
+        Index("ix_skill_change_events_skill_id_id", "skill_id", "id"),
+        Index("ix_skill_change_events_user_id_id", "user_id", "id"),
+    )
+
+    # Monotonic sequence number, used as the SSE event id.
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event_type: Mapped[str] = mapped_column(String(30))  # version_published / skill_updated / skill_deleted / subscribed / unsubscribed / access_changed / access_revoked
+    skill_id: Mapped[uuid.UUID | None] = mapped_column(Uuid, nullable=True)  # no FK: events outlive deleted skills
+    skill_name: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    user_id: Mapped[uuid.UUID | None] = mapped_column(Uuid, nullable=True)
+    version: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    digest: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -24,7 +24,7 @@ class SkillEditLog(Base):
     target_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
     from_version: Mapped[str | None] = mapped_column(String(50), nullable=True)
     to_version: Mapped[str | None] = mapped_column(String(50), nullable=True)
-    detail: Mapped[str | None] = mapped_column(Text, nullable=True)
+    detail: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True, deferred_raiseload=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     skill = relationship("Skill")
@@ -0,0 +1,22 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import String, ForeignKey, DateTime, func, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class RevokedRefreshToken(Base):
+    """Refresh tokens that were rotated or logged out, kept until they expire.
+
+    Refresh tokens are long lived, so their revocation is shared by all workers
+    through this table instead of the in-process list used for access tokens.
+    """
+
+    __tablename__ = "revoked_refresh_tokens"
+
+    jti: Mapped[str] = mapped_column(String(64), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("users.id", ondelete="CASCADE"))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)  # pruned after this
+    revoked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -1,14 +1,20 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import String, Text, ForeignKey, DateTime, Boolean, func, JSON, Uuid, UniqueConstraint
+from sqlalchemy import DDL, String, Text, ForeignKey, DateTime, Boolean, event, func, Index, JSON, Uuid, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
+from app.utils.compression import CompressedText
+from app.utils.sql import TSVector
 
 
 class Skill(Base):
     __tablename__ = "skills"
+    __table_args__ = (
+        Index("ix_skills_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index("ix_skills_updated_at_id", "updated_at", "id"),  # keyset pagination of GET /api/skills
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(100), unique=True, index=True)  # kebab-case
@@ -20,15 +26,50 @@ class Skill(Base):
     author_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("users.id"))
     visibility: Mapped[str] = mapped_column(String(20), default="public")  # public / team / private
     is_published: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Denormalized pointer to the newest version, maintained by create_version.
+    latest_version_id: Mapped[uuid.UUID | None] = mapped_column(
+        Uuid,
+        ForeignKey("skill_versions.id", ondelete="SET NULL", use_alter=True, name="fk_skills_latest_version_id"),
+        nullable=True,
+    )
+    # Weighted full-text document (PostgreSQL), maintained by app.services.skill_search.
+    search_vector: Mapped[str | None] = mapped_column(TSVector, nullable=True, deferred=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     author = relationship("User", back_populates="skills")
     team = relationship("Team", back_populates="skills")
     category = relationship("Category")
-    versions = relationship("SkillVersion", back_populates="skill", cascade="all, delete-orphan", order_by="SkillVersion.created_at.desc()")
+    versions = relationship(
+        "SkillVersion", back_populates="skill", cascade="all, delete-orphan",
+        foreign_keys="SkillVersion.skill_id", order_by="SkillVersion.created_at.desc()",
+    )
+    latest_version = relationship("SkillVersion", foreign_keys=[latest_version_id], viewonly=True)
     subscriptions = relationship("SkillSubscription", back_populates="skill", cascade="all, delete-orphan")
     visibility_teams = relationship("SkillVisibilityTeam", back_populates="skill", cascade="all, delete-orphan")
+    tag_rows = relationship("SkillTag", cascade="all, delete-orphan")
+
+
+# SQLite has no tsvector: full-text search goes through this FTS5 table instead.
+event.listen(
+    Skill.__table__, "after_create",
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS skills_fts USING fts5("
+        "skill_id UNINDEXED, name, display_name, tags, description, body, tokenize = 'unicode61 remove_diacritics 2')"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(Skill.__table__, "before_drop", DDL("DROP TABLE IF EXISTS skills_fts").execute_if(dialect="sqlite"))
+
+
+class SkillTag(Base):
+    """Indexable copy of ``Skill.tags``, one row per tag; maintained by app.services.tags."""
+
+    __tablename__ = "skill_tags"
+    __table_args__ = (
+        Index("ix_skill_tags_tag_skill_id", "tag", "skill_id"),
+    )
+    skill_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)
+    tag: Mapped[str] = mapped_column(String(255), primary_key=True)
 
 
 class SkillVisibilityTeam(Base):
@@ -40,6 +81,17 @@ class SkillVisibilityTeam(Base):
     team = relationship("Team", back_populates="visible_skills")
 
 
+class UserVisibleSkill(Base):
+    """Skills a user can see through team membership; maintained by app.services.visible_skills."""
+
+    __tablename__ = "user_visible_skills"
+    __table_args__ = (
+        Index("ix_user_visible_skills_skill_id", "skill_id"),
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    skill_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)
+
+
 class SkillVersion(Base):
     __tablename__ = "skill_versions"
     __table_args__ = (
@@ -49,13 +101,16 @@ class SkillVersion(Base):
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
     skill_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("skills.id", ondelete="CASCADE"))
     version: Mapped[str] = mapped_column(String(50))  # semver
-    content: Mapped[str] = mapped_column(Text)  # SKILL.md full text
-    metadata_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Large columns are only loaded when asked for (undefer/load_only or a column select).
+    content: Mapped[str] = mapped_column(CompressedText, deferred=True, deferred_raiseload=True)  # SKILL.md full text
+    content_digest: Mapped[str] = mapped_column(String(64), index=True)  # sha256 of SKILL.md
+    digest: Mapped[str] = mapped_column(String(64), index=True)  # sha256 over SKILL.md + all files
+    metadata_json: Mapped[dict | None] = mapped_column(JSON, nullable=True, deferred=True, deferred_raiseload=True)
     changelog: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     published_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
-    skill = relationship("Skill", back_populates="versions")
+    skill = relationship("Skill", back_populates="versions", foreign_keys=[skill_id])
     files = relationship("SkillFile", back_populates="version", cascade="all, delete-orphan")
 
 
@@ -65,7 +120,8 @@ class SkillFile(Base):
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
     skill_version_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("skill_versions.id", ondelete="CASCADE"))
     path: Mapped[str] = mapped_column(String(500))
-    content: Mapped[str] = mapped_column(Text)
+    content: Mapped[str] = mapped_column(CompressedText, deferred=True, deferred_raiseload=True)
+    content_digest: Mapped[str] = mapped_column(String(64), index=True)  # sha256 of content
     file_type: Mapped[str | None] = mapped_column(String(50), nullable=True)
 
     version = relationship("SkillVersion", back_populates="files")
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import String, DateTime, func, Uuid
+from sqlalchemy import Integer, String, DateTime, func, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -15,9 +15,15 @@ class User(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     password_hash: Mapped[str] = mapped_column(String(255))
     role: Mapped[str] = mapped_column(String(20), default="member")  # admin / member
+    catalog_revision: Mapped[int] = mapped_column(Integer, default=0, server_default="0")  # bumped when plugin catalog changes
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     team_memberships = relationship("TeamMember", back_populates="user", cascade="all, delete-orphan")
     subscriptions = relationship("SkillSubscription", back_populates="user", cascade="all, delete-orphan")
     skills = relationship("Skill", back_populates="author")
     api_keys = relationship("ApiKey", back_populates="user")
+
+    @property
+    def team_ids(self) -> set[uuid.UUID]:
+        """IDs of the teams the user belongs to (``team_memberships`` must be loaded)."""
+        return {tm.team_id for tm in (self.team_memberships or [])}
@@ -3,7 +3,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class VisibilityEnum(str, Enum):
@@ -56,9 +56,16 @@ class SkillResponse(BaseModel):
     subscription_enabled: bool | None = None
 
 
+class TagFacet(BaseModel):
+    tag: str
+    count: int
+
+
 class SkillListResponse(BaseModel):
     items: list[SkillResponse]
-    total: int
+    total: int | None  # None with total=none
+    next_cursor: str | None = None
+    tag_facets: list[TagFacet] | None = None  # only with facets=true
 
 
 class VersionCreate(BaseModel):
@@ -73,7 +80,9 @@ class VersionResponse(BaseModel):
     id: uuid.UUID
     skill_id: uuid.UUID
     version: str
-    content: str
+    content: str | None = None  # None when left out by list_versions summary/fields
+    content_digest: str | None = None
+    digest: str | None = None
     changelog: str | None = None
     metadata_json: dict | None = None
     created_at: datetime
@@ -126,31 +135,60 @@ class ApiKeyCreatedResponse(ApiKeyResponse):
 
 
 # Plugin API schemas
+class LockedSkill(BaseModel):
+    name: str
+    version: str
+    digest: str
+
+
+class LockRequest(BaseModel):
+    skills: list[str] = Field(min_length=1, max_length=200)  # ["skill-a", "skill-b@^1.2"]
+
+
+class LockResponse(BaseModel):
+    skills: list[LockedSkill]
+    unresolved: list[str] = []  # specs that matched no accessible version
+
+
 class ResolveRequest(BaseModel):
-    skills: list[str] = Field(min_length=1, max_length=50)  # ["skill-a", "skill-b@1.2.0"]
+    skills: list[str] = Field(default=[], max_length=50)  # ["skill-a", "skill-b@1.2.0"]
+    lock: list[LockedSkill] = Field(default=[], max_length=50)  # lockfile mode, instead of skills
+    known: dict[str, str] = {}  # spec -> version or digest the client already holds for it (delta mode)
+
+    @model_validator(mode="after")
+    def _skills_or_lock(self):
+        if bool(self.skills) == bool(self.lock):
+            raise ValueError("Exactly one of 'skills' or 'lock' must be given")
+        return self
 
 
 class ResolvedSkill(BaseModel):
     name: str
     version: str
+    digest: str | None = None
     description: str | None = None
+    spec: str | None = None  # the requested spec this answers (not set in lock mode)
     content: str
     files: dict[str, str] = {}
 
 
 class ResolveResponse(BaseModel):
     skills: list[ResolvedSkill]
+    unchanged: list[str] = []  # known specs whose copy is still current
+    revoked: list[str] = []  # known specs whose skill is no longer accessible (names in lock mode)
 
 
 class CatalogItem(BaseModel):
     name: str
     description: str | None = None
     version: str
+    digest: str | None = None
     tags: list[str] = []
 
 
 class CatalogResponse(BaseModel):
     skills: list[CatalogItem]
+    next_cursor: str | None = None  # set when a paginated catalog has more skills
 
 
 class TeamCreate(BaseModel):
@@ -0,0 +1,70 @@
+"""Downloadable tar.gz bundles of skill versions, stored under STORAGE_PATH.
+
+A bundle holds SKILL.md plus every attached file at the archive root. It is
+built deterministically (sorted entries, zeroed timestamps and owners), so
+the same version digest always yields the same bytes and the file can be
+keyed by digest and shared between skills with identical content.
+"""
+
+import asyncio
+import gzip
+import io
+import os
+import tarfile
+import tempfile
+from pathlib import Path
+
+from app.config import settings
+from app.services.version_cache import CachedVersion
+
+
+def bundle_path(digest: str) -> Path:
+    return Path(settings.STORAGE_PATH) / "bundles" / digest[:2] / f"{digest}.tar.gz"
+
+
+def _add_file(tar: tarfile.TarFile, path: str, content: str):
+    data = content.encode()
+    info = tarfile.TarInfo(path)
+    info.size = len(data)
+    info.mode = 0o644
+    info.mtime = 0
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    tar.addfile(info, io.BytesIO(data))
+
+
+def build_bundle(version: CachedVersion) -> bytes:
+    """Deterministic tar.gz of SKILL.md and the version's files."""
+    buf = io.BytesIO()
+    with gzip.GzipFile(filename="", mode="wb", fileobj=buf, mtime=0) as gz:
+        with tarfile.open(fileobj=gz, mode="w", format=tarfile.PAX_FORMAT) as tar:
+            _add_file(tar, "SKILL.md", version.content)
+            for path in sorted(version.files):
+                if path != "SKILL.md":
+                    _add_file(tar, path, version.files[path])
+    return buf.getvalue()
+
+
+def _write_bundle(version: CachedVersion) -> Path:
+    path = bundle_path(version.digest)
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temp file and rename, so concurrent builders never expose a partial bundle.
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(build_bundle(version))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+async def ensure_bundle(version: CachedVersion) -> Path:
+    """Path of the version's bundle, building it off the event loop on first use."""
+    path = bundle_path(version.digest)
+    if path.exists():
+        return path
+    return await asyncio.to_thread(_write_bundle, version)
@@ -0,0 +1,60 @@
+"""Per-user plugin catalog revisions and ETag helpers."""
+
+import hashlib
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.subscription import SkillSubscription
+from app.models.user import User
+from app.services.catalog_cache import catalog_cache
+
+
+async def bump_catalog_revision(db: AsyncSession, *, user_ids=(), skill_id=None):
+    """Bump the catalog revision of the given users and/or all subscribers of a skill.
+
+    Must be called inside the transaction that changes a catalog input
+    (publish, subscription, visibility, team membership). Cached catalogs of
+    the bumped users are dropped from this worker's ``catalog_cache``.
+    """
+    conditions = []
+    if user_ids:
+        conditions.append(User.id.in_(list(user_ids)))
+    if skill_id is not None:
+        conditions.append(
+            User.id.in_(select(SkillSubscription.user_id).where(SkillSubscription.skill_id == skill_id))
+        )
+    if not conditions:
+        return
+    result = await db.execute(
+        update(User)
+        .where(or_(*conditions))
+        .values(catalog_revision=User.catalog_revision + 1)
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    )
+    catalog_cache.invalidate(result.scalars().all())
+
+
+async def get_catalog_revision(db: AsyncSession, user_id) -> int:
+    result = await db.execute(select(User.catalog_revision).where(User.id == user_id))
+    return result.scalar() or 0
+
+
+def catalog_etag(user_id, revision: int, variant: str = "") -> str:
+    """Strong ETag for a user's catalog at the given revision.
+
+    ``variant`` identifies a filtered or paginated view of the catalog.
+    """
+    suffix = f"-{hashlib.sha256(variant.encode()).hexdigest()[:8]}" if variant else ""
+    return f'"{user_id.hex[:12]}-{revision}{suffix}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
@@ -0,0 +1,90 @@
+"""In-process cache of encoded plugin catalogs, one entry per user.
+
+An entry is tagged with the user's ``catalog_revision`` when it was built and
+holds one body per variant (API keys with different ``allowed_tags`` see
+different catalogs). ``bump_catalog_revision`` moves that revision whenever
+an input of the catalog changes, so a stale entry is never served by any
+worker; the worker that bumps also drops the affected entries right away to
+free memory.
+"""
+
+import uuid
+from collections import OrderedDict
+
+from app.config import settings
+
+
+class CatalogCache:
+    """LRU of ``user_id -> (catalog_revision, {variant: CatalogResponse JSON bytes})``."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[uuid.UUID, tuple[int, dict[str, bytes]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.invalidated_users = 0
+        self.invalidated_entries = 0
+        self.max_fanout = 0
+
+    def get(self, user_id: uuid.UUID, revision: int, variant: str = "") -> bytes | None:
+        entry = self._entries.get(user_id)
+        body = entry[1].get(variant) if entry is not None and entry[0] == revision else None
+        if body is None:
+            if entry is not None and entry[0] != revision:
+                self.stale += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return body
+
+    def put(self, user_id: uuid.UUID, revision: int, body: bytes, variant: str = ""):
+        if self.max_entries <= 0:
+            return
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] != revision:
+            entry = (revision, {})
+            self._entries[user_id] = entry
+        entry[1][variant] = body
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_ids):
+        """Drop the entries of users whose catalog revision was just bumped."""
+        fanout = 0
+        for user_id in user_ids:
+            fanout += 1
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidated_entries += 1
+        self.invalidations += 1
+        self.invalidated_users += fanout
+        self.max_fanout = max(self.max_fanout, fanout)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": sum(len(body) for _, bodies in self._entries.values() for body in bodies.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "invalidated_users": self.invalidated_users,
+            "invalidated_entries": self.invalidated_entries,
+            "max_fanout": self.max_fanout,
+            "avg_fanout": round(self.invalidated_users / self.invalidations, 2) if self.invalidations else 0.0,
+        }
+
+
+catalog_cache = CatalogCache(settings.CATALOG_CACHE_MAX_ENTRIES)
@@ -0,0 +1,225 @@
+"""Catalog change events for the plugin SSE feed (``GET /api/v1/skills/events``).
+
+Events are recorded in the same transaction as the change that causes them,
+next to ``bump_catalog_revision``; their autoincrement id is the SSE event id,
+so clients resume with ``Last-Event-ID`` after a disconnect.
+
+Ids are taken from a sequence when the row is inserted, not when it commits,
+so on PostgreSQL event 12 can become visible before event 11. Readers only
+advance past ids that are committed, or whose gap this worker has watched
+stay open for ``EVENTS_GAP_TIMEOUT_SECONDS`` (the transaction rolled back and
+the id is never used); see :func:`settled_event_id`. Gaps are timed from when
+they are first seen, not by ``created_at``: that is the transaction's start
+time on PostgreSQL, so a later event can look old while an earlier id is
+still uncommitted.
+"""
+
+import json
+import time
+from collections import OrderedDict
+
+from sqlalchemy import and_, exists, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.permissions import skill_access_filter
+from app.models.change_event import SkillChangeEvent
+from app.models.skill import Skill, UserVisibleSkill
+from app.models.subscription import SkillSubscription
+from app.models.user import User
+from app.services.resolver import allowed_tags_filter
+
+FETCH_LIMIT = 200
+
+
+class EventGaps:
+    """When this worker first saw each gap in the event ids, shared by all readers.
+
+    A gap is keyed by its first missing id. Entries are kept after the gap
+    fills or times out, so later readers pass a rolled-back id at once; the
+    oldest are dropped beyond ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._first_seen: OrderedDict[int, float] = OrderedDict()
+
+    def age(self, missing_id: int, now: float) -> float:
+        """Seconds since the gap starting at ``missing_id`` was first seen (0 the first time)."""
+        first_seen = self._first_seen.setdefault(missing_id, now)
+        while len(self._first_seen) > self.max_entries:
+            self._first_seen.popitem(last=False)
+        return now - first_seen
+
+    def clear(self):
+        self._first_seen.clear()
+
+    def stats(self) -> dict:
+        return {"gaps": len(self._first_seen), "max_entries": self.max_entries}
+
+
+event_gaps = EventGaps()
+
+
+def record_change(
+    db: AsyncSession,
+    event_type: str,
+    *,
+    skill: Skill | None = None,
+    user_ids=(),
+    version: str | None = None,
+    digest: str | None = None,
+):
+    """Add a change event: skill-scoped if no ``user_ids`` are given, else one per user."""
+    fields = {
+        "event_type": event_type,
+        "skill_id": skill.id if skill else None,
+        "skill_name": skill.name if skill else None,
+        "version": version,
+        "digest": digest,
+    }
+    if not user_ids:
+        db.add(SkillChangeEvent(**fields))
+    for user_id in user_ids:
+        db.add(SkillChangeEvent(user_id=user_id, **fields))
+
+
+async def record_skill_deleted(db: AsyncSession, skill: Skill):
+    """Tell every subscriber that a skill is gone; subscriptions are deleted with it."""
+    result = await db.execute(
+        select(SkillSubscription.user_id).where(
+            SkillSubscription.skill_id == skill.id,
+            SkillSubscription.enabled == True,
+        )
+    )
+    record_change(db, "skill_deleted", skill=skill, user_ids=[row[0] for row in result.all()])
+
+
+async def subscribers_with_access(db: AsyncSession, skill_id) -> set:
+    """Enabled subscribers of a skill who can currently access it.
+
+    Per-skill counterpart of ``skill_access_filter``. Call it before and after
+    a visibility or team change and pass the first result to
+    :func:`record_access_revoked`.
+    """
+    result = await db.execute(
+        select(SkillSubscription.user_id)
+        .join(User, User.id == SkillSubscription.user_id)
+        .join(Skill, Skill.id == SkillSubscription.skill_id)
+        .where(
+            SkillSubscription.skill_id == skill_id,
+            SkillSubscription.enabled == True,
+            or_(
+                User.role == "admin",
+                Skill.visibility == "public",
+                Skill.author_id == User.id,
+                and_(
+                    Skill.visibility == "team",
+                    exists().where(UserVisibleSkill.user_id == User.id, UserVisibleSkill.skill_id == Skill.id),
+                ),
+            ),
+        )
+    )
+    return set(result.scalars().all())
+
+
+async def record_access_revoked(db: AsyncSession, skill: Skill, readers: set):
+    """Tell subscribers in ``readers`` who can no longer access ``skill`` that it is gone for them.
+
+    Skill-scoped events are filtered by the reader's current access, so without
+    this they would never learn about the change. ``user_visible_skills`` must
+    already be refreshed.
+    """
+    if readers:
+        await db.flush()
+        lost = readers - await subscribers_with_access(db, skill.id)
+        record_change(db, "access_revoked", skill=skill, user_ids=sorted(lost))
+
+
+async def settled_event_id(db: AsyncSession, after_id: int, limit: int | None = FETCH_LIMIT) -> int:
+    """The highest id a cursor at ``after_id`` can move to without skipping an uncommitted event.
+
+    Scans up to ``limit`` ids after ``after_id`` and stops before the first gap
+    that has not been open for ``EVENTS_GAP_TIMEOUT_SECONDS``. Every gap in the
+    scan starts its clock now, so a run of rolled-back ids times out together.
+    """
+    query = select(SkillChangeEvent.id).where(SkillChangeEvent.id > after_id).order_by(SkillChangeEvent.id)
+    if limit is not None:
+        query = query.limit(limit)
+    now = time.monotonic()
+    settled = previous = after_id
+    blocked = False
+    for event_id in (await db.execute(query)).scalars():
+        if event_id != previous + 1 and event_gaps.age(previous + 1, now) < settings.EVENTS_GAP_TIMEOUT_SECONDS:
+            blocked = True
+        if not blocked:
+            settled = event_id
+        previous = event_id
+    return settled
+
+
+async def latest_event_id(db: AsyncSession) -> int:
+    """The current feed position, for clients connecting without ``Last-Event-ID``.
+
+    The last ``FETCH_LIMIT`` ids are checked for gaps that may still fill, so
+    the position can be a little behind the newest id.
+    """
+    recent = select(SkillChangeEvent.id).order_by(SkillChangeEvent.id.desc()).limit(FETCH_LIMIT).subquery()
+    start = (await db.execute(select(func.min(recent.c.id)))).scalar()
+    if start is None:
+        return 0
+    return await settled_event_id(db, start, limit=None)
+
+
+async def fetch_events(
+    db: AsyncSession, user: User, after_id: int, allowed_tags=()
+) -> tuple[list[SkillChangeEvent], int]:
+    """Events relevant to ``user`` after ``after_id``, and the id to resume from.
+
+    Only events up to :func:`settled_event_id` are considered. Skill-scoped
+    events are only delivered for published skills the user is subscribed to
+    and can still access, within the API key's ``allowed_tags``.
+    """
+    settled = await settled_event_id(db, after_id)
+    if settled == after_id:
+        return [], after_id
+    subscribed = select(SkillSubscription.skill_id).where(
+        SkillSubscription.user_id == user.id,
+        SkillSubscription.enabled == True,
+    )
+    result = await db.execute(
+        select(SkillChangeEvent)
+        .where(
+            SkillChangeEvent.id > after_id,
+            SkillChangeEvent.id <= settled,
+            or_(
+                SkillChangeEvent.user_id == user.id,
+                and_(SkillChangeEvent.user_id.is_(None), SkillChangeEvent.skill_id.in_(subscribed)),
+            ),
+        )
+        .order_by(SkillChangeEvent.id)
+    )
+    events = result.scalars().all()
+    if not events:
+        return [], settled
+
+    skill_ids = {e.skill_id for e in events if e.user_id is None}
+    visible = set()
+    if skill_ids:
+        query = select(Skill.id).where(
+            Skill.id.in_(skill_ids), Skill.is_published == True, skill_access_filter(user)
+        )
+        skills = await db.execute(allowed_tags_filter(query, allowed_tags))
+        visible = set(skills.scalars().all())
+    delivered = [e for e in events if e.user_id is not None or e.skill_id in visible]
+    return delivered, settled
+
+
+def format_event(event: SkillChangeEvent) -> bytes:
+    data = json.dumps({
+        "skill": event.skill_name,
+        "version": event.version,
+        "digest": event.digest,
+        "created_at": event.created_at.isoformat() if event.created_at else None,
+    }, separators=(",", ":"))
+    return f"id: {event.id}\nevent: {event.event_type}\ndata: {data}\n\n".encode()
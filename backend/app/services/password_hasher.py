@@ -0,0 +1,90 @@
+"""Bounded thread pool for bcrypt.
+
+bcrypt burns hundreds of milliseconds of CPU per call by design. Run inline
+in an async handler it stalls every other request on the worker, so password
+hashing and verification go to a small dedicated pool instead (bcrypt releases
+the GIL while it works). At most ``BCRYPT_MAX_CONCURRENCY`` calls run at once;
+a caller waits up to ``BCRYPT_QUEUE_TIMEOUT`` seconds for a slot and then gets
+:class:`PasswordHasherBusy`, so a login burst cannot queue unbounded work.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from app.config import settings
+
+
+class PasswordHasherBusy(Exception):
+    """No hashing slot became free within the queue timeout."""
+
+
+def hash_password_sync(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def verify_password_sync(plain: str, hashed: str) -> bool:
+    return bcrypt.checkpw(plain.encode(), hashed.encode())
+
+
+def hash_rounds(hashed: str) -> int | None:
+    """Cost factor of a ``$2b$<rounds>$...`` hash, or None if it cannot be read."""
+    parts = hashed.split("$")
+    try:
+        return int(parts[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    def __init__(self, max_concurrency: int, queue_timeout: float):
+        self.max_concurrency = max(1, max_concurrency)
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="bcrypt")
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_wait = 0.0
+
+    async def _run(self, fn, *args):
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except TimeoutError:
+            self.rejected += 1
+            raise PasswordHasherBusy() from None
+        finally:
+            self.waiting -= 1
+        self.max_wait = max(self.max_wait, time.monotonic() - started)
+        self.active += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self._slots.release()
+
+    async def hash(self, password: str, rounds: int | None = None) -> str:
+        return await self._run(hash_password_sync, password, rounds or settings.BCRYPT_ROUNDS)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(verify_password_sync, plain, hashed)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_timeout": self.queue_timeout,
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "max_wait_seconds": round(self.max_wait, 4),
+        }
+
+
+password_hasher = PasswordHasher(settings.BCRYPT_MAX_CONCURRENCY, settings.BCRYPT_QUEUE_TIMEOUT)
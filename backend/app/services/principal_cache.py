@@ -0,0 +1,104 @@
+"""In-process TTL cache of authenticated API-key principals.
+
+Plugin requests authenticate with an API key on every call. The resolved key
+(scopes, tag restriction, expiry) and its user (role, team ids) are cached by
+key hash for ``API_KEY_CACHE_TTL`` seconds, so a warm request does not touch
+the database before the endpoint runs. The worker that deletes or updates a
+key, or changes a team membership, drops the affected entries right away;
+other workers pick the change up when their entry expires.
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.config import settings
+from app.core.principal import Principal
+from app.models.api_key import ApiKey
+
+
+@dataclass(frozen=True, slots=True)
+class CachedApiKey:
+    id: uuid.UUID
+    user_id: uuid.UUID
+    scopes: tuple[str, ...]
+    allowed_tags: tuple[str, ...]
+    expires_at: datetime | None
+
+    @classmethod
+    def from_model(cls, api_key: ApiKey) -> "CachedApiKey":
+        return cls(
+            id=api_key.id,
+            user_id=api_key.user_id,
+            scopes=tuple(api_key.scopes or ()),
+            allowed_tags=tuple(api_key.allowed_tags or ()),
+            expires_at=api_key.expires_at,
+        )
+
+
+class PrincipalCache:
+    """LRU of ``key_hash -> (deadline, CachedApiKey, Principal)`` with a fixed TTL."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, CachedApiKey, Principal]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidated = 0
+
+    def get(self, key_hash: str) -> tuple[CachedApiKey, Principal] | None:
+        entry = self._entries.get(key_hash)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key_hash]
+            self.expired += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key_hash)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def put(self, key_hash: str, api_key: CachedApiKey, user: Principal):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key_hash] = (time.monotonic() + self.ttl, api_key, user)
+        self._entries.move_to_end(key_hash)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _drop(self, predicate):
+        stale = [key_hash for key_hash, (_, api_key, user) in self._entries.items() if predicate(api_key, user)]
+        for key_hash in stale:
+            del self._entries[key_hash]
+        self.invalidated += len(stale)
+
+    def invalidate_key(self, key_id: uuid.UUID):
+        self._drop(lambda api_key, _: api_key.id == key_id)
+
+    def invalidate_users(self, user_ids):
+        user_ids = set(user_ids)
+        self._drop(lambda _, user: user.id in user_ids)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "invalidated": self.invalidated,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+principal_cache = PrincipalCache(settings.API_KEY_CACHE_TTL, settings.API_KEY_CACHE_MAX_ENTRIES)
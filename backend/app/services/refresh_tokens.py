@@ -0,0 +1,35 @@
+"""Single-use refresh tokens, enforced through the ``revoked_refresh_tokens`` table.
+
+A refresh token is consumed by ``POST /api/auth/refresh`` (rotation) or
+revoked by logout. Either way its ``jti`` is inserted; the primary key makes
+the first insert win, so two workers racing to rotate the same token cannot
+both succeed. Rows are pruned once the token would have expired anyway.
+"""
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.revoked_token import RevokedRefreshToken
+
+
+async def revoke_refresh_token(db: AsyncSession, payload: dict) -> bool:
+    """Record the verified refresh token ``payload`` as used; False if it already was.
+
+    The caller commits.
+    """
+    now = datetime.now(timezone.utc)
+    await db.execute(delete(RevokedRefreshToken).where(RevokedRefreshToken.expires_at <= now))
+    try:
+        async with db.begin_nested():
+            db.add(RevokedRefreshToken(
+                jti=payload["jti"],
+                user_id=uuid.UUID(payload["sub"]),
+                expires_at=datetime.fromtimestamp(payload["exp"], timezone.utc),
+            ))
+    except IntegrityError:
+        return False
+    return True
@@ -0,0 +1,225 @@
+"""Batched skill resolution for the plugin API.
+
+Resolves a list of ``name`` / ``name@version`` / ``name@<range>`` specs in a
+constant number of queries, independent of how many specs are requested.
+Ranges are answered from the in-memory version index and version bodies from
+the shared version cache; only cache misses are read from the database.
+"""
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.core.permissions import skill_access_filter
+from app.models.skill import Skill, SkillVersion
+from app.models.subscription import SkillSubscription
+from app.models.user import User
+from app.services.tags import tagged
+from app.services.version_cache import CachedVersion, load_versions
+from app.services.version_index import version_index
+from app.utils.semver import max_satisfying, parse_range
+from app.utils.skill_parser import validate_semver
+
+
+def parse_spec(spec: str) -> tuple[str, str | None]:
+    """Split "skill-name", "skill-name@1.2.0" or "skill-name@^1.2" into (name, version or range)."""
+    if "@" in spec:
+        name, ver = spec.split("@", 1)
+        return name, ver
+    return spec, None
+
+
+def parse_version_range(ver: str):
+    """Comparator sets for a range spec, or None if ``ver`` is an exact version (or not a valid range)."""
+    if validate_semver(ver):
+        return None
+    try:
+        return parse_range(ver)
+    except ValueError:
+        return None
+
+
+async def pick_version(db: AsyncSession, skill: Skill, ver: str | None) -> str | None:
+    """Version number a single spec resolves to: latest, exact, or highest in range.
+
+    Exact versions are returned as-is and not checked for existence.
+    """
+    if not ver:
+        return skill.latest_version.version if skill.latest_version else None
+    ranges = parse_version_range(ver)
+    if ranges is None:
+        return ver
+    match = max_satisfying((await version_index.get(db, [skill]))[skill.id], ranges)
+    return match[1] if match else None
+
+
+def is_known_version(known: str | None, version: CachedVersion) -> bool:
+    """Whether the client's known version or digest matches the resolved version."""
+    return known is not None and known in (version.version, version.digest)
+
+
+async def get_subscribed_skill_ids(db: AsyncSession, user: User) -> set:
+    """Get IDs of skills the user has an enabled subscription for."""
+    result = await db.execute(
+        select(SkillSubscription.skill_id).where(
+            SkillSubscription.user_id == user.id,
+            SkillSubscription.enabled == True,
+        )
+    )
+    return {row[0] for row in result.all()}
+
+
+def latest_version_summary():
+    """Loader option for ``Skill.latest_version`` that fetches only its number and digest.
+
+    Listing paths use this so they never read version bodies.
+    """
+    return joinedload(Skill.latest_version).load_only(SkillVersion.version, SkillVersion.digest)
+
+
+def allowed_tags_filter(query, allowed_tags):
+    """Restrict a Skill query to an API key's ``allowed_tags``; an empty list allows every tag."""
+    if allowed_tags:
+        query = query.where(tagged(allowed_tags))
+    return query
+
+
+async def get_accessible_skills(db: AsyncSession, user: User, names, allowed_tags=()) -> dict[str, Skill]:
+    """Published, subscribed and accessible skills by name, with their latest version summary.
+
+    ``allowed_tags`` is the calling API key's tag restriction, if any.
+    """
+    subscribed_skill_ids = await get_subscribed_skill_ids(db, user)
+    if not subscribed_skill_ids:
+        return {}
+
+    query = (
+        select(Skill)
+        .where(
+            Skill.name.in_(set(names)),
+            Skill.is_published == True,
+            Skill.id.in_(subscribed_skill_ids),
+            skill_access_filter(user),
+        )
+        .options(latest_version_summary())
+    )
+    result = await db.execute(allowed_tags_filter(query, allowed_tags))
+    return {skill.name: skill for skill in result.scalars().all()}
+
+
+async def plan_specs(
+    db: AsyncSession,
+    user: User,
+    specs: list[str],
+    allowed_tags=(),
+) -> list[tuple[str, Skill | None, str | None]]:
+    """``(spec, skill, version number)`` per spec, in request order, without loading version bodies.
+
+    ``skill`` is None when the skill does not exist, is not subscribed or is
+    not accessible; the version is None when nothing matches. Pinned version
+    numbers are not checked.
+    """
+    parsed = [parse_spec(spec) for spec in specs]
+    skills_by_name = await get_accessible_skills(db, user, [name for name, _ in parsed], allowed_tags)
+    if not skills_by_name:
+        return [(spec, None, None) for spec in specs]
+
+    ranges = {ver: parse_version_range(ver) for _, ver in parsed if ver}
+    ranged_skills = {
+        skill.id: skill
+        for name, ver in parsed
+        if ver and ranges[ver] is not None and (skill := skills_by_name.get(name))
+    }
+    indexes = await version_index.get(db, ranged_skills.values()) if ranged_skills else {}
+
+    planned = []
+    for spec, (name, ver) in zip(specs, parsed):
+        skill = skills_by_name.get(name)
+        if not skill:
+            planned.append((spec, None, None))
+            continue
+        if not ver:
+            ver = skill.latest_version.version if skill.latest_version else None
+        elif ranges[ver] is not None:
+            match = max_satisfying(indexes[skill.id], ranges[ver])
+            ver = match[1] if match else None
+        planned.append((spec, skill, ver))
+    return planned
+
+
+async def lock_specs(
+    db: AsyncSession,
+    user: User,
+    specs: list[str],
+    allowed_tags=(),
+) -> tuple[list[tuple[Skill, str, str]], list[str]]:
+    """Pin specs to exact versions: ``([(skill, version, digest)], unresolved specs)``.
+
+    Only version numbers and digests are read; version bodies are not loaded.
+    """
+    planned = await plan_specs(db, user, specs, allowed_tags)
+    keys = {(skill.id, ver) for _, skill, ver in planned if skill and ver}
+    digests = {}
+    if keys:
+        result = await db.execute(
+            select(SkillVersion.skill_id, SkillVersion.version, SkillVersion.digest)
+            .where(tuple_(SkillVersion.skill_id, SkillVersion.version).in_(keys))
+        )
+        digests = {(skill_id, ver): digest for skill_id, ver, digest in result.all()}
+
+    locked = []
+    unresolved = []
+    for spec, skill, ver in planned:
+        digest = digests.get((skill.id, ver)) if skill and ver else None
+        if digest:
+            locked.append((skill, ver, digest))
+        else:
+            unresolved.append(spec)
+    return locked, unresolved
+
+
+async def resolve_locked(
+    db: AsyncSession,
+    user: User,
+    lock: list[tuple[str, str, str]],
+    allowed_tags=(),
+) -> tuple[list[tuple[Skill, CachedVersion]], list[str]]:
+    """Serve lockfile entries ``(name, version, digest)``: ``([(skill, version)], names not served)``.
+
+    Versions are immutable, so entries are served straight from the version
+    cache; an entry is not served if access was lost or its digest no longer
+    matches.
+    """
+    skills_by_name = await get_accessible_skills(db, user, [name for name, _, _ in lock], allowed_tags)
+    keys = {(skills_by_name[name].id, ver) for name, ver, _ in lock if name in skills_by_name}
+    versions = await load_versions(db, keys)
+
+    resolved = []
+    missing = []
+    for name, ver, digest in lock:
+        skill = skills_by_name.get(name)
+        version = versions.get((skill.id, ver)) if skill else None
+        if version and version.digest == digest:
+            resolved.append((skill, version))
+        else:
+            missing.append(name)
+    return resolved, missing
+
+
+async def resolve_specs(
+    db: AsyncSession,
+    user: User,
+    specs: list[str],
+    allowed_tags=(),
+) -> list[tuple[str, Skill | None, CachedVersion | None]]:
+    """``(spec, skill, version)`` per spec, in request order.
+
+    ``skill`` is None as in :func:`plan_specs`; the version is None when no
+    matching version exists.
+    """
+    planned = await plan_specs(db, user, specs, allowed_tags)
+    versions = await load_versions(db, {(skill.id, ver) for _, skill, ver in planned if skill and ver})
+    return [
+        (spec, skill, versions.get((skill.id, ver)) if skill and ver else None)
+        for spec, skill, ver in planned
+    ]
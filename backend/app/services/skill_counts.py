@@ -0,0 +1,62 @@
+"""Short-lived cache of ``GET /api/skills`` totals.
+
+Counting the filtered skill set scans it, which gets slower as the hub grows,
+so exact totals are kept per (visibility scope, filters) for
+``SKILL_COUNT_CACHE_TTL`` seconds. The worker that creates, deletes or edits a
+skill, or changes a team's members, drops every entry; other workers may
+report a total up to one TTL old.
+"""
+
+import time
+from collections import OrderedDict
+
+from app.config import settings
+
+
+class SkillCountCache:
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple) -> int | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: tuple, total: int):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, total)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self):
+        self._entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+skill_count_cache = SkillCountCache(settings.SKILL_COUNT_CACHE_TTL, settings.SKILL_COUNT_CACHE_MAX_ENTRIES)
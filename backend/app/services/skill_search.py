@@ -0,0 +1,152 @@
+"""Full-text search over skills.
+
+Each skill has one search document made of its name, display name, tags,
+description and the SKILL.md body of its latest version, weighted in that
+order. SKILL.md is stored compressed, so the document is written by the
+application (:func:`index_skill`) whenever one of those inputs changes rather
+than by a database trigger.
+
+- PostgreSQL: ``skills.search_vector`` (GIN-indexed ``tsvector``). tsvector has
+  four weight classes, so description and body share the lowest one.
+- SQLite: the ``skills_fts`` FTS5 table, ranked with per-column bm25 weights.
+
+Queries are reduced to word tokens and every token must match as a prefix,
+so user input never reaches the tsquery/FTS5 query parser verbatim.
+"""
+
+import re
+import uuid
+
+from sqlalchemy import Boolean, Float, Text, bindparam, cast, func, literal_column, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.models.skill import Skill, SkillVersion
+
+SEARCH_FIELDS = frozenset({"name", "display_name", "tags", "description"})
+MAX_TERMS = 16
+BODY_MAX_CHARS = 256 * 1024  # PostgreSQL rejects tsvectors over 1 MB
+
+_CONFIG = literal_column("'simple'::regconfig")
+_PG_RANK_WEIGHTS = "'{0.1, 0.2, 0.4, 1.0}'"  # D, C, B, A
+_FTS_RANK_WEIGHTS = "0, 10.0, 5.0, 3.0, 2.0, 1.0"  # skill_id, name, display_name, tags, description, body
+_TERM_RE = re.compile(r"\w+")
+
+
+def search_terms(q: str) -> str:
+    """Space-separated word tokens of ``q``, or an empty string if it has none."""
+    return " ".join(_TERM_RE.findall(q.lower())[:MAX_TERMS])
+
+
+class skill_search_match(FunctionElement):
+    """The skill's search document matches every term (as a prefix)."""
+
+    type = Boolean()
+    inherit_cache = True
+    name = "skill_search_match"
+
+
+class skill_search_rank(FunctionElement):
+    """Relevance of the skill for the terms; higher is better."""
+
+    type = Float()
+    inherit_cache = True
+    name = "skill_search_rank"
+
+
+def _pg_tsquery(compiler, terms, **kw) -> str:
+    # 'a b' -> 'a:* & b:*'
+    return "to_tsquery('simple', replace(%s, ' ', ':* & ') || ':*')" % compiler.process(terms, **kw)
+
+
+def _fts_query(compiler, terms, **kw) -> str:
+    # 'a b' -> '"a"* "b"*' (FTS5 ANDs adjacent phrases)
+    return "('\"' || replace(%s, ' ', '\"* \"') || '\"*')" % compiler.process(terms, **kw)
+
+
+@compiles(skill_search_match)
+def _compile_match(element, compiler, **kw):
+    _, vector, terms = list(element.clauses)
+    return "(%s @@ %s)" % (compiler.process(vector, **kw), _pg_tsquery(compiler, terms, **kw))
+
+
+@compiles(skill_search_match, "sqlite")
+def _compile_match_sqlite(element, compiler, **kw):
+    skill_id, _, terms = list(element.clauses)
+    return "(%s IN (SELECT skill_id FROM skills_fts WHERE skills_fts MATCH %s))" % (
+        compiler.process(skill_id, **kw),
+        _fts_query(compiler, terms, **kw),
+    )
+
+
+@compiles(skill_search_rank)
+def _compile_rank(element, compiler, **kw):
+    _, vector, terms = list(element.clauses)
+    return "ts_rank(%s, %s, %s)" % (_PG_RANK_WEIGHTS, compiler.process(vector, **kw), _pg_tsquery(compiler, terms, **kw))
+
+
+@compiles(skill_search_rank, "sqlite")
+def _compile_rank_sqlite(element, compiler, **kw):
+    skill_id, _, terms = list(element.clauses)
+    return (
+        "(SELECT -bm25(skills_fts, %s) FROM skills_fts WHERE skills_fts MATCH %s AND skills_fts.skill_id = %s)"
+        % (_FTS_RANK_WEIGHTS, _fts_query(compiler, terms, **kw), compiler.process(skill_id, **kw))
+    )
+
+
+def search_clauses(terms: str):
+    """``(match, rank)`` expressions for a non-empty :func:`search_terms` result."""
+    param = bindparam("search_terms", terms, type_=Text)
+    return skill_search_match(Skill.id, Skill.search_vector, param), skill_search_rank(Skill.id, Skill.search_vector, param)
+
+
+def _document(skill: Skill, body: str) -> dict[str, str]:
+    return {
+        "name": skill.name.replace("-", " "),
+        "display_name": skill.display_name or "",
+        "tags": " ".join(skill.tags or []),
+        "description": skill.description or "",
+        "body": body[:BODY_MAX_CHARS],
+    }
+
+
+async def index_skill(db: AsyncSession, skill: Skill, body: str | None = None):
+    """Rewrite the search document of ``skill``.
+
+    ``body`` is the SKILL.md of the latest version; it is loaded when not given.
+    """
+    if body is None:
+        body = ""
+        if skill.latest_version_id is not None:
+            body = await db.scalar(select(SkillVersion.content).where(SkillVersion.id == skill.latest_version_id)) or ""
+    doc = _document(skill, body)
+
+    if db.get_bind().dialect.name == "sqlite":
+        await remove_skill(db, skill.id)
+        await db.execute(
+            text(
+                "INSERT INTO skills_fts (skill_id, name, display_name, tags, description, body) "
+                "VALUES (:skill_id, :name, :display_name, :tags, :description, :body)"
+            ),
+            {"skill_id": skill.id.hex, **doc},
+        )
+        return
+
+    vector = None
+    for field, weight in (("name", "A"), ("display_name", "B"), ("tags", "C"), ("description", "D"), ("body", "D")):
+        part = func.setweight(func.to_tsvector(_CONFIG, cast(doc[field], Text)), literal_column(f"'{weight}'"))
+        vector = part if vector is None else vector.op("||")(part)
+    # updated_at is pinned so reindexing does not count as an edit.
+    await db.execute(
+        update(Skill)
+        .where(Skill.id == skill.id)
+        .values(search_vector=vector, updated_at=Skill.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def remove_skill(db: AsyncSession, skill_id: uuid.UUID):
+    """Drop the search document of a deleted skill (the tsvector goes with the row)."""
+    if db.get_bind().dialect.name == "sqlite":
+        await db.execute(text("DELETE FROM skills_fts WHERE skill_id = :skill_id"), {"skill_id": skill_id.hex})
@@ -0,0 +1,55 @@
+"""Tag filtering and facets backed by the ``skill_tags`` table.
+
+``Skill.tags`` (JSON) keeps the tags in the order the author gave them and is
+what responses show. ``skill_tags`` holds the same tags one row per tag with
+a ``(tag, skill_id)`` index, so filters and facet counts are plain indexed
+lookups on every database. Writers call :func:`set_skill_tags` whenever
+``Skill.tags`` changes.
+"""
+
+import uuid
+from typing import Literal
+
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import ColumnElement, false
+
+from app.models.skill import Skill, SkillTag
+
+
+async def set_skill_tags(db: AsyncSession, skill_id: uuid.UUID, tags):
+    """Replace the ``skill_tags`` rows of a skill with ``tags``."""
+    await db.execute(delete(SkillTag).where(SkillTag.skill_id == skill_id))
+    rows = [{"skill_id": skill_id, "tag": tag} for tag in dict.fromkeys(tags or ())]
+    if rows:
+        await db.execute(insert(SkillTag), rows)
+
+
+def tagged(tags, mode: Literal["any", "all"] = "any") -> ColumnElement:
+    """Skill carries any (or all) of ``tags``. An empty ``tags`` matches nothing."""
+    tags = list(dict.fromkeys(tags))
+    if not tags:
+        return false()
+    skill_ids = select(SkillTag.skill_id).where(SkillTag.tag.in_(tags))
+    if mode == "all" and len(tags) > 1:
+        skill_ids = skill_ids.group_by(SkillTag.skill_id).having(func.count() == len(tags))
+    return Skill.id.in_(skill_ids)
+
+
+def tag_like(pattern: str) -> ColumnElement:
+    """Skill carries a tag matching the ILIKE ``pattern`` (escaped with backslashes)."""
+    return exists().where(SkillTag.skill_id == Skill.id, SkillTag.tag.ilike(pattern, escape="\\"))
+
+
+async def tag_facets(db: AsyncSession, skill_query, limit: int = 50) -> list[tuple[str, int]]:
+    """``(tag, count)`` over the skills ``skill_query`` selects, most frequent first."""
+    skill_ids = skill_query.with_only_columns(Skill.id).order_by(None).scalar_subquery()
+    count = func.count().label("count")
+    result = await db.execute(
+        select(SkillTag.tag, count)
+        .where(SkillTag.skill_id.in_(skill_ids))
+        .group_by(SkillTag.tag)
+        .order_by(count.desc(), SkillTag.tag)
+        .limit(limit)
+    )
+    return [(row.tag, row.count) for row in result]
@@ -0,0 +1,69 @@
+"""In-process revocation list for JWTs.
+
+Stateless access tokens carry the user's role and team ids, so they are not
+checked against the database. Two kinds of entries cut them short before they
+expire:
+
+- an access token id (``jti``) revoked by logout, kept until the token's own
+  ``exp``;
+- a per-user "not before" timestamp set when the user's role or teams change;
+  tokens with embedded claims issued earlier are rejected and the client
+  refreshes to pick up the new claims. Tokens without claims (refresh tokens,
+  or access tokens issued with ``JWT_STATELESS`` off) are re-checked against
+  the database anyway and are not affected.
+
+The list lives in the worker's memory. Other workers keep accepting a revoked
+access token until it expires, which is why stateless access tokens are short
+lived (``JWT_ACCESS_EXPIRE_MINUTES``). Long-lived refresh tokens are revoked in
+the database instead (app.services.refresh_tokens).
+"""
+
+import time
+import uuid
+
+
+class TokenRevocationList:
+    def __init__(self):
+        self._jtis: dict[str, float] = {}
+        self._not_before: dict[uuid.UUID, float] = {}
+        self.checks = 0
+        self.rejected = 0
+
+    def revoke(self, jti: str, exp: float):
+        """Reject the token ``jti`` until ``exp`` (a unix timestamp)."""
+        self._jtis[jti] = exp
+        self.prune()
+
+    def revoke_user(self, user_id: uuid.UUID):
+        """Reject claim-carrying access tokens of ``user_id`` issued before now."""
+        self._not_before[user_id] = time.time()
+
+    def is_revoked(self, payload: dict) -> bool:
+        self.checks += 1
+        revoked = payload.get("jti") in self._jtis
+        if not revoked and "teams" in payload:
+            not_before = self._not_before.get(uuid.UUID(payload["sub"]))
+            revoked = not_before is not None and float(payload.get("iat", 0)) < not_before
+        if revoked:
+            self.rejected += 1
+        return revoked
+
+    def prune(self):
+        now = time.time()
+        for jti in [jti for jti, exp in self._jtis.items() if exp <= now]:
+            del self._jtis[jti]
+
+    def clear(self):
+        self._jtis.clear()
+        self._not_before.clear()
+
+    def stats(self) -> dict:
+        return {
+            "revoked_tokens": len(self._jtis),
+            "revoked_users": len(self._not_before),
+            "checks": self.checks,
+            "rejected": self.rejected,
+        }
+
+
+token_revocations = TokenRevocationList()
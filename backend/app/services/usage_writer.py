@@ -0,0 +1,169 @@
+"""Buffered, asynchronous writer for plugin usage logs.
+
+Plugin endpoints enqueue usage events instead of inserting a row inside the
+request transaction. A background task flushes the queue with multi-row
+INSERTs when ``USAGE_LOG_BATCH_SIZE`` events are pending or every
+``USAGE_LOG_FLUSH_INTERVAL`` seconds, whichever comes first. The queue is
+bounded: events beyond ``USAGE_LOG_QUEUE_SIZE`` are dropped and counted.
+
+The writer runs between FastAPI lifespan startup and shutdown (which flushes
+what is left). While it is not running, e.g. under a test client that skips
+lifespan events, :func:`record_usage` falls back to adding the row to the
+request session.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.models.usage_log import SkillUsageLog
+
+logger = logging.getLogger(__name__)
+
+
+class UsageLogWriter:
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float, dedup_seconds: float = 0):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dedup_seconds = dedup_seconds
+        self._queue: deque[dict] = deque()
+        self._recent: dict[tuple, float] = {}  # dedup key -> monotonic time last accepted
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._session_factory: async_sessionmaker | None = None
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.deduped = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def record(self, event: dict) -> bool:
+        """Enqueue one usage event; returns False if it was dropped or deduplicated."""
+        key = None
+        if self.dedup_seconds > 0:
+            key = (event["skill_id"], event["skill_name"], event["skill_version"],
+                   event["user_id"], event["api_key_id"], event["action"])
+            last = self._recent.get(key)
+            if last is not None and time.monotonic() - last < self.dedup_seconds:
+                self.deduped += 1
+                return False
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return False
+        if key is not None:
+            self._recent[key] = time.monotonic()
+        self._queue.append(event)
+        self.enqueued += 1
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def start(self, session_factory: async_sessionmaker):
+        if self._task is None:
+            self._session_factory = session_factory
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and flush everything still queued."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Write all queued events in batches; returns the number written."""
+        written = 0
+        async with self._flush_lock:
+            while self._queue:
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                try:
+                    async with self._session_factory() as db:
+                        await db.execute(insert(SkillUsageLog).values(batch))
+                        await db.commit()
+                except Exception:
+                    self.failed += len(batch)
+                    logger.exception("Failed to write %d usage log events", len(batch))
+                    continue
+                self.written += len(batch)
+                written += len(batch)
+            self._prune_recent()
+        return written
+
+    def _prune_recent(self):
+        if self._recent:
+            cutoff = time.monotonic() - self.dedup_seconds
+            self._recent = {key: t for key, t in self._recent.items() if t >= cutoff}
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "deduped": self.deduped,
+            "failed": self.failed,
+        }
+
+
+usage_writer = UsageLogWriter(
+    max_queue=settings.USAGE_LOG_QUEUE_SIZE,
+    batch_size=settings.USAGE_LOG_BATCH_SIZE,
+    flush_interval=settings.USAGE_LOG_FLUSH_INTERVAL,
+    dedup_seconds=settings.USAGE_LOG_DEDUP_SECONDS,
+)
+
+
+def record_usage(
+    db: AsyncSession,
+    *,
+    action: str,
+    skill_name: str,
+    user_id: uuid.UUID,
+    api_key_id: uuid.UUID,
+    skill_id: uuid.UUID | None = None,
+    skill_version: str | None = None,
+):
+    """Record a plugin usage event via the buffered writer, or the session if it is not running."""
+    event = {
+        "id": uuid.uuid4(),
+        "skill_id": skill_id,
+        "skill_name": skill_name,
+        "skill_version": skill_version,
+        "user_id": user_id,
+        "api_key_id": api_key_id,
+        "action": action,
+        "created_at": datetime.now(timezone.utc),
+    }
+    if usage_writer.running:
+        usage_writer.record(event)
+    else:
+        db.add(SkillUsageLog(**event))
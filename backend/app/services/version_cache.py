@@ -0,0 +1,149 @@
+"""In-process LRU cache of published skill versions.
+
+A ``SkillVersion`` (SKILL.md plus files) never changes once ``create_version``
+commits, so entries keyed by ``(skill_id, version)`` never need invalidation;
+they are only evicted to stay under a byte budget.
+"""
+
+import json
+import sys
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, undefer
+
+from app.config import settings
+from app.models.skill import SkillFile, SkillVersion
+
+
+def encode_json(value) -> bytes:
+    """Compact UTF-8 JSON encoding, byte-compatible with FastAPI's JSON responses."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+@dataclass(frozen=True, slots=True)
+class CachedVersion:
+    """Ready-to-serve snapshot of a published version."""
+
+    id: uuid.UUID
+    skill_id: uuid.UUID
+    version: str
+    content: str
+    content_digest: str
+    digest: str
+    changelog: str | None
+    metadata_json: dict | None
+    created_at: datetime
+    published_at: datetime | None
+    files: dict[str, str]
+    content_json: bytes  # pre-encoded JSON string of `content`
+    files_json: bytes  # pre-encoded JSON object of `files`
+    size: int
+
+    @classmethod
+    def from_model(cls, version: SkillVersion) -> "CachedVersion":
+        files = {f.path: f.content for f in version.files}
+        content_json = encode_json(version.content)
+        files_json = encode_json(files)
+        size = sys.getsizeof(version.content) + len(content_json) + len(files_json) + sum(
+            sys.getsizeof(path) + sys.getsizeof(content) for path, content in files.items()
+        )
+        return cls(
+            id=version.id,
+            skill_id=version.skill_id,
+            version=version.version,
+            content=version.content,
+            content_digest=version.content_digest,
+            digest=version.digest,
+            changelog=version.changelog,
+            metadata_json=version.metadata_json,
+            created_at=version.created_at,
+            published_at=version.published_at,
+            files=files,
+            content_json=content_json,
+            files_json=files_json,
+            size=size,
+        )
+
+
+class VersionCache:
+    """LRU cache bounded by the approximate in-memory size of its entries."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, CachedVersion] = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, skill_id: uuid.UUID, version: str) -> CachedVersion | None:
+        entry = self._entries.get((skill_id, version))
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((skill_id, version))
+        self.hits += 1
+        return entry
+
+    def put(self, entry: CachedVersion):
+        key = (entry.skill_id, entry.version)
+        if entry.size > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = entry
+        self.current_bytes += entry.size
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.size
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+version_cache = VersionCache(settings.VERSION_CACHE_MAX_BYTES)
+
+
+async def load_versions(db: AsyncSession, keys) -> dict[tuple, CachedVersion]:
+    """Get versions by (skill_id, version) keys, loading all cache misses in one query."""
+    found: dict[tuple, CachedVersion] = {}
+    missing = []
+    for skill_id, ver in keys:
+        entry = version_cache.get(skill_id, ver)
+        if entry is None:
+            missing.append((skill_id, ver))
+        else:
+            found[(skill_id, ver)] = entry
+
+    if missing:
+        result = await db.execute(
+            select(SkillVersion)
+            .where(tuple_(SkillVersion.skill_id, SkillVersion.version).in_(missing))
+            .options(
+                undefer(SkillVersion.content),
+                undefer(SkillVersion.metadata_json),
+                selectinload(SkillVersion.files).undefer(SkillFile.content),
+            )
+        )
+        for version in result.scalars().all():
+            entry = CachedVersion.from_model(version)
+            version_cache.put(entry)
+            found[(entry.skill_id, entry.version)] = entry
+    return found
@@ -0,0 +1,88 @@
+"""In-process index of each skill's version numbers, sorted by semver precedence.
+
+Used to answer range specs (``name@^1.2``) without scanning ``skill_versions``.
+Each entry is tagged with the skill's ``latest_version_id`` when it was built;
+every publish moves that pointer, so a stale entry is detected (and rebuilt)
+from the skill row alone, in whichever worker sees it first. The worker that
+publishes or deletes drops its own entry right away, and at most
+``VERSION_INDEX_MAX_ENTRIES`` skills are kept, least recently used first out.
+"""
+
+import uuid
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.skill import SkillVersion
+from app.utils.semver import Version, parse_version
+
+VersionList = tuple[tuple[Version, str], ...]
+
+
+class VersionIndex:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[uuid.UUID, tuple[uuid.UUID | None, VersionList]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, db: AsyncSession, skills) -> dict[uuid.UUID, VersionList]:
+        """Sorted (Version, label) pairs per skill, loading stale or missing entries in one query."""
+        found: dict[uuid.UUID, VersionList] = {}
+        stale: dict[uuid.UUID, uuid.UUID | None] = {}
+        for skill in skills:
+            entry = self._entries.get(skill.id)
+            if entry is not None and entry[0] == skill.latest_version_id:
+                found[skill.id] = entry[1]
+                self._entries.move_to_end(skill.id)
+                self.hits += 1
+            else:
+                stale[skill.id] = skill.latest_version_id
+                self.misses += 1
+
+        if stale:
+            result = await db.execute(
+                select(SkillVersion.skill_id, SkillVersion.version).where(SkillVersion.skill_id.in_(stale))
+            )
+            labels: dict[uuid.UUID, list[tuple[Version, str]]] = {skill_id: [] for skill_id in stale}
+            for skill_id, label in result.all():
+                parsed = parse_version(label)
+                if parsed is not None:  # non-semver legacy versions can only be pinned exactly
+                    labels[skill_id].append((parsed, label))
+            for skill_id, entries in labels.items():
+                versions = tuple(sorted(entries))
+                self._put(skill_id, (stale[skill_id], versions))
+                found[skill_id] = versions
+        return found
+
+    def _put(self, skill_id: uuid.UUID, entry: tuple[uuid.UUID | None, VersionList]):
+        if self.max_entries <= 0:
+            return
+        self._entries[skill_id] = entry
+        self._entries.move_to_end(skill_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, skill_id: uuid.UUID):
+        """Drop a skill's entry after it gets a new version or is deleted."""
+        self._entries.pop(skill_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+version_index = VersionIndex(settings.VERSION_INDEX_MAX_ENTRIES)
+
@@ -0,0 +1,147 @@
+"""Precomputed team visibility: the ``user_visible_skills`` index.
+
+A user sees a team-visible skill when they are a member of one of its
+visibility teams (``skill_visibility_teams``), or of its legacy ``team_id``
+when it has none. Resolving that per request means joining every team the
+user is in against every skill shared with those teams, so the pairs are
+kept in ``user_visible_skills`` instead and the access filter becomes a
+primary-key range scan on ``user_id``.
+
+The index holds team grants regardless of ``Skill.visibility``; readers still
+require ``visibility == "team"``, so visibility-only edits need no upkeep.
+Writers call :func:`refresh_users` after membership changes and
+:func:`refresh_skills` after a skill's teams change or the skill is deleted.
+
+Under READ COMMITTED a refresh cannot see another transaction's uncommitted
+membership or team change, so two concurrent refreshes (a join and a skill
+share, or two joins by the same user) could each miss the other's grant or
+insert the same row. Refreshes therefore hold a transaction-scoped advisory
+lock on PostgreSQL: whichever commits second recomputes after the first is
+visible. Membership and sharing changes are rare, so one lock for the whole
+index is enough and cannot deadlock. SQLite serializes writers on its own.
+
+Rebuild or verify the whole index from backend/::
+
+    python -m app.services.visible_skills rebuild
+    python -m app.services.visible_skills check
+"""
+
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import delete, except_, exists, func, insert, select, union
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session
+from app.models.skill import Skill, SkillVisibilityTeam, UserVisibleSkill
+from app.models.team_member import TeamMember
+
+CHECK_SAMPLE_SIZE = 20
+# pg_advisory_xact_lock key shared by every writer of the index.
+INDEX_LOCK_KEY = 0x75767331
+REPLACE_ATTEMPTS = 3
+
+
+def team_grants(user_ids=None, skill_ids=None):
+    """``(user_id, skill_id)`` pairs the index should hold, optionally restricted."""
+    shared = (
+        select(TeamMember.user_id, SkillVisibilityTeam.skill_id)
+        .join(SkillVisibilityTeam, SkillVisibilityTeam.team_id == TeamMember.team_id)
+        .join(Skill, Skill.id == SkillVisibilityTeam.skill_id)
+    )
+    legacy = (
+        select(TeamMember.user_id, Skill.id)
+        .join(Skill, Skill.team_id == TeamMember.team_id)
+        .where(~exists().where(SkillVisibilityTeam.skill_id == Skill.id))
+    )
+    if user_ids is not None:
+        shared = shared.where(TeamMember.user_id.in_(user_ids))
+        legacy = legacy.where(TeamMember.user_id.in_(user_ids))
+    if skill_ids is not None:
+        shared = shared.where(SkillVisibilityTeam.skill_id.in_(skill_ids))
+        legacy = legacy.where(Skill.id.in_(skill_ids))
+    return union(shared, legacy)
+
+
+async def _lock_index(db: AsyncSession):
+    """Serialize index writers until the transaction ends (PostgreSQL only)."""
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(INDEX_LOCK_KEY)))
+
+
+async def _replace(db: AsyncSession, where, grants):
+    await db.flush()  # pending memberships and visibility teams must be visible to the INSERT ... SELECT
+    await _lock_index(db)
+    for attempt in range(REPLACE_ATTEMPTS):
+        try:
+            async with db.begin_nested():
+                await db.execute(delete(UserVisibleSkill).where(*where))
+                await db.execute(insert(UserVisibleSkill).from_select(["user_id", "skill_id"], grants))
+            return
+        except IntegrityError:
+            # A writer that bypassed the lock (e.g. an older worker) inserted one of our rows; recompute.
+            if attempt == REPLACE_ATTEMPTS - 1:
+                raise
+
+
+async def refresh_users(db: AsyncSession, user_ids):
+    """Recompute the rows of users whose team memberships changed."""
+    user_ids = list(user_ids)
+    if user_ids:
+        await _replace(db, [UserVisibleSkill.user_id.in_(user_ids)], team_grants(user_ids=user_ids))
+
+
+async def refresh_skills(db: AsyncSession, skill_ids):
+    """Recompute the rows of skills whose teams changed, or drop them for deleted skills."""
+    skill_ids = list(skill_ids)
+    if skill_ids:
+        await _replace(db, [UserVisibleSkill.skill_id.in_(skill_ids)], team_grants(skill_ids=skill_ids))
+
+
+async def rebuild(db: AsyncSession) -> int:
+    """Recompute the whole index; returns the number of rows."""
+    await _replace(db, [], team_grants())
+    return await db.scalar(select(func.count()).select_from(UserVisibleSkill))
+
+
+async def check(db: AsyncSession) -> dict:
+    """Compare the index with the grants it should hold.
+
+    ``missing`` are pairs the index lacks, ``extra`` pairs it should not have;
+    both are samples of up to ``CHECK_SAMPLE_SIZE``.
+    """
+    stored = select(UserVisibleSkill.user_id, UserVisibleSkill.skill_id)
+    expected = select(team_grants().subquery())  # SQLite cannot nest compound selects
+    missing = (await db.execute(except_(expected, stored).limit(CHECK_SAMPLE_SIZE))).all()
+    extra = (await db.execute(except_(stored, expected).limit(CHECK_SAMPLE_SIZE))).all()
+    return {
+        "consistent": not missing and not extra,
+        "missing": [(str(user_id), str(skill_id)) for user_id, skill_id in missing],
+        "extra": [(str(user_id), str(skill_id)) for user_id, skill_id in extra],
+    }
+
+
+async def _main(command: str) -> int:
+    async with async_session() as db:
+        if command == "rebuild":
+            rows = await rebuild(db)
+            await db.commit()
+            print(f"user_visible_skills rebuilt: {rows} rows")
+            return 0
+        report = await check(db)
+    if report["consistent"]:
+        print("user_visible_skills is consistent")
+        return 0
+    for label in ("missing", "extra"):
+        for user_id, skill_id in report[label]:
+            print(f"{label}: user {user_id} skill {skill_id}")
+    print("user_visible_skills is inconsistent; run `python -m app.services.visible_skills rebuild`")
+    return 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the user_visible_skills index.")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    sys.exit(asyncio.run(_main(parser.parse_args().command)))
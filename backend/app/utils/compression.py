@@ -0,0 +1,85 @@
+"""Transparent compression for large text columns (SKILL.md and attached files).
+
+Stored values are ``<1-byte codec tag><payload>``. Rows below
+``CONTENT_COMPRESSION_MIN_BYTES`` (or that do not shrink) are stored as raw
+UTF-8, so small rows pay no CPU. Decoding always honours the tag, so the codec
+setting can change without rewriting existing rows.
+
+gzip payloads are complete gzip members (mtime 0), which lets the API send
+them to clients as ``Content-Encoding: gzip`` without recompressing.
+"""
+
+import gzip
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from app.config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional: install `zstandard` to enable CONTENT_COMPRESSION=zstd
+    zstandard = None
+
+RAW = 0x00
+GZIP = 0x01
+ZSTD = 0x02
+
+
+def compress_text(text: str, codec: str | None = None, min_bytes: int | None = None) -> bytes:
+    """Encode text for storage, compressing it when that is worthwhile."""
+    codec = codec or settings.CONTENT_COMPRESSION
+    min_bytes = settings.CONTENT_COMPRESSION_MIN_BYTES if min_bytes is None else min_bytes
+    raw = text.encode()
+    if codec == "zstd" and zstandard is None:
+        codec = "gzip"
+    if codec == "none" or len(raw) < min_bytes:
+        return bytes((RAW,)) + raw
+
+    if codec == "zstd":
+        payload = bytes((ZSTD,)) + zstandard.ZstdCompressor(level=9).compress(raw)
+    else:
+        payload = bytes((GZIP,)) + gzip.compress(raw, compresslevel=6, mtime=0)
+    if len(payload) >= len(raw) + 1:
+        return bytes((RAW,)) + raw
+    return payload
+
+
+def decompress_text(stored: bytes) -> str:
+    """Decode a value produced by :func:`compress_text`."""
+    tag, payload = stored[0], memoryview(stored)[1:]
+    if tag == RAW:
+        return bytes(payload).decode()
+    if tag == GZIP:
+        return gzip.decompress(payload).decode()
+    if tag == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed content requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(payload).decode()
+    raise ValueError(f"Unknown content codec tag: {tag:#04x}")
+
+
+def gzip_payload(stored: bytes) -> bytes | None:
+    """The stored gzip member, if the value is gzip-compressed; otherwise None."""
+    if stored and stored[0] == GZIP:
+        return stored[1:]
+    return None
+
+
+class CompressedText(TypeDecorator):
+    """A ``str`` column stored as tagged, optionally compressed bytes."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):  # legacy TEXT value not yet migrated
+            return value
+        return decompress_text(bytes(value))
@@ -0,0 +1,19 @@
+import hashlib
+
+
+def sha256_hex(text: str) -> str:
+    """SHA-256 hex digest of a text payload (UTF-8)."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def version_digest(content_digest: str, file_digests: dict[str, str]) -> str:
+    """Digest of a whole skill version: SKILL.md plus every attached file.
+
+    Only depends on the per-file digests, so it can be recomputed without
+    loading file contents.
+    """
+    h = hashlib.sha256()
+    h.update(b"SKILL.md\0" + content_digest.encode() + b"\n")
+    for path in sorted(file_digests):
+        h.update(path.encode() + b"\0" + file_digests[path].encode() + b"\n")
+    return h.hexdigest()
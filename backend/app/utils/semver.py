@@ -0,0 +1,203 @@
+"""Semantic version precedence and npm-style range matching.
+
+Supports exact versions, ``*``/``x`` and partial versions (``1``, ``1.2.x``),
+caret (``^1.2``), tilde (``~1.4.0``), comparators (``>=2 <3``), hyphen ranges
+(``1.2 - 2.3``) and ``||`` unions, with the same pre-release rules as npm: a
+pre-release only satisfies a range that mentions a pre-release of the same
+``major.minor.patch``.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+_VERSION_RE = re.compile(r"^v?(\d+)\.(\d+)\.(\d+)(?:-([\w.-]+))?(?:\+[\w.-]+)?$")
+_PARTIAL_RE = re.compile(
+    r"^v?(\d+|[xX*])(?:\.(\d+|[xX*])(?:\.(\d+|[xX*])(?:-([\w.-]+))?(?:\+[\w.-]+)?)?)?$"
+)
+_COMPARATOR_RE = re.compile(r"^(<=|>=|<|>|=|\^|~>?)?\s*(.*)$")
+
+
+def _prerelease_key(prerelease: tuple[str, ...]) -> tuple:
+    # A release sorts after all of its pre-releases; numeric identifiers sort before alphanumeric ones.
+    if not prerelease:
+        return (1,)
+    return (0, *((0, int(p), "") if p.isdigit() else (1, 0, p) for p in prerelease))
+
+
+@dataclass(frozen=True, order=True)
+class Version:
+    key: tuple = field(repr=False)
+    major: int = field(compare=False)
+    minor: int = field(compare=False)
+    patch: int = field(compare=False)
+    prerelease: tuple[str, ...] = field(default=(), compare=False)
+
+    @classmethod
+    def of(cls, major: int, minor: int, patch: int, prerelease: tuple[str, ...] = ()) -> "Version":
+        return cls((major, minor, patch, _prerelease_key(prerelease)), major, minor, patch, prerelease)
+
+    @property
+    def release(self) -> tuple[int, int, int]:
+        return self.major, self.minor, self.patch
+
+
+def parse_version(text: str) -> Version | None:
+    """Parse a full semver string; returns None if it is not one."""
+    m = _VERSION_RE.match(text.strip())
+    if not m:
+        return None
+    prerelease = tuple(m.group(4).split(".")) if m.group(4) else ()
+    return Version.of(int(m.group(1)), int(m.group(2)), int(m.group(3)), prerelease)
+
+
+# A comparator set is a list of (operator, version) that must all hold; a range is a list of sets.
+Comparator = tuple[str, Version]
+_LOWEST = ("0",)  # `<X.Y.Z-0` excludes every pre-release of X.Y.Z
+
+
+def _parse_partial(text: str):
+    m = _PARTIAL_RE.match(text)
+    if not m:
+        raise ValueError(f"Invalid version in range: {text!r}")
+    parts = [None if p is None or p in "xX*" else int(p) for p in m.group(1, 2, 3)]
+    # Anything after a wildcard is a wildcard too.
+    for i in range(1, 3):
+        if parts[i - 1] is None:
+            parts[i] = None
+    prerelease = tuple(m.group(4).split(".")) if m.group(4) and parts[2] is not None else ()
+    return parts[0], parts[1], parts[2], prerelease
+
+
+def _lower(major, minor, patch, prerelease) -> Version:
+    return Version.of(major or 0, minor or 0, patch or 0, prerelease)
+
+
+def _upper_exclusive(major, minor, patch) -> Version | None:
+    """First version above the wildcarded partial, e.g. 1.2 -> 1.3.0-0; None if fully wildcarded."""
+    if major is None:
+        return None
+    if minor is None:
+        return Version.of(major + 1, 0, 0, _LOWEST)
+    return Version.of(major, minor + 1, 0, _LOWEST)
+
+
+def _x_range(major, minor, patch, prerelease) -> list[Comparator]:
+    if major is None:
+        return [(">=", Version.of(0, 0, 0))]
+    if patch is not None:
+        return [("=", Version.of(major, minor, patch, prerelease))]
+    return [(">=", _lower(major, minor, patch, ())), ("<", _upper_exclusive(major, minor, patch))]
+
+
+def _caret(major, minor, patch, prerelease) -> list[Comparator]:
+    if major is None:
+        return _x_range(None, None, None, ())
+    low = _lower(major, minor, patch, prerelease)
+    if major > 0 or minor is None:
+        high = Version.of(major + 1, 0, 0, _LOWEST)
+    elif minor > 0 or patch is None:
+        high = Version.of(0, minor + 1, 0, _LOWEST)
+    else:
+        high = Version.of(0, 0, patch + 1, _LOWEST)
+    return [(">=", low), ("<", high)]
+
+
+def _tilde(major, minor, patch, prerelease) -> list[Comparator]:
+    if major is None:
+        return _x_range(None, None, None, ())
+    low = _lower(major, minor, patch, prerelease)
+    if minor is None:
+        return [(">=", low), ("<", Version.of(major + 1, 0, 0, _LOWEST))]
+    return [(">=", low), ("<", Version.of(major, minor + 1, 0, _LOWEST))]
+
+
+def _primitive(op: str, major, minor, patch, prerelease) -> list[Comparator]:
+    if op == "=":
+        return _x_range(major, minor, patch, prerelease)
+    if major is None:
+        # `>=*` / `<=*` match anything; `>*` / `<*` match nothing.
+        return [(">=", Version.of(0, 0, 0))] if op in (">=", "<=") else [("<", Version.of(0, 0, 0, _LOWEST))]
+    if patch is not None:
+        return [(op, Version.of(major, minor, patch, prerelease))]
+    # Partial versions: round to the boundary of the wildcarded part.
+    if op == ">":
+        return [(">=", Version.of(*_upper_exclusive(major, minor, patch).release))]
+    if op == ">=":
+        return [(">=", _lower(major, minor, patch, ()))]
+    if op == "<":
+        return [("<", Version.of(major, minor or 0, 0, _LOWEST))]
+    return [("<", _upper_exclusive(major, minor, patch))]  # <=
+
+
+def _parse_set(text: str) -> list[Comparator]:
+    text = text.strip()
+    hyphen = re.match(r"^(\S+)\s+-\s+(\S+)$", text)
+    if hyphen:
+        low = _parse_partial(hyphen.group(1))
+        high = _parse_partial(hyphen.group(2))
+        comparators = [(">=", _lower(*low))] if low[0] is not None else []
+        if high[0] is None:
+            pass
+        elif high[2] is not None:
+            comparators.append(("<=", Version.of(*high)))
+        else:
+            comparators.append(("<", _upper_exclusive(*high[:3])))
+        return comparators or _x_range(None, None, None, ())
+
+    # Allow whitespace between an operator and its version (">= 1.2").
+    tokens = re.sub(r"(<=|>=|<|>|=|\^|~>?)\s+", r"\1", text).split()
+    if not tokens:
+        return _x_range(None, None, None, ())
+    comparators: list[Comparator] = []
+    for token in tokens:
+        op, rest = _COMPARATOR_RE.match(token).groups()
+        partial = _parse_partial(rest)
+        if op == "^":
+            comparators += _caret(*partial)
+        elif op in ("~", "~>"):
+            comparators += _tilde(*partial)
+        elif op:
+            comparators += _primitive(op, *partial)
+        else:
+            comparators += _x_range(*partial)
+    return comparators
+
+
+def parse_range(text: str) -> list[list[Comparator]]:
+    """Parse an npm-style range into comparator sets; raises ValueError if invalid."""
+    return [_parse_set(part) for part in text.split("||")]
+
+
+def _holds(version: Version, op: str, bound: Version) -> bool:
+    if op == "=":
+        return version == bound
+    if op == ">":
+        return version > bound
+    if op == ">=":
+        return version >= bound
+    if op == "<":
+        return version < bound
+    return version <= bound
+
+
+def _set_satisfied(version: Version, comparators: list[Comparator]) -> bool:
+    if not all(_holds(version, op, bound) for op, bound in comparators):
+        return False
+    if not version.prerelease:
+        return True
+    return any(bound.prerelease and bound.release == version.release for _, bound in comparators)
+
+
+def satisfies(version: Version, range_sets: list[list[Comparator]]) -> bool:
+    return any(_set_satisfied(version, comparators) for comparators in range_sets)
+
+
+def max_satisfying(versions, range_sets: list[list[Comparator]]):
+    """Highest (Version, label) pair whose Version satisfies the range.
+
+    ``versions`` must be sorted ascending by Version.
+    """
+    for entry in reversed(versions):
+        if satisfies(entry[0], range_sets):
+            return entry
+    return None
@@ -0,0 +1,67 @@
+"""Portable SQL helpers for the PostgreSQL (production) and SQLite (tests) dialects."""
+
+import json
+
+from sqlalchemy import Text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import Select
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
+
+
+def escape_like(s: str) -> str:
+    """Escape special characters for SQL LIKE."""
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class TSVector(TypeDecorator):
+    """``tsvector`` on PostgreSQL; a plain (unused) text column elsewhere."""
+
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(TSVECTOR())
+        return dialect.type_descriptor(Text())
+
+
+class comparable_timestamp(FunctionElement):
+    """A DateTime column or value, normalized so that rows and bound values compare correctly.
+
+    SQLite stores ``CURRENT_TIMESTAMP`` without fractional seconds while bound
+    datetimes carry them, so both sides go through ``datetime()`` there.
+    """
+
+    inherit_cache = True
+    name = "comparable_timestamp"
+
+    def __init__(self, expr):
+        super().__init__(expr)
+        self.type = expr.type
+
+
+@compiles(comparable_timestamp)
+def _compile_comparable_timestamp(element, compiler, **kw):
+    return compiler.process(list(element.clauses)[0], **kw)
+
+
+@compiles(comparable_timestamp, "sqlite")
+def _compile_comparable_timestamp_sqlite(element, compiler, **kw):
+    return "datetime(%s)" % compiler.process(list(element.clauses)[0], **kw)
+
+
+async def estimate_row_count(db: AsyncSession, query: Select) -> int | None:
+    """Row count the PostgreSQL planner expects ``query`` to return; None on other dialects."""
+    dialect = db.get_bind().dialect
+    if dialect.name != "postgresql":
+        return None
+    compiled = query.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+    conn = await db.connection()
+    plan = (await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, params)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,107 @@
+"""Benchmark event-loop latency of other requests during a login burst.
+
+Fires concurrent logins while a probe polls GET /api/health and records how
+long each probe takes. "inline" runs bcrypt on the event loop (the previous
+behaviour); "pool" uses the bounded bcrypt thread pool.
+
+Usage (from backend/):
+    python -m benchmarks.bench_login [--logins 16] [--rounds 12]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ["TESTING"] = "true"
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database import Base, get_db
+from app.main import app
+from app.models import User
+from app.services.password_hasher import hash_password_sync, password_hasher
+
+PROBE_INTERVAL = 0.005
+
+
+async def _inline_run(fn, *args):
+    return fn(*args)
+
+
+async def _burst(client: AsyncClient, logins: int) -> tuple[float, list[int], list[float]]:
+    probes: list[float] = []
+    done = asyncio.Event()
+
+    async def probe():
+        # Latency is measured from when the probe was due, so time spent waiting
+        # for a blocked event loop to wake the probe up is included.
+        due = time.perf_counter()
+        while not done.is_set():
+            await client.get("/api/health")
+            probes.append((time.perf_counter() - due) * 1000)
+            due = time.perf_counter() + PROBE_INTERVAL
+            await asyncio.sleep(PROBE_INTERVAL)
+
+    async def login():
+        resp = await client.post("/api/auth/login", json={"username": "bench", "password": "bench-password"})
+        return resp.status_code
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+    return elapsed, statuses, probes
+
+
+async def main(logins: int, rounds: int):
+    settings.BCRYPT_ROUNDS = rounds
+    tmpdir = tempfile.mkdtemp(prefix="skills-hub-bench-")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmpdir}/bench.db", echo=False)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def _get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _get_db
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as db:
+        db.add(User(username="bench", email="bench@example.com", password_hash=hash_password_sync("bench-password", rounds)))
+        await db.commit()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{logins} concurrent logins, bcrypt cost {rounds}, {password_hasher.max_concurrency} hashing threads")
+        print(f"{'mode':>6} {'total s':>8} {'ok':>4} {'503':>4} {'probe p50 ms':>13} {'p99 ms':>8} {'max ms':>8}")
+        for mode in ("inline", "pool"):
+            if mode == "inline":
+                password_hasher._run = _inline_run
+            else:
+                del password_hasher._run
+            elapsed, statuses, probes = await _burst(client, logins)
+            probes.sort()
+            p99 = probes[min(len(probes) - 1, int(len(probes) * 0.99))]
+            print(
+                f"{mode:>6} {elapsed:>8.2f} {statuses.count(200):>4} {statuses.count(503):>4} "
+                f"{statistics.median(probes):>13.2f} {p99:>8.2f} {probes[-1]:>8.2f}"
+            )
+
+    app.dependency_overrides.pop(get_db, None)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.rounds))
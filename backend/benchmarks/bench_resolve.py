@@ -0,0 +1,123 @@
+"""Benchmark POST /api/v1/skills/resolve latency vs. number of specs.
+
+Seeds a throwaway SQLite database with published, subscribed skills and
+measures request latency and SQL round trips per request.
+
+Usage (from backend/):
+    python -m benchmarks.bench_resolve [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+os.environ["TESTING"] = "true"
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.security import generate_api_key
+from app.database import Base, get_db
+from app.main import app
+from app.models import ApiKey, Skill, SkillFile, SkillSubscription, SkillVersion, User
+from app.utils.digest import sha256_hex, version_digest
+
+SPEC_COUNTS = (1, 5, 10, 25, 50)
+
+
+async def _seed(session_factory, n_skills: int) -> str:
+    async with session_factory() as db:
+        user = User(username="bench", email="bench@example.com", password_hash="x", role="member")
+        db.add(user)
+        await db.flush()
+        key_id = uuid.uuid4()
+        raw_key, key_hash = generate_api_key(key_id)
+        db.add(ApiKey(id=key_id, user_id=user.id, key_hash=key_hash, name="bench", scopes=["read"], allowed_tags=[]))
+        for i in range(n_skills):
+            skill = Skill(
+                name=f"bench-skill-{i}",
+                display_name=f"Bench Skill {i}",
+                description="benchmark skill",
+                tags=["bench"],
+                visibility="public",
+                author_id=user.id,
+                is_published=True,
+            )
+            db.add(skill)
+            await db.flush()
+            db.add(SkillSubscription(user_id=user.id, skill_id=skill.id, enabled=True))
+            for ver in ("1.0.0", "1.1.0"):
+                content = f"# Skill {i} {ver}\n" + "x" * 2000
+                files = {f"refs/{j}.md": "y" * 500 for j in range(3)}
+                file_digests = {path: sha256_hex(body) for path, body in files.items()}
+                version = SkillVersion(
+                    skill_id=skill.id,
+                    version=ver,
+                    content=content,
+                    content_digest=sha256_hex(content),
+                    digest=version_digest(sha256_hex(content), file_digests),
+                )
+                db.add(version)
+                await db.flush()
+                skill.latest_version_id = version.id
+                for path, body in files.items():
+                    db.add(SkillFile(
+                        skill_version_id=version.id, path=path, content=body, content_digest=file_digests[path],
+                    ))
+        await db.commit()
+    return raw_key
+
+
+async def main(repeat: int):
+    tmpdir = tempfile.mkdtemp(prefix="skills-hub-bench-")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmpdir}/bench.db", echo=False)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(*_args, **_kwargs):
+        nonlocal statements
+        statements += 1
+
+    async def _get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _get_db
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    raw_key = await _seed(session_factory, max(SPEC_COUNTS))
+    headers = {"Authorization": f"Bearer {raw_key}"}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'specs':>5} {'p50 ms':>8} {'mean ms':>8} {'queries':>8}")
+        for n in SPEC_COUNTS:
+            body = {"skills": [f"bench-skill-{i}" for i in range(n)]}
+            await client.post("/api/v1/skills/resolve", json=body, headers=headers)  # warm-up
+            timings = []
+            queries = 0
+            for _ in range(repeat):
+                before = statements
+                start = time.perf_counter()
+                resp = await client.post("/api/v1/skills/resolve", json=body, headers=headers)
+                timings.append((time.perf_counter() - start) * 1000)
+                queries = statements - before
+                assert resp.status_code == 200 and len(resp.json()["skills"]) == n
+            print(f"{n:>5} {statistics.median(timings):>8.2f} {statistics.mean(timings):>8.2f} {queries:>8}")
+
+    app.dependency_overrides.pop(get_db, None)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat))
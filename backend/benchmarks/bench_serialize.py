@@ -0,0 +1,96 @@
+"""Micro-benchmark: per-request CPU time to serialize a resolve response.
+
+Compares the previous path (build ResolvedSkill models, let FastAPI
+re-validate and JSON-encode them) with stitching the version cache's
+pre-encoded fragments.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialize [--skills 10] [--content-kb 200]
+"""
+
+import argparse
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+os.environ["TESTING"] = "true"
+
+from app.api.plugin import _encode_resolve_response, _encode_resolved_skill
+from app.schemas.skill import ResolvedSkill, ResolveResponse
+from app.services.version_cache import CachedVersion
+
+
+def _fixture(n_skills: int, content_kb: int):
+    pairs = []
+    for i in range(n_skills):
+        skill = SimpleNamespace(name=f"skill-{i}", description="benchmark skill")
+        version = SimpleNamespace(
+            id=uuid.uuid4(),
+            skill_id=uuid.uuid4(),
+            version="1.0.0",
+            content=f"# Skill {i}\n" + ("lorem ipsum ✓ " * 73 + "\n") * content_kb,
+            content_digest="0" * 64,
+            digest="0" * 64,
+            changelog=None,
+            metadata_json=None,
+            created_at=datetime.now(timezone.utc),
+            published_at=None,
+            files=[SimpleNamespace(path=f"refs/{j}.md", content="y" * 20_000) for j in range(5)],
+        )
+        pairs.append((skill, CachedVersion.from_model(version)))
+    return pairs
+
+
+def _pydantic_path(pairs) -> bytes:
+    response = ResolveResponse(skills=[
+        ResolvedSkill(
+            name=skill.name,
+            version=version.version,
+            digest=version.digest,
+            description=skill.description,
+            content=version.content,
+            files=version.files,
+        )
+        for skill, version in pairs
+    ])
+    # What FastAPI does with a response_model: validate, dump to JSON-able data, json.dumps.
+    validated = ResolveResponse.model_validate(response.model_dump())
+    content = validated.model_dump(mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def _fragment_path(pairs) -> bytes:
+    return _encode_resolve_response([_encode_resolved_skill(skill, version) for skill, version in pairs], [], [])
+
+
+def _cpu_ms(fn, pairs, iterations: int) -> float:
+    fn(pairs)  # warm-up
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(pairs)
+    return (time.process_time() - start) * 1000 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skills", type=int, default=10)
+    parser.add_argument("--content-kb", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    pairs = _fixture(args.skills, args.content_kb)
+    assert json.loads(_pydantic_path(pairs)) == json.loads(_fragment_path(pairs))
+    size_kb = len(_fragment_path(pairs)) / 1024
+
+    before = _cpu_ms(_pydantic_path, pairs, args.iterations)
+    after = _cpu_ms(_fragment_path, pairs, args.iterations)
+    print(f"{args.skills} skills, {size_kb:.0f} KiB response")
+    print(f"pydantic + re-encode : {before:8.3f} ms CPU/request")
+    print(f"pre-encoded fragments: {after:8.3f} ms CPU/request ({before / after:.0f}x less)")
+
+
+if __name__ == "__main__":
+    main()
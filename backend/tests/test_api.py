@@ -1,9 +1,11 @@
 import asyncio
 import json
 import os
+import tempfile
 import uuid
 
 os.environ["TESTING"] = "true"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")  # minimum cost keeps register/login fast
 
 import pytest
 import pytest_asyncio
@@ -13,8 +15,8 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from app.database import Base, get_db
 from app.main import app
 
-# Use SQLite for testing (async)
-TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+# Use SQLite for testing (async), in a scratch directory so runs leave the tree clean
+TEST_DATABASE_URL = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='skills-hub-test-'), 'test.db')}"
 
 engine = create_async_engine(TEST_DATABASE_URL, echo=False)
 TestSession = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
@@ -185,6 +187,137 @@ class TestAuth:
         resp = await client.get("/api/auth/me", headers={"Authorization": "Bearer invalid"})
         assert resp.status_code == 401
 
+    async def test_login_rehashes_on_cost_change(self, client: AsyncClient, monkeypatch):
+        from sqlalchemy import select
+        from app.config import settings
+        from app.models.user import User
+        from app.services.password_hasher import hash_rounds
+
+        await client.post("/api/auth/register", json={
+            "username": "rehash", "email": "rehash@test.com", "password": "pass12345",
+        })
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+        resp = await client.post("/api/auth/login", json={"username": "rehash", "password": "pass12345"})
+        assert resp.status_code == 200
+        async with TestSession() as db:
+            user = (await db.execute(select(User).where(User.username == "rehash"))).scalar_one()
+        assert hash_rounds(user.password_hash) == 5
+        resp = await client.post("/api/auth/login", json={"username": "rehash", "password": "pass12345"})
+        assert resp.status_code == 200
+
+    async def test_login_503_when_hasher_saturated(self, client: AsyncClient, monkeypatch):
+        from app.services.password_hasher import password_hasher
+
+        await client.post("/api/auth/register", json={
+            "username": "busy", "email": "busy@test.com", "password": "pass12345",
+        })
+        monkeypatch.setattr(password_hasher, "queue_timeout", 0.05)
+        for _ in range(password_hasher.max_concurrency):
+            await password_hasher._slots.acquire()
+        try:
+            resp = await client.post("/api/auth/login", json={"username": "busy", "password": "pass12345"})
+        finally:
+            for _ in range(password_hasher.max_concurrency):
+                password_hasher._slots.release()
+        assert resp.status_code == 503
+        assert resp.headers["retry-after"] == "1"
+        resp = await client.post("/api/auth/login", json={"username": "busy", "password": "pass12345"})
+        assert resp.status_code == 200
+
+    async def _stateless_login(self, client: AsyncClient, monkeypatch) -> dict:
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "JWT_STATELESS", True)
+        await client.post("/api/auth/register", json={
+            "username": "nomad", "email": "nomad@test.com", "password": "pass12345",
+        })
+        resp = await client.post("/api/auth/login", json={"username": "nomad", "password": "pass12345"})
+        assert resp.status_code == 200
+        return resp.json()
+
+    async def test_stateless_token_skips_users_table(self, client: AsyncClient, monkeypatch):
+        from sqlalchemy import event
+        from app.core.security import decode_token
+
+        tokens = await self._stateless_login(client, monkeypatch)
+        assert tokens["refresh_token"] and tokens["expires_in"] == 15 * 60
+        claims = decode_token(tokens["access_token"])
+        assert (claims["typ"], claims["role"], claims["teams"]) == ("access", "member", [])
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+        event.listen(engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            resp = await client.get("/api/teams", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", listener)
+        assert resp.status_code == 200
+        assert statements and not any("FROM users" in s for s in statements)
+
+    async def test_team_change_forces_refresh(self, client: AsyncClient, monkeypatch):
+        from app.core.security import decode_token
+        from app.services.token_revocations import token_revocations
+
+        tokens = await self._stateless_login(client, monkeypatch)
+        old_auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+        team_id = (await client.post("/api/teams", json={"name": "Nomads", "slug": "nomads"},
+                                     headers=old_auth)).json()["id"]
+
+        # The old token still claims no teams, so it is rejected until the client refreshes.
+        resp = await client.get("/api/teams/my", headers=old_auth)
+        assert resp.status_code == 401
+
+        resp = await client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert resp.status_code == 200
+        refreshed = resp.json()
+        assert decode_token(refreshed["access_token"])["teams"] == [team_id]
+        resp = await client.get("/api/teams/my", headers={"Authorization": f"Bearer {refreshed['access_token']}"})
+        assert [t["slug"] for t in resp.json()] == ["nomads"]
+
+        # Refresh tokens are single use, on every worker: the revocation is not kept in process memory.
+        token_revocations.clear()
+        resp = await client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert resp.status_code == 401
+
+    async def test_token_types_are_not_interchangeable(self, client: AsyncClient, monkeypatch):
+        tokens = await self._stateless_login(client, monkeypatch)
+        resp = await client.get("/api/teams", headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+        assert resp.status_code == 401
+        resp = await client.post("/api/auth/refresh", json={"refresh_token": tokens["access_token"]})
+        assert resp.status_code == 401
+
+    async def test_logout_revokes_tokens(self, client: AsyncClient, monkeypatch):
+        from datetime import datetime, timedelta, timezone
+
+        from sqlalchemy import select
+
+        from app.core.security import decode_token
+        from app.models.revoked_token import RevokedRefreshToken
+        from app.services.token_revocations import token_revocations
+
+        tokens = await self._stateless_login(client, monkeypatch)
+        access = {"Authorization": f"Bearer {tokens['access_token']}"}
+        resp = await client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]},
+                                 headers=access)
+        assert resp.status_code == 204
+        assert (await client.get("/api/teams", headers=access)).status_code == 401
+
+        # A restarted worker has an empty in-memory list but still refuses the refresh token.
+        token_revocations.clear()
+        resp = await client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert resp.status_code == 401
+
+        # Rows of expired tokens are pruned on the next revocation.
+        async with TestSession() as db:
+            row = (await db.execute(select(RevokedRefreshToken))).scalar_one()
+            row.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+            await db.commit()
+        tokens = (await client.post("/api/auth/login", json={"username": "nomad", "password": "pass12345"})).json()
+        assert (await client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})).status_code == 200
+        async with TestSession() as db:
+            jtis = (await db.execute(select(RevokedRefreshToken.jti))).scalars().all()
+        assert jtis == [decode_token(tokens["refresh_token"])["jti"]]
+
 
 # ============================================================
 # 2. Skill CRUD 测试
@@ -324,11 +457,126 @@ class TestSkillCRUD:
         assert resp.status_code == 200
         assert resp.json()["total"] >= 1
 
+    async def test_list_skills_search_without_terms(self, client: AsyncClient, auth_header: dict, sample_skill):
+        for q in ("!!!", "--"):
+            resp = await client.get("/api/skills", params={"q": q, "facets": "true"}, headers=auth_header)
+            assert resp.status_code == 200
+            assert resp.json() == {"items": [], "total": 0, "next_cursor": None, "tag_facets": []}
+
+    async def test_list_skills_full_text_ranking(self, client: AsyncClient, auth_header: dict):
+        for name, display_name, description in (
+            ("plain", "Plain", "nothing here"),
+            ("notes", "Notes", "how to kube things"),
+            ("kube-deploy", "Deploy", "ships things"),
+        ):
+            await client.post("/api/skills", json={
+                "name": name, "display_name": display_name, "description": description, "visibility": "public",
+            }, headers=auth_header)
+        await client.post("/api/skills/plain/versions", json={
+            "version": "1.0.0", "content": "# Plain\n\nA kubernetes rollout checklist.",
+        }, headers=auth_header)
+
+        async def search(q: str) -> list[str]:
+            resp = await client.get("/api/skills", params={"q": q}, headers=auth_header)
+            assert resp.status_code == 200
+            return [item["name"] for item in resp.json()["items"]]
+
+        # name > description > SKILL.md body; terms match as prefixes
+        assert await search("kube") == ["kube-deploy", "notes", "plain"]
+        assert await search("ROLLOUT checklist") == ["plain"]
+        assert await search("rollout ships") == []
+        assert await search("--") == []  # no word tokens: nothing matches
+
+        await client.put("/api/skills/notes", json={"description": "nothing"}, headers=auth_header)
+        await client.delete("/api/skills/kube-deploy", headers=auth_header)
+        assert await search("kube") == ["plain"]
+
+    async def test_list_skills_cursor_pagination(self, client: AsyncClient, auth_header: dict):
+        # Skills created within the same second share updated_at; the id breaks the tie.
+        for i in range(7):
+            await client.post("/api/skills", json={
+                "name": f"page-{i}", "display_name": f"Page {i}", "description": "paged", "visibility": "public",
+            }, headers=auth_header)
+        first = (await client.get("/api/skills", params={"size": 50}, headers=auth_header)).json()
+        assert first["total"] == 7 and first["next_cursor"] is None
+
+        seen, cursor = [], None
+        while True:
+            params = {"size": 3, "total": "none"} | ({"cursor": cursor} if cursor else {})
+            data = (await client.get("/api/skills", params=params, headers=auth_header)).json()
+            assert data["total"] is None
+            seen += [item["name"] for item in data["items"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == [item["name"] for item in first["items"]]
+
+        # Relevance-ranked results page through the same cursor parameter.
+        data = (await client.get("/api/skills", params={"q": "paged", "size": 4}, headers=auth_header)).json()
+        rest = (await client.get("/api/skills", params={"q": "paged", "size": 4, "cursor": data["next_cursor"]},
+                                 headers=auth_header)).json()
+        assert sorted(i["name"] for i in data["items"] + rest["items"]) == sorted(seen)
+        assert rest["next_cursor"] is None
+
+        resp = await client.get("/api/skills", params={"cursor": "not-a-cursor"}, headers=auth_header)
+        assert resp.status_code == 400
+        resp = await client.get("/api/skills", params={"q": "paged", "cursor": first["items"][0]["id"]},
+                                headers=auth_header)
+        assert resp.status_code == 400
+
+    async def test_list_skills_total_modes(self, client: AsyncClient, auth_header: dict, sample_skill):
+        for mode in ("exact", "cached", "estimate"):
+            resp = await client.get("/api/skills", params={"total": mode}, headers=auth_header)
+            assert resp.json()["total"] == 1
+        # Creating a skill drops cached totals on this worker.
+        await client.post("/api/skills", json={
+            "name": "counted", "display_name": "Counted", "description": "", "visibility": "public",
+        }, headers=auth_header)
+        resp = await client.get("/api/skills", params={"total": "cached"}, headers=auth_header)
+        assert resp.json()["total"] == 2
+
     async def test_list_skills_tag_filter(self, client: AsyncClient, auth_header: dict, sample_skill):
-        # Tag filtering uses JSON contains — works on PostgreSQL, may not on SQLite
-        # Just verify the endpoint doesn't error out
         resp = await client.get("/api/skills?tag=demo", headers=auth_header)
         assert resp.status_code == 200
+        assert [item["name"] for item in resp.json()["items"]] == ["test-skill"]
+        resp = await client.get("/api/skills?tag=dem", headers=auth_header)
+        assert resp.json()["items"] == []
+
+    async def test_list_skills_multi_tag_filter_and_facets(self, client: AsyncClient, auth_header: dict,
+                                                         sample_skill):
+        await client.post("/api/skills", json={
+            "name": "other-skill", "display_name": "Other", "description": "",
+            "tags": ["demo", "extra", "demo"], "visibility": "public",
+        }, headers=auth_header)
+
+        def names(resp):
+            return sorted(item["name"] for item in resp.json()["items"])
+
+        resp = await client.get("/api/skills", params={"tag": ["demo", "test"]}, headers=auth_header)
+        assert names(resp) == ["test-skill"]
+        resp = await client.get("/api/skills", params={"tag": ["test", "extra"], "tag_mode": "any"},
+                                headers=auth_header)
+        assert names(resp) == ["other-skill", "test-skill"]
+        resp = await client.get("/api/skills", params={"tag": ["test", "extra"]}, headers=auth_header)
+        assert resp.json()["items"] == []
+
+        resp = await client.get("/api/skills", params={"facets": "true"}, headers=auth_header)
+        assert resp.json()["tag_facets"] == [
+            {"tag": "demo", "count": 2}, {"tag": "extra", "count": 1}, {"tag": "test", "count": 1},
+        ]
+        # Facets cover every matching skill, not just the page.
+        resp = await client.get("/api/skills", params={"tag": "extra", "facets": "true", "size": 1},
+                                headers=auth_header)
+        assert resp.json()["tag_facets"] == [{"tag": "demo", "count": 1}, {"tag": "extra", "count": 1}]
+        resp = await client.get("/api/skills", headers=auth_header)
+        assert resp.json()["tag_facets"] is None
+
+        # Editing tags moves the skill between filters.
+        await client.put("/api/skills/other-skill", json={"tags": ["fresh"]}, headers=auth_header)
+        resp = await client.get("/api/skills", params={"tag": "extra"}, headers=auth_header)
+        assert resp.json()["items"] == []
+        resp = await client.get("/api/skills", params={"tag": "fresh"}, headers=auth_header)
+        assert names(resp) == ["other-skill"]
 
     async def test_get_skill(self, client: AsyncClient, auth_header: dict, sample_skill):
         resp = await client.get("/api/skills/test-skill", headers=auth_header)
@@ -411,6 +659,76 @@ class TestSkillCRUD:
 class TestVersionManagement:
     """Skill 版本的创建和查询"""
 
+    async def test_version_digests(self, client: AsyncClient, auth_header: dict, sample_version):
+        import hashlib
+
+        from app.utils.digest import version_digest
+
+        content_digest = hashlib.sha256("# Test Skill\n\nThis is a test.".encode()).hexdigest()
+        file_digests = {
+            "references/api.md": hashlib.sha256(b"# API Reference").hexdigest(),
+            "examples/basic.md": hashlib.sha256(b"# Basic Example").hexdigest(),
+        }
+        assert sample_version["content_digest"] == content_digest
+        assert sample_version["digest"] == version_digest(content_digest, file_digests)
+
+        resp = await client.get("/api/skills/test-skill/versions/1.0.0", headers=auth_header)
+        assert resp.json()["digest"] == sample_version["digest"]
+
+    async def test_large_content_compressed_at_rest(self, client: AsyncClient, auth_header: dict, sample_version):
+        from sqlalchemy import LargeBinary, select, type_coerce
+
+        from app.models.skill import SkillFile, SkillVersion
+
+        content = "# Big Skill\n\n" + "Use the deployment checklist before every rollout.\n" * 200
+        big_file = "| step | owner |\n" * 500
+        resp = await client.post("/api/skills/test-skill/versions", json={
+            "version": "2.0.0",
+            "content": content,
+            "files": {"references/big.md": big_file},
+        }, headers=auth_header)
+        assert resp.status_code == 201
+
+        async with TestSession() as db:
+            stored = dict((await db.execute(
+                select(SkillVersion.version, type_coerce(SkillVersion.content, LargeBinary))
+            )).all())
+            stored_file = (await db.execute(
+                select(type_coerce(SkillFile.content, LargeBinary)).where(SkillFile.path == "references/big.md")
+            )).scalar_one()
+        assert stored["1.0.0"][0] == 0x00  # below the threshold: raw UTF-8
+        assert stored["2.0.0"][0] == 0x01 and len(stored["2.0.0"]) < len(content) // 4
+        assert stored_file[0] == 0x01 and len(stored_file) < len(big_file) // 4
+
+        resp = await client.get("/api/skills/test-skill/versions/2.0.0", headers=auth_header)
+        assert resp.json()["content"] == content
+        assert resp.json()["files"]["references/big.md"] == big_file
+
+    async def test_latest_version_pointer_skips_version_bodies(self, client: AsyncClient, auth_header: dict,
+                                                               sample_version):
+        from sqlalchemy import event
+
+        await client.post("/api/skills/test-skill/versions", json={
+            "version": "1.1.0",
+            "content": "# Test Skill v1.1",
+        }, headers=auth_header)
+
+        statements = []
+
+        def _capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+        try:
+            listed = await client.get("/api/skills", headers=auth_header)
+            detail = await client.get("/api/skills/test-skill", headers=auth_header)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+
+        assert listed.json()["items"][0]["latest_version"] == "1.1.0"
+        assert detail.json()["latest_version"] == "1.1.0"
+        assert not [s for s in statements if "skill_versions.content" in s]
+
     async def test_create_version(self, client: AsyncClient, auth_header: dict, sample_skill):
         resp = await client.post("/api/skills/test-skill/versions", json={
             "version": "0.1.0",
@@ -475,6 +793,27 @@ class TestVersionManagement:
         data = resp.json()
         assert len(data) >= 1
         assert data[0]["version"] == "1.0.0"
+        assert data[0]["content"] == "# Test Skill\n\nThis is a test."
+
+    async def test_list_versions_summary_and_fields(self, client: AsyncClient, auth_header: dict, sample_version):
+        await client.post("/api/skills/test-skill/versions", json={
+            "version": "1.1.0", "content": "# v1.1", "metadata_json": {"k": "v"},
+        }, headers=auth_header)
+
+        resp = await client.get("/api/skills/test-skill/versions", params={"summary": "true"}, headers=auth_header)
+        assert resp.status_code == 200
+        assert sorted((v["version"], v["content"], v["metadata_json"]) for v in resp.json()) == [
+            ("1.0.0", None, None), ("1.1.0", None, None),
+        ]
+        assert all(v["digest"] for v in resp.json())
+
+        resp = await client.get("/api/skills/test-skill/versions", params={"fields": "metadata_json"},
+                                headers=auth_header)
+        latest = next(v for v in resp.json() if v["version"] == "1.1.0")
+        assert (latest["content"], latest["metadata_json"]) == (None, {"k": "v"})
+
+        resp = await client.get("/api/skills/test-skill/versions", params={"fields": "files"}, headers=auth_header)
+        assert resp.status_code == 400
 
     async def test_get_version(self, client: AsyncClient, auth_header: dict, sample_version):
         resp = await client.get("/api/skills/test-skill/versions/1.0.0", headers=auth_header)
@@ -551,6 +890,10 @@ class TestSkillEditLogs:
         detail = json.loads(version_log["detail"])
         assert detail["summary"]["files_added"] == 1
         assert detail["summary"]["files_modified"] == 1
+        lengths = {(x["action"], x["target_path"]): json.loads(x["detail"]) for x in logs if x["target_type"] == "file" and x["to_version"] == "1.1.0"}
+        assert lengths[("file_modified", "references/api.md")] == {"old_length": 6, "new_length": 8}
+        assert lengths[("file_deleted", "examples/basic.md")] == {"old_length": 8}
+        assert lengths[("skill_md_updated", "SKILL.md")] == {"old_length": 4, "new_length": 6}
         assert detail["summary"]["files_deleted"] == 1
         assert detail["summary"]["added_paths"] == ["examples/advanced.md"]
         assert detail["summary"]["modified_paths"] == ["references/api.md"]
@@ -655,6 +998,72 @@ class TestApiKeys:
         resp = await client.delete(f"/api/keys/{fake_id}", headers=auth_header)
         assert resp.status_code == 404
 
+    async def test_key_embeds_id_and_principal_is_cached(self, client: AsyncClient, auth_header: dict,
+                                                         sample_version):
+        from app.core.security import parse_api_key_id
+        from app.services.principal_cache import principal_cache
+
+        created = (await client.post("/api/keys", json={"name": "cached"}, headers=auth_header)).json()
+        assert parse_api_key_id(created["key"]) == uuid.UUID(created["id"])
+        key_header = {"Authorization": f"Bearer {created['key']}"}
+
+        assert (await client.get("/api/v1/skills/catalog", headers=key_header)).status_code == 200
+        hits = principal_cache.hits
+        resp = await client.get("/api/v1/skills/catalog", headers=key_header)
+        assert resp.json()["skills"][0]["name"] == "test-skill"
+        assert principal_cache.hits == hits + 1
+
+        # Updating the key's tag restriction takes effect on the next request.
+        await client.put(f"/api/keys/{created['id']}", json={"allowed_tags": ["other"]}, headers=auth_header)
+        resp = await client.get("/api/v1/skills/catalog", headers=key_header)
+        assert resp.json()["skills"] == []
+
+        await client.delete(f"/api/keys/{created['id']}", headers=auth_header)
+        resp = await client.get("/api/v1/skills/catalog", headers=key_header)
+        assert resp.status_code == 401
+
+        # A forged secret with a valid embedded id is rejected.
+        forged = created["key"][:-4] + "AAAA"
+        resp = await client.get("/api/v1/skills/catalog", headers={"Authorization": f"Bearer {forged}"})
+        assert resp.status_code == 401
+
+    async def test_legacy_key_found_by_hash(self, client: AsyncClient, auth_header: dict):
+        from app.core.security import hash_api_key, parse_api_key_id
+        from app.models.api_key import ApiKey
+
+        legacy = "skh_" + "x" * 43
+        assert parse_api_key_id(legacy) is None
+        user_id = uuid.UUID((await client.get("/api/auth/me", headers=auth_header)).json()["id"])
+        async with TestSession() as db:
+            db.add(ApiKey(user_id=user_id, key_hash=hash_api_key(legacy), name="legacy"))
+            await db.commit()
+        resp = await client.get("/api/v1/skills/catalog", headers={"Authorization": f"Bearer {legacy}"})
+        assert resp.status_code == 200
+
+    async def test_membership_change_invalidates_cached_principal(self, client: AsyncClient, auth_header: dict):
+        team_id = (await client.post("/api/teams", json={"name": "Cache Team", "slug": "cache-team"},
+                                     headers=auth_header)).json()["id"]
+        await client.post("/api/skills", json={
+            "name": "team-cached", "display_name": "Team", "description": "", "visibility": "team",
+            "team_ids": [team_id],
+        }, headers=auth_header)
+        await client.post("/api/skills/team-cached/versions", json={"version": "1.0.0", "content": "# T"},
+                          headers=auth_header)
+
+        await client.post("/api/auth/register", json={
+            "username": "joiner", "email": "joiner@example.com", "password": "pass12345",
+        })
+        login = await client.post("/api/auth/login", json={"username": "joiner", "password": "pass12345"})
+        joiner_auth = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        key = (await client.post("/api/keys", json={"name": "joiner"}, headers=joiner_auth)).json()["key"]
+        key_header = {"Authorization": f"Bearer {key}"}
+        assert (await client.get("/api/v1/skills/catalog", headers=key_header)).json()["skills"] == []
+
+        await client.post("/api/teams/cache-team/join", headers=joiner_auth)
+        await client.post("/api/skills/team-cached/subscribe", headers=joiner_auth)
+        resp = await client.get("/api/v1/skills/catalog", headers=key_header)
+        assert [s["name"] for s in resp.json()["skills"]] == ["team-cached"]
+
 
 # ============================================================
 # 6. Plugin API 测试
@@ -670,6 +1079,31 @@ class TestPluginAPI:
         data = resp.json()
         assert any(s["name"] == "test-skill" for s in data["skills"])
 
+    async def test_catalog_etag_not_modified(self, client: AsyncClient, api_key_header: dict):
+        resp = await client.get("/api/v1/skills/catalog", headers=api_key_header)
+        etag = resp.headers["etag"]
+        resp = await client.get("/api/v1/skills/catalog", headers={**api_key_header, "If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.headers["etag"] == etag
+        assert resp.content == b""
+
+    async def test_catalog_etag_changes_on_publish_and_unsubscribe(self, client: AsyncClient,
+                                                                   api_key_header: dict, auth_header: dict):
+        etag = (await client.get("/api/v1/skills/catalog", headers=api_key_header)).headers["etag"]
+        await client.post("/api/skills/test-skill/versions", json={
+            "version": "1.1.0",
+            "content": "# Test Skill v1.1",
+        }, headers=auth_header)
+        resp = await client.get("/api/v1/skills/catalog", headers={**api_key_header, "If-None-Match": etag})
+        assert resp.status_code == 200
+        published_etag = resp.headers["etag"]
+        assert published_etag != etag
+
+        await client.delete("/api/skills/test-skill/subscribe", headers=auth_header)
+        resp = await client.get("/api/v1/skills/catalog", headers={**api_key_header, "If-None-Match": published_etag})
+        assert resp.status_code == 200
+        assert resp.json()["skills"] == []
+
     async def test_resolve_single(self, client: AsyncClient, api_key_header: dict,
                                   auth_header: dict):
         resp = await client.post("/api/v1/skills/resolve", json={
@@ -692,6 +1126,181 @@ class TestPluginAPI:
         assert resp.status_code == 200
         assert resp.json()["skills"][0]["version"] == "1.0.0"
 
+    async def test_resolve_pinned_and_latest_same_skill(self, client: AsyncClient, api_key_header: dict,
+                                                        auth_header: dict):
+        await client.post("/api/skills/test-skill/versions", json={
+            "version": "1.1.0",
+            "content": "# Test Skill v1.1",
+        }, headers=auth_header)
+        resp = await client.post("/api/v1/skills/resolve", json={
+            "skills": ["test-skill@1.0.0", "test-skill", "test-skill@9.9.9"],
+        }, headers=api_key_header)
+        assert resp.status_code == 200
+        skills = resp.json()["skills"]
+        assert len(skills) == 2
+        assert skills[0]["version"] == "1.0.0"
+        assert skills[0]["files"] == {"references/api.md": "# API Reference", "examples/basic.md": "# Basic Example"}
+        assert skills[1]["version"] == "1.1.0"
+
+    async def test_resolve_delta_known_versions(self, client: AsyncClient, api_key_header: dict,
+                                                auth_header: dict):
+        resp = await client.post("/api/v1/skills/resolve", json={
+            "skills": ["test-skill", "gone-skill"],
+            "known": {"test-skill": "1.0.0", "gone-skill": "2.0.0"},
+        }, headers=api_key_header)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["skills"] == []
+        assert data["unchanged"] == ["test-skill"]
+        assert data["revoked"] == ["gone-skill"]
+
+        # The version digest is accepted as well.
+        digest = (await client.get("/api/v1/skills/catalog", headers=api_key_header)).json()["skills"][0]["digest"]
+        resp = await client.post("/api/v1/skills/resolve", json={
+            "skills": ["test-skill"],
+            "known": {"test-skill": digest},
+        }, headers=api_key_header)
+        assert resp.json()["unchanged"] == ["test-skill"]
+
+        # An outdated copy gets the full payload again.
+        resp = await client.post("/api/v1/skills/resolve", json={
+            "skills": ["test-skill"],
+            "known": {"test-skill": "0.9.0"},
+        }, headers=api_key_header)
+        data = resp.json()
+        assert [s["version"] for s in data["skills"]] == ["1.0.0"]
+        assert data["unchanged"] == []
+
+        # Unsubscribing revokes the skill for the client.
+        await client.delete("/api/skills/test-skill/subscribe", headers=auth_header)
+        resp = await client.post("/api/v1/skills/resolve", json={
+            "skills": ["test-skill"],
+            "known": {"test-skill": "1.0.0"},
+        }, headers=api_key_header)
+        assert resp.json()["revoked"] == ["test-skill"]
+
+    async def test_resolve_delta_is_keyed_by_spec(self, client: AsyncClient, api_key_header: dict,
+                                                  auth_header: dict):
+        await client.post("/api/skills/test-skill/versions", json={
+            "version": "2.0.0", "content": "# v2",
+        }, headers=auth_header)
+        resp = await client.post("/api/v1/skills/resolve", json={
+            "skills": ["test-skill@1.0.0", "test-skill", "test-skill@9.9.9"],
+            "known": {"test-skill": "2.0.0", "test-skill@9.9.9": "9.9.9"},
+        }, headers=api_key_header)
+        data = resp.json()
+        assert [(s["spec"], s["version"]) for s in data["skills"]] == [("test-skill@1.0.0", "1.0.0")]
+        assert data["unchanged"] == ["test-skill"]
+        # A pin that matches nothing does not revoke a skill that is still accessible.
+        assert data["revoked"] == []
+
+        resp = await client.post("/api/v1/skills/resolve", json={
+            "skills": ["test-skill@1.0.0", "test-skill"],
+            "known": {"test-skill@1.0.0": "1.0.0"},
+        }, headers={**api_key_header, "Accept": "application/x-ndjson"})
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert [(s["spec"], s["version"]) for s in lines[:-1]] == [("test-skill", "2.0.0")]
+        assert lines[-1] == {"unchanged": ["test-skill@1.0.0"], "revoked": []}
+
+    async def test_resolve_body_matches_schema(self, client: AsyncClient, api_key_header: dict,
+                                               auth_header: dict):
+        from app.schemas.skill import ResolveResponse
+
+        await client.post("/api/skills/test-skill/versions", json={
+            "version": "2.0.0",
+            "content": "# 技能\n\n\"quoted\" \\ tab\t ✓",
+            "files": {"refs/ü.md": "línea\n"},
+        }, headers=auth_header)
+        resp = await client.post("/api/v1/skills/resolve", json={
+            "skills": ["test-skill@2.0.0"],
+        }, headers=api_key_header)
+        assert resp.headers["content-type"] == "application/json"
+        parsed = ResolveResponse.model_validate_json(resp.content)
+        assert parsed.skills[0].content == "# 技能\n\n\"quoted\" \\ tab\t ✓"
+        assert parsed.skills[0].files == {"refs/ü.md": "línea\n"}
+        assert resp.content == parsed.model_dump_json().encode()
+
+    async def test_resolve_ndjson_stream(self, client: AsyncClient, api_key_header: dict,
+                                         auth_header: dict):
+        from app.schemas.skill import ResolvedSkill
+
+        body = {"skills": ["test-skill", "test-skill@1.0.0", "nonexistent"], "known": {"nonexistent": "1.0.0"}}
+        full = await client.post("/api/v1/skills/resolve", json=body, headers=api_key_header)
+        resp = await client.post("/api/v1/skills/resolve", json=body,
+                                 headers={**api_key_header, "Accept": "application/x-ndjson"})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        skills, summary = lines[:-1], lines[-1]
+        assert skills == full.json()["skills"]
+        assert [ResolvedSkill.model_validate(s).name for s in skills] == ["test-skill", "test-skill"]
+        assert summary == {"unchanged": [], "revoked": ["nonexistent"]}
+
+        resp = await client.post("/api/v1/skills/resolve", json={
+            "skills": ["test-skill"], "known": {"test-skill": "1.0.0"},
+        }, headers={**api_key_header, "Accept": "application/x-ndjson"})
+        assert [json.loads(line) for line in resp.text.splitlines()] == [{"unchanged": ["test-skill"], "revoked": []}]
+
+        overview = await client.get("/api/stats/overview", headers=auth_header)
+        assert overview.json()["total_calls"] == 5  # usage is logged for streamed resolves too
+
+    async def test_lock_and_resolve_locked(self, client: AsyncClient, api_key_header: dict,
+                                           auth_header: dict, sample_version):
+        await client.post("/api/skills/test-skill/versions", json={
+            "version": "1.1.0",
+            "content": "# Test Skill v1.1",
+        }, headers=auth_header)
+
+        resp = await client.post("/api/v1/skills/lock", json={
+            "skills": ["test-skill@~1.0", "test-skill", "nonexistent", "test-skill@9.9.9"],
+        }, headers=api_key_header)
+        assert resp.status_code == 200
+        lock = resp.json()
+        assert [(e["name"], e["version"]) for e in lock["skills"]] == [("test-skill", "1.0.0"), ("test-skill", "1.1.0")]
+        assert lock["skills"][0]["digest"] == sample_version["digest"]
+        assert lock["unresolved"] == ["nonexistent", "test-skill@9.9.9"]
+
+        stale = {"name": "test-skill", "version": "1.1.0", "digest": "0" * 64}
+        resp = await client.post("/api/v1/skills/resolve", json={"lock": [lock["skills"][0], stale]},
+                                 headers=api_key_header)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [(s["name"], s["version"]) for s in data["skills"]] == [("test-skill", "1.0.0")]
+        assert data["skills"][0]["files"]["references/api.md"] == "# API Reference"
+        assert data["revoked"] == ["test-skill"]
+
+        resp = await client.post("/api/v1/skills/resolve", json={"skills": ["test-skill"], "lock": lock["skills"]},
+                                 headers=api_key_header)
+        assert resp.status_code == 422
+
+    async def test_locked_get_is_privately_cacheable(self, client: AsyncClient, api_key_header: dict,
+                                                     auth_header: dict, sample_version):
+        url = f"/api/v1/skills/test-skill/locked/{sample_version['digest']}"
+        resp = await client.get(url, headers=api_key_header)
+        assert resp.status_code == 200
+        assert resp.headers["cache-control"] == "private, max-age=31536000, immutable"
+        assert resp.headers["etag"] == f'"{sample_version["digest"]}"'
+        assert resp.json()["version"] == "1.0.0"
+        assert resp.json()["content"] == "# Test Skill\n\nThis is a test."
+        body = resp.content
+
+        # Neither a re-publish of the same content nor a description edit changes the body.
+        republished = await client.post("/api/skills/test-skill/versions", json={
+            "version": "1.0.1",
+            "content": "# Test Skill\n\nThis is a test.",
+            "files": {"references/api.md": "# API Reference", "examples/basic.md": "# Basic Example"},
+        }, headers=auth_header)
+        assert republished.json()["digest"] == sample_version["digest"]
+        await client.put("/api/skills/test-skill", json={"description": "Edited"}, headers=auth_header)
+        for _ in range(3):
+            assert (await client.get(url, headers=api_key_header)).content == body
+
+        resp = await client.get(url, headers={**api_key_header, "If-None-Match": f'"{sample_version["digest"]}"'})
+        assert resp.status_code == 304
+
+        resp = await client.get(f"/api/v1/skills/test-skill/locked/{'0' * 64}", headers=api_key_header)
+        assert resp.status_code == 404
+
     async def test_resolve_nonexistent_skill(self, client: AsyncClient, api_key_header: dict):
         resp = await client.post("/api/v1/skills/resolve", json={
             "skills": ["no-such-skill"],
@@ -716,10 +1325,160 @@ class TestPluginAPI:
         assert data["version"] == "1.0.0"
         assert "# Test Skill" in data["content"]
 
+    async def test_raw_markdown_gzip_passthrough(self, client: AsyncClient, api_key_header: dict,
+                                                 auth_header: dict):
+        content = "# Test Skill\n\n" + "Always run the linter first.\n" * 200
+        await client.post("/api/skills/test-skill/versions", json={
+            "version": "1.1.0",
+            "content": content,
+        }, headers=auth_header)
+
+        resp = await client.get("/api/v1/skills/test-skill/raw?version=1.1.0&format=markdown",
+                                headers={**api_key_header, "Accept-Encoding": "gzip"})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/markdown")
+        assert resp.headers["content-encoding"] == "gzip"
+        assert int(resp.headers["content-length"]) < len(content) // 4
+        assert resp.text == content
+
+        resp = await client.get("/api/v1/skills/test-skill/raw?version=1.1.0&format=markdown",
+                                headers={**api_key_header, "Accept-Encoding": "identity"})
+        assert "content-encoding" not in resp.headers
+        assert resp.text == content
+
+        # An explicit gzip entry wins over a refused wildcard.
+        resp = await client.get("/api/v1/skills/test-skill/raw?version=1.1.0&format=markdown",
+                                headers={**api_key_header, "Accept-Encoding": "*;q=0, gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.text == content
+
+    def test_accepts_gzip(self):
+        from app.api.plugin import _accepts_gzip
+
+        assert _accepts_gzip("gzip, deflate")
+        assert _accepts_gzip("*;q=0, gzip")
+        assert _accepts_gzip("br, *")
+        assert not _accepts_gzip("gzip;q=0, *")
+        assert not _accepts_gzip("*;q=0")
+        assert not _accepts_gzip("identity")
+        assert not _accepts_gzip(None)
+
+    async def test_version_bundle(self, client: AsyncClient, api_key_header: dict, sample_version,
+                                  tmp_path, monkeypatch):
+        import io
+        import tarfile
+
+        from app.config import settings
+        from app.services.bundles import bundle_path
+
+        monkeypatch.setattr(settings, "STORAGE_PATH", str(tmp_path))
+        url = "/api/v1/skills/test-skill/versions/1.0.0/bundle"
+        resp = await client.get(url, headers=api_key_header)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/gzip"
+        assert resp.headers["etag"] == f'"{sample_version["digest"]}"'
+        assert "test-skill-1.0.0.tar.gz" in resp.headers["content-disposition"]
+
+        with tarfile.open(fileobj=io.BytesIO(resp.content), mode="r:gz") as tar:
+            assert tar.getnames() == ["SKILL.md", "examples/basic.md", "references/api.md"]
+            assert tar.extractfile("SKILL.md").read().decode() == "# Test Skill\n\nThis is a test."
+            assert tar.extractfile("references/api.md").read() == b"# API Reference"
+            assert all(member.mtime == 0 for member in tar.getmembers())
+
+        path = bundle_path(sample_version["digest"])
+        assert path.read_bytes() == resp.content
+        path.unlink()  # rebuilt bundles are byte-identical
+        again = await client.get(url, headers=api_key_header)
+        assert again.content == resp.content
+
+        resp = await client.get(url, headers={**api_key_header, "If-None-Match": resp.headers["etag"]})
+        assert resp.status_code == 304
+
+        resp = await client.get("/api/v1/skills/test-skill/versions/9.9.9/bundle", headers=api_key_header)
+        assert resp.status_code == 404
+
     async def test_raw_not_found(self, client: AsyncClient, api_key_header: dict):
         resp = await client.get("/api/v1/skills/nonexistent/raw", headers=api_key_header)
         assert resp.status_code == 404
 
+    async def _publish_tagged(self, client: AsyncClient, auth_header: dict, name: str, tags: list[str]):
+        await client.post("/api/skills", json={
+            "name": name, "display_name": name, "description": f"About {name}", "tags": tags,
+            "visibility": "public",
+        }, headers=auth_header)
+        await client.post(f"/api/skills/{name}/versions", json={"version": "1.0.0", "content": f"# {name}"},
+                          headers=auth_header)
+
+    async def _unrestricted_key(self, client: AsyncClient, auth_header: dict) -> dict:
+        key = (await client.post("/api/keys", json={"name": "all-tags"}, headers=auth_header)).json()["key"]
+        return {"Authorization": f"Bearer {key}"}
+
+    async def test_catalog_cursor_pagination_and_filters(self, client: AsyncClient, auth_header: dict,
+                                                         sample_version):
+        for name, tags in [("alpha", ["ops"]), ("beta", ["docs"]), ("gamma", ["ops", "k8s"]), ("delta", [])]:
+            await self._publish_tagged(client, auth_header, name, tags)
+        api_key_header = await self._unrestricted_key(client, auth_header)
+
+        names, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            resp = await client.get("/api/v1/skills/catalog", params=params, headers=api_key_header)
+            assert resp.status_code == 200
+            page = resp.json()
+            assert len(page["skills"]) <= 2
+            names += [s["name"] for s in page["skills"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        assert names == ["alpha", "beta", "delta", "gamma", "test-skill"]
+
+        full = (await client.get("/api/v1/skills/catalog", headers=api_key_header)).json()
+        assert [s["name"] for s in full["skills"]] == names
+        assert full["next_cursor"] is None
+
+        resp = await client.get("/api/v1/skills/catalog", params={"tag": "ops"}, headers=api_key_header)
+        assert [s["name"] for s in resp.json()["skills"]] == ["alpha", "gamma"]
+        assert resp.headers["etag"] != (await client.get("/api/v1/skills/catalog", headers=api_key_header)).headers["etag"]
+        resp = await client.get("/api/v1/skills/catalog", params={"q": "K8S"}, headers=api_key_header)
+        assert [s["name"] for s in resp.json()["skills"]] == ["gamma"]
+        resp = await client.get("/api/v1/skills/catalog", params={"q": "about b"}, headers=api_key_header)
+        assert [s["name"] for s in resp.json()["skills"]] == ["beta"]
+        # Tags are matched one by one, not as the JSON text of the tags column.
+        for q in (",", '"', "["):
+            resp = await client.get("/api/v1/skills/catalog", params={"q": q}, headers=api_key_header)
+            assert resp.json()["skills"] == [], q
+
+        resp = await client.get("/api/v1/skills/catalog", params={"cursor": "%%%"}, headers=api_key_header)
+        assert resp.status_code == 400
+
+    async def test_api_key_allowed_tags_enforced(self, client: AsyncClient, auth_header: dict,
+                                                 api_key_header: dict):
+        await self._publish_tagged(client, auth_header, "ops-skill", ["ops"])
+        key = (await client.post("/api/keys", json={"name": "ops-only", "allowed_tags": ["ops", "k8s"]},
+                                 headers=auth_header)).json()["key"]
+        ops_header = {"Authorization": f"Bearer {key}"}
+
+        resp = await client.get("/api/v1/skills/catalog", headers=ops_header)
+        assert [s["name"] for s in resp.json()["skills"]] == ["ops-skill"]
+
+        resp = await client.post("/api/v1/skills/resolve", json={"skills": ["ops-skill", "test-skill"]},
+                                 headers=ops_header)
+        assert [s["name"] for s in resp.json()["skills"]] == ["ops-skill"]
+        resp = await client.post("/api/v1/skills/lock", json={"skills": ["ops-skill", "test-skill"]},
+                                 headers=ops_header)
+        assert resp.json()["unresolved"] == ["test-skill"]
+
+        resp = await client.get("/api/v1/skills/test-skill/raw", headers=ops_header)
+        assert resp.status_code == 403
+        resp = await client.get("/api/v1/skills/ops-skill/raw", headers=ops_header)
+        assert resp.status_code == 200
+
+        # Keys restricted to other tags, or not restricted at all, see their own catalogs.
+        resp = await client.get("/api/v1/skills/catalog", headers=api_key_header)
+        assert [s["name"] for s in resp.json()["skills"]] == ["test-skill"]
+        resp = await client.get("/api/v1/skills/catalog", headers=await self._unrestricted_key(client, auth_header))
+        assert [s["name"] for s in resp.json()["skills"]] == ["ops-skill", "test-skill"]
+
     async def test_plugin_api_no_auth(self, client: AsyncClient):
         resp = await client.get("/api/v1/skills/catalog")
         assert resp.status_code == 401
@@ -822,6 +1581,360 @@ class TestPluginAPI:
         outsider_raw = await client.get("/api/v1/skills/team-only-skill/raw", headers=outsider_key_header)
         assert outsider_raw.status_code in (403, 404)
 
+    @staticmethod
+    def _parse_sse(body: str) -> list[dict]:
+        events = []
+        for block in body.split("\n\n"):
+            fields = dict(line.split(": ", 1) for line in block.splitlines() if line and not line.startswith(":"))
+            if "event" in fields:
+                events.append({"id": int(fields["id"]), "event": fields["event"], **json.loads(fields["data"])})
+        return events
+
+    async def test_events_stream_and_resume(self, client: AsyncClient, auth_header: dict,
+                                            api_key_header: dict, monkeypatch):
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "EVENTS_MAX_STREAM_SECONDS", 0.2)
+        monkeypatch.setattr(settings, "EVENTS_POLL_INTERVAL", 0.05)
+
+        resp = await client.get("/api/v1/skills/events", headers={**api_key_header, "Last-Event-ID": "0"})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        assert resp.text.startswith("retry: ")
+        events = self._parse_sse(resp.text)
+        assert [(e["event"], e["skill"], e["version"]) for e in events] == [
+            ("version_published", "test-skill", "1.0.0"),
+        ]
+        assert len(events[0]["digest"]) == 64
+
+        # Without Last-Event-ID the feed starts at the current position.
+        resp = await client.get("/api/v1/skills/events", headers=api_key_header)
+        assert self._parse_sse(resp.text) == []
+
+        await client.post("/api/skills/test-skill/versions", json={
+            "version": "1.1.0",
+            "content": "# Test Skill v1.1",
+        }, headers=auth_header)
+        resp = await client.get("/api/v1/skills/events",
+                                headers={**api_key_header, "Last-Event-ID": str(events[-1]["id"])})
+        events = self._parse_sse(resp.text)
+        assert [(e["event"], e["version"]) for e in events] == [("version_published", "1.1.0")]
+
+        # Once unsubscribed, the skill's later changes are no longer delivered.
+        await client.delete("/api/skills/test-skill/subscribe", headers=auth_header)
+        await client.post("/api/skills/test-skill/versions", json={
+            "version": "1.2.0",
+            "content": "# Test Skill v1.2",
+        }, headers=auth_header)
+        resp = await client.get("/api/v1/skills/events",
+                                headers={**api_key_header, "Last-Event-ID": str(events[-1]["id"])})
+        assert [e["event"] for e in self._parse_sse(resp.text)] == ["unsubscribed"]
+
+        bad = await client.get("/api/v1/skills/events", headers={**api_key_header, "Last-Event-ID": "abc"})
+        assert bad.status_code == 400
+
+    async def test_events_only_for_own_subscriptions(self, client: AsyncClient, auth_header: dict,
+                                                     api_key_header: dict, monkeypatch):
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "EVENTS_MAX_STREAM_SECONDS", 0.2)
+        monkeypatch.setattr(settings, "EVENTS_POLL_INTERVAL", 0.05)
+
+        await client.post("/api/skills", json={
+            "name": "private-events", "display_name": "Private", "description": "", "tags": ["test"],
+            "visibility": "private",
+        }, headers=auth_header)
+        await client.post("/api/skills/private-events/versions", json={
+            "version": "1.0.0", "content": "# Private",
+        }, headers=auth_header)
+
+        await client.post("/api/auth/register", json={
+            "username": "watcher", "email": "watcher@example.com", "password": "pass12345",
+        })
+        login = await client.post("/api/auth/login", json={"username": "watcher", "password": "pass12345"})
+        watcher_auth = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        key = (await client.post("/api/keys", json={"name": "watcher-key"}, headers=watcher_auth)).json()["key"]
+        watcher_key = {"Authorization": f"Bearer {key}", "Last-Event-ID": "0"}
+
+        await client.post("/api/skills/test-skill/subscribe", headers=watcher_auth)
+        await client.post("/api/skills/test-skill/versions", json={
+            "version": "2.0.0", "content": "# v2",
+        }, headers=auth_header)
+
+        resp = await client.get("/api/v1/skills/events", headers=watcher_key)
+        events = [(e["event"], e["skill"], e["version"]) for e in self._parse_sse(resp.text)]
+        assert ("subscribed", "test-skill", None) in events
+        assert ("version_published", "test-skill", "2.0.0") in events
+        assert not any(skill == "private-events" for _, skill, _ in events)
+
+        owner_events = self._parse_sse((await client.get(
+            "/api/v1/skills/events", headers={**api_key_header, "Last-Event-ID": "0"})).text)
+        assert ("version_published", "private-events") in [(e["event"], e["skill"]) for e in owner_events]
+
+    async def test_events_revoke_access_for_subscribers(self, client: AsyncClient, auth_header: dict,
+                                                        api_key_header: dict, monkeypatch):
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "EVENTS_MAX_STREAM_SECONDS", 0.2)
+        monkeypatch.setattr(settings, "EVENTS_POLL_INTERVAL", 0.05)
+
+        await client.post("/api/auth/register", json={
+            "username": "watcher", "email": "watcher@example.com", "password": "pass12345",
+        })
+        login = await client.post("/api/auth/login", json={"username": "watcher", "password": "pass12345"})
+        watcher_auth = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        key = (await client.post("/api/keys", json={"name": "watcher-key"}, headers=watcher_auth)).json()["key"]
+        watcher_key = {"Authorization": f"Bearer {key}"}
+        await client.post("/api/skills/test-skill/subscribe", headers=watcher_auth)
+        last_id = self._parse_sse((await client.get(
+            "/api/v1/skills/events", headers={**watcher_key, "Last-Event-ID": "0"})).text)[-1]["id"]
+
+        # The owner makes the skill private: the watcher can no longer read it and is told so.
+        resp = await client.put("/api/skills/test-skill", json={"visibility": "private"}, headers=auth_header)
+        assert resp.status_code == 200
+        resp = await client.get("/api/v1/skills/events", headers={**watcher_key, "Last-Event-ID": str(last_id)})
+        assert [(e["event"], e["skill"]) for e in self._parse_sse(resp.text)] == [("access_revoked", "test-skill")]
+
+        # The owner keeps access and only sees the update.
+        owner_events = self._parse_sse((await client.get(
+            "/api/v1/skills/events", headers={**api_key_header, "Last-Event-ID": str(last_id)})).text)
+        assert [e["event"] for e in owner_events] == ["skill_updated"]
+
+        # Published again, then shared only with a team the watcher is not in.
+        await client.put("/api/skills/test-skill", json={"visibility": "public"}, headers=auth_header)
+        team = (await client.post("/api/teams", json={"name": "Owners", "slug": "owners"}, headers=auth_header)).json()
+        resp = await client.put("/api/skills/test-skill", json={"visibility": "team", "team_ids": [team["id"]]},
+                                headers=auth_header)
+        assert resp.status_code == 200
+        resp = await client.get("/api/v1/skills/events", headers={**watcher_key, "Last-Event-ID": str(last_id)})
+        # The skill-scoped update in between is filtered by the watcher's current (lost) access.
+        assert [e["event"] for e in self._parse_sse(resp.text)] == ["access_revoked", "access_revoked"]
+
+    async def test_events_wait_for_uncommitted_ids(self, client: AsyncClient, sample_version, monkeypatch):
+        from datetime import datetime, timedelta, timezone
+        from types import SimpleNamespace
+
+        from sqlalchemy import func, select
+
+        from app.config import settings
+        from app.models.change_event import SkillChangeEvent
+        from app.models.user import User
+        from app.services import change_feed
+        from app.services.change_feed import event_gaps, fetch_events, latest_event_id
+
+        clock = SimpleNamespace(now=1000.0)
+        monkeypatch.setattr(change_feed, "time", SimpleNamespace(monotonic=lambda: clock.now))
+        monkeypatch.setattr(settings, "EVENTS_GAP_TIMEOUT_SECONDS", 10)
+        event_gaps.clear()
+
+        async with TestSession() as db:
+            user = (await db.execute(select(User).where(User.username == "testuser"))).scalar_one()
+            start = (await db.execute(select(func.max(SkillChangeEvent.id)))).scalar()
+
+            def event(event_id, **fields):
+                return SkillChangeEvent(id=event_id, event_type="subscribed", skill_name="test-skill",
+                                        user_id=user.id, **fields)
+
+            # A slow transaction holds start + 1 while a later one commits start + 2. created_at is the
+            # transaction start on PostgreSQL, so start + 2 may well look minutes old.
+            db.add(event(start + 2, created_at=datetime.now(timezone.utc) - timedelta(minutes=5)))
+            await db.commit()
+            assert await fetch_events(db, user, start) == ([], start)
+            assert await latest_event_id(db) == start
+            clock.now += 9
+            assert await fetch_events(db, user, start) == ([], start)
+
+            # The slow transaction commits: both events are delivered, in id order.
+            db.add(event(start + 1))
+            await db.commit()
+            events, cursor = await fetch_events(db, user, start)
+            assert ([e.id for e in events], cursor) == ([start + 1, start + 2], start + 2)
+
+            # A gap watched for EVENTS_GAP_TIMEOUT_SECONDS is a rolled-back id and is skipped.
+            db.add(event(start + 4))
+            await db.commit()
+            assert await fetch_events(db, user, start + 2) == ([], start + 2)
+            clock.now += 10
+            events, cursor = await fetch_events(db, user, start + 2)
+            assert ([e.id for e in events], cursor) == ([start + 4], start + 4)
+            assert await latest_event_id(db) == start + 4
+
+
+class TestVersionCache:
+    """已发布版本的进程内 LRU 缓存"""
+
+    def _entry(self, version: str, size: int):
+        from datetime import datetime, timezone
+
+        from app.services.version_cache import CachedVersion
+
+        return CachedVersion(
+            id=uuid.uuid4(), skill_id=uuid.UUID(int=1), version=version, content="", content_digest="",
+            digest="", changelog=None, metadata_json=None, created_at=datetime.now(timezone.utc),
+            published_at=None, files={}, content_json=b'""', files_json=b"{}", size=size,
+        )
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        from app.services.version_cache import VersionCache
+
+        cache = VersionCache(max_bytes=250)
+        for ver in ("1.0.0", "1.1.0"):
+            cache.put(self._entry(ver, 100))
+        assert cache.get(uuid.UUID(int=1), "1.0.0") is not None  # 1.1.0 is now least recently used
+        cache.put(self._entry("1.2.0", 100))
+        assert cache.get(uuid.UUID(int=1), "1.1.0") is None
+        cache.put(self._entry("9.9.9", 1000))  # larger than the whole budget, never cached
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["bytes"] == 200
+        assert stats["evictions"] == 1
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    async def test_resolve_served_from_cache(self, client: AsyncClient, api_key_header: dict):
+        from app.services.version_cache import version_cache
+
+        await client.post("/api/v1/skills/resolve", json={"skills": ["test-skill"]}, headers=api_key_header)
+        hits = version_cache.hits
+        resp = await client.get("/api/v1/skills/test-skill/raw", headers=api_key_header)
+        assert resp.json()["content"] == "# Test Skill\n\nThis is a test."
+        assert version_cache.hits == hits + 1
+
+    def test_catalog_cache_revision_and_fanout(self):
+        from app.services.catalog_cache import CatalogCache
+
+        cache = CatalogCache(max_entries=2)
+        a, b, c = (uuid.UUID(int=i) for i in range(3))
+        cache.put(a, 0, b'{"skills":[]}')
+        assert cache.get(a, 0) == b'{"skills":[]}'
+        assert cache.get(a, 1) is None  # bumped elsewhere: stale entries are never served
+        cache.put(b, 0, b"b")
+        cache.put(c, 0, b"c")  # evicts a
+        cache.invalidate([b, c, uuid.UUID(int=9)])
+        stats = cache.stats()
+        assert (stats["entries"], stats["evictions"], stats["stale"]) == (0, 1, 1)
+        assert (stats["invalidations"], stats["invalidated_users"], stats["invalidated_entries"]) == (1, 3, 2)
+        assert stats["max_fanout"] == 3
+        assert stats["hit_rate"] == 0.5
+
+    async def test_catalog_served_from_cache_until_inputs_change(self, client: AsyncClient,
+                                                                 api_key_header: dict, auth_header: dict):
+        from app.services.catalog_cache import catalog_cache
+
+        first = await client.get("/api/v1/skills/catalog", headers=api_key_header)
+        hits = catalog_cache.hits
+        second = await client.get("/api/v1/skills/catalog", headers=api_key_header)
+        assert catalog_cache.hits == hits + 1
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+
+        invalidations = catalog_cache.invalidations
+        await client.post("/api/skills/test-skill/versions", json={
+            "version": "1.1.0",
+            "content": "# Test Skill v1.1",
+        }, headers=auth_header)
+        assert catalog_cache.invalidations == invalidations + 1
+        resp = await client.get("/api/v1/skills/catalog", headers=api_key_header)
+        assert resp.json()["skills"][0]["version"] == "1.1.0"
+
+        await client.delete("/api/skills/test-skill/subscribe", headers=auth_header)
+        resp = await client.get("/api/v1/skills/catalog", headers=api_key_header)
+        assert resp.json()["skills"] == []
+
+        await client.post("/api/skills/test-skill/subscribe", headers=auth_header)
+        resp = await client.get("/api/v1/skills/catalog", headers=api_key_header)
+        assert [s["name"] for s in resp.json()["skills"]] == ["test-skill"]
+
+    async def test_cache_stats_admin_only(self, client: AsyncClient, auth_header: dict):
+        resp = await client.get("/api/stats/cache", headers=auth_header)
+        assert resp.status_code == 403
+
+
+class TestSemverRanges:
+    """semver 优先级与 npm 风格版本范围"""
+
+    def test_precedence(self):
+        from app.utils.semver import parse_version
+
+        ordered = ["1.0.0-alpha", "1.0.0-alpha.1", "1.0.0-alpha.beta", "1.0.0-beta",
+                   "1.0.0-beta.2", "1.0.0-beta.11", "1.0.0-rc.1", "1.0.0", "1.2.0", "1.10.0"]
+        assert sorted(reversed(ordered), key=parse_version) == ordered
+        assert parse_version("1.0.0+build.1") == parse_version("1.0.0")
+        assert parse_version("1.2") is None
+
+    @pytest.mark.parametrize("spec,version,expected", [
+        ("^1.2", "1.9.9", True),
+        ("^1.2", "2.0.0", False),
+        ("^1.2", "1.5.0-beta", False),
+        ("^0.2.3", "0.3.0", False),
+        ("^0.0.3", "0.0.4", False),
+        ("~1.4.0", "1.4.9", True),
+        ("~1.4.0", "1.5.0", False),
+        (">=2 <3", "2.5.0", True),
+        (">=2 <3", "3.0.0-rc.1", False),
+        (">1", "2.0.0-alpha", False),
+        ("<=1.2", "1.2.9", True),
+        ("^1.2.3-beta.2", "1.2.3-beta.10", True),
+        ("^1.2.3-beta.2", "1.2.4-beta.3", False),
+        ("1.2 - 2.3.4", "2.3.5", False),
+        ("1.x || >=3", "3.1.0", True),
+        ("1.x || >=3", "2.0.0", False),
+        ("*", "5.0.0-rc", False),
+    ])
+    def test_satisfies(self, spec: str, version: str, expected: bool):
+        from app.utils.semver import parse_range, parse_version, satisfies
+
+        assert satisfies(parse_version(version), parse_range(spec)) is expected
+
+    async def test_resolve_ranges_from_index(self, client: AsyncClient, api_key_header: dict,
+                                             auth_header: dict):
+        from app.services.version_index import version_index
+
+        for ver in ("1.1.0", "2.0.0-beta.1", "1.10.0"):
+            await client.post("/api/skills/test-skill/versions", json={
+                "version": ver,
+                "content": f"# Test Skill {ver}",
+            }, headers=auth_header)
+
+        async def resolved(spec: str):
+            resp = await client.post("/api/v1/skills/resolve", json={"skills": [spec]}, headers=api_key_header)
+            return [s["version"] for s in resp.json()["skills"]]
+
+        assert await resolved("test-skill@^1.2") == ["1.10.0"]
+        assert await resolved("test-skill@~1.1") == ["1.1.0"]
+        assert await resolved("test-skill@>=2.0.0-0") == ["2.0.0-beta.1"]
+        assert await resolved("test-skill@^3") == []
+        assert await resolved("test-skill@1.1.0") == ["1.1.0"]
+
+        # Publishing moves latest_version_id, so the cached index entry is rebuilt.
+        misses = version_index.misses
+        await client.post("/api/skills/test-skill/versions", json={
+            "version": "1.11.0",
+            "content": "# Test Skill 1.11.0",
+        }, headers=auth_header)
+        assert await resolved("test-skill@^1") == ["1.11.0"]
+        assert version_index.misses == misses + 1
+
+        resp = await client.get("/api/v1/skills/test-skill/raw?version=~1.10", headers=api_key_header)
+        assert resp.json()["version"] == "1.10.0"
+
+        # Deleting the skill drops its entry in this worker.
+        skill_id = uuid.UUID((await client.get("/api/skills/test-skill", headers=auth_header)).json()["id"])
+        assert skill_id in version_index._entries
+        await client.delete("/api/skills/test-skill", headers=auth_header)
+        assert skill_id not in version_index._entries
+
+    def test_version_index_evicts_least_recently_used(self):
+        from app.services.version_index import VersionIndex
+
+        index = VersionIndex(max_entries=2)
+        skill_ids = [uuid.UUID(int=i) for i in range(3)]
+        for skill_id in skill_ids:
+            index._put(skill_id, (None, ()))
+        assert list(index._entries) == skill_ids[1:]
+        assert index.stats()["evictions"] == 1
+        index.invalidate(skill_ids[1])
+        assert list(index._entries) == skill_ids[2:]
+
 
 # ============================================================
 # 7. 使用统计测试
@@ -869,6 +1982,49 @@ class TestUsageLogging:
         # No resolve log for nonexistent skill (only 0 total)
         assert resp.json()["total_calls"] == 0
 
+    async def test_buffered_writer_batches_drops_and_dedups(self):
+        from sqlalchemy import func, select
+
+        from app.models.usage_log import SkillUsageLog
+        from app.services.usage_writer import UsageLogWriter
+
+        def event(name):
+            return {"id": uuid.uuid4(), "skill_id": None, "skill_name": name, "skill_version": "1.0.0",
+                    "user_id": None, "api_key_id": None, "action": "resolve"}
+
+        writer = UsageLogWriter(max_queue=3, batch_size=2, flush_interval=60, dedup_seconds=60)
+        assert writer.record(event("a"))
+        assert not writer.record(event("a"))  # identical event inside the dedup window
+        assert writer.record(event("b"))
+        assert writer.record(event("c"))
+        assert not writer.record(event("d"))  # queue full
+
+        writer.start(TestSession)
+        await writer.stop()
+        assert writer.stats() | {"running": None} == {
+            "running": None, "queued": 0, "max_queue": 3, "enqueued": 3,
+            "written": 3, "dropped": 1, "deduped": 1, "failed": 0,
+        }
+        async with TestSession() as db:
+            names = (await db.execute(select(SkillUsageLog.skill_name).order_by(SkillUsageLog.skill_name))).scalars()
+            assert list(names) == ["a", "b", "c"]
+            assert (await db.execute(select(func.count()).select_from(SkillUsageLog))).scalar() == 3
+
+    async def test_plugin_calls_go_through_running_writer(self, client: AsyncClient, api_key_header: dict,
+                                                         auth_header: dict):
+        from app.services.usage_writer import usage_writer
+
+        usage_writer.start(TestSession)
+        try:
+            await client.post("/api/v1/skills/resolve", json={"skills": ["test-skill"]}, headers=api_key_header)
+            await client.get("/api/v1/skills/catalog", headers=api_key_header)
+            assert usage_writer.stats()["queued"] == 2
+        finally:
+            await usage_writer.stop()
+
+        resp = await client.get("/api/stats/overview", headers=auth_header)
+        assert resp.json()["total_calls"] == 2
+
 
 class TestStatsAPI:
     """统计 API: overview / popular / trend"""
@@ -1157,6 +2313,81 @@ class TestSkillPermissionIsolation:
         assert "bob-key" in names
         assert "alice-key" not in names
 
+    @pytest.mark.parametrize("seed", range(5))
+    async def test_sql_access_filter_matches_can_access_skill(self, seed):
+        """skill_access_filter 与 can_access_skill 在随机数据上结果一致"""
+        import random
+
+        from sqlalchemy import select
+        from sqlalchemy.orm import selectinload
+
+        from app.core.permissions import can_access_skill, skill_access_filter
+        from app.core.principal import Principal
+        from app.models import Skill, SkillVisibilityTeam, Team, TeamMember, User
+        from app.services import visible_skills
+
+        rng = random.Random(seed)
+        async with TestSession() as db:
+            teams = [Team(name=f"t{i}", slug=f"t{i}") for i in range(4)]
+            users = [User(username=f"u{i}", email=f"u{i}@test.com", password_hash="x") for i in range(6)]
+            db.add_all(teams + users)
+            await db.flush()
+            memberships = {u.id: frozenset(t.id for t in rng.sample(teams, rng.randint(0, len(teams)))) for u in users}
+            db.add_all(TeamMember(user_id=uid, team_id=tid) for uid, tids in memberships.items() for tid in tids)
+            for i in range(60):
+                skill = Skill(
+                    name=f"s{i}", display_name=f"S{i}", tags=[],
+                    visibility=rng.choice(["public", "team", "private"]),
+                    author_id=rng.choice(users).id,
+                    team_id=rng.choice([t.id for t in teams] + [None, None]),
+                )
+                db.add(skill)
+                await db.flush()
+                for team in rng.sample(teams, rng.choice([0, 0, 1, 2])):
+                    db.add(SkillVisibilityTeam(skill_id=skill.id, team_id=team.id))
+            await visible_skills.rebuild(db)
+            await db.commit()
+            assert (await visible_skills.check(db))["consistent"]
+
+            skills = (await db.execute(select(Skill).options(selectinload(Skill.visibility_teams)))).scalars().all()
+            principals = [
+                Principal(id=uuid.uuid4(), username="admin", role="admin", team_ids=frozenset()),
+                Principal(id=uuid.uuid4(), username="stranger", role="member", team_ids=frozenset()),
+            ]
+            principals += [
+                Principal(id=u.id, username=u.username, role="member", team_ids=memberships[u.id]) for u in users
+            ]
+            for principal in principals:
+                expected = {s.id for s in skills if can_access_skill(s, principal)}
+                actual = set((await db.execute(select(Skill.id).where(skill_access_filter(principal)))).scalars())
+                assert actual == expected, principal
+
+    async def test_sql_access_filter_ignores_stale_team_claims(self):
+        """团队可见性以 user_visible_skills 为准，不依赖 token/缓存中的团队 id"""
+        from sqlalchemy import select
+
+        from app.core.permissions import skill_access_filter
+        from app.core.principal import Principal
+        from app.models import Skill, Team, TeamMember, User
+        from app.services import visible_skills
+
+        async with TestSession() as db:
+            team = Team(name="t", slug="t")
+            user = User(username="joiner", email="joiner@test.com", password_hash="x")
+            author = User(username="author", email="author@test.com", password_hash="x")
+            db.add_all([team, user, author])
+            await db.flush()
+            skill = Skill(name="shared", display_name="Shared", tags=[], visibility="team",
+                          author_id=author.id, team_id=team.id)
+            db.add_all([skill, TeamMember(user_id=user.id, team_id=team.id)])
+            await visible_skills.refresh_users(db, [user.id])
+            await db.commit()
+
+            # Claims issued before the user joined the team still list no teams.
+            stale = Principal(id=user.id, username=user.username, role="member", team_ids=frozenset())
+            visible = (await db.execute(select(Skill.name).where(skill_access_filter(stale)))).scalars().all()
+            assert visible == ["shared"]
+
 
 # ============================================================
 # 9. 团队管理测试
@@ -1313,6 +2544,62 @@ class TestTeams:
         assert "team-1" in slugs
         assert "team-2" in slugs
 
+    async def test_visibility_index_follows_membership_and_skill_edits(self, client: AsyncClient):
+        from sqlalchemy import text
+
+        from app.services import visible_skills
+
+        header_a = await self._create_user(client, "alice", "alice@test.com")
+        header_b = await self._create_user(client, "bob", "bob@test.com")
+        await client.post("/api/teams", json={"name": "TeamA", "slug": "team-a"}, headers=header_a)
+        await client.post("/api/teams", json={"name": "TeamB", "slug": "team-b"}, headers=header_a)
+        team_a = (await client.get("/api/teams/team-a", headers=header_a)).json()["id"]
+        team_b = (await client.get("/api/teams/team-b", headers=header_a)).json()["id"]
+        await client.post("/api/skills", json={
+            "name": "team-skill", "display_name": "Team Skill", "visibility": "team", "team_ids": [team_a],
+        }, headers=header_a)
+
+        async def bob_sees():
+            resp = await client.get("/api/skills", params={"total": "exact"}, headers=header_b)
+            return [item["name"] for item in resp.json()["items"]]
+
+        async def assert_consistent():
+            async with TestSession() as db:
+                assert (await visible_skills.check(db))["consistent"]
+
+        assert await bob_sees() == []
+        await client.post("/api/teams/team-a/join", headers=header_b)
+        assert await bob_sees() == ["team-skill"]
+        await assert_consistent()
+
+        # Moving the skill to a team Bob is not in hides it again.
+        await client.put("/api/skills/team-skill", json={"team_ids": [team_b]}, headers=header_a)
+        assert await bob_sees() == []
+        await client.post("/api/teams/team-b/join", headers=header_b)
+        assert await bob_sees() == ["team-skill"]
+        await assert_consistent()
+
+        members = (await client.get("/api/teams/team-b", headers=header_a)).json()["members"]
+        bob_id = next(m["user_id"] for m in members if m["username"] == "bob")
+        await client.delete(f"/api/teams/team-b/members/{bob_id}", headers=header_a)
+        assert await bob_sees() == []
+        await client.post("/api/teams/team-a/leave", headers=header_b)
+        await client.delete("/api/skills/team-skill", headers=header_a)
+        await assert_consistent()
+
+        # The checker reports drift, and rebuild repairs it.
+        await client.post("/api/skills", json={
+            "name": "drift-skill", "display_name": "Drift", "visibility": "team", "team_ids": [team_a],
+        }, headers=header_a)
+        async with TestSession() as db:
+            await db.execute(text("DELETE FROM user_visible_skills"))
+            await db.commit()
+            report = await visible_skills.check(db)
+            assert not report["consistent"] and len(report["missing"]) == 1 and report["extra"] == []
+            assert await visible_skills.rebuild(db) == 1
+            await db.commit()
+        await assert_consistent()
+
 
 # ============================================================
 # 10. 订阅测试
@@ -13,14 +13,39 @@ api.interceptors.request.use((config) => {
   return config
 })
 
+// Concurrent 401s share one refresh request
+let refreshing = null
+
+function refreshTokens(auth) {
+  if (!refreshing) {
+    refreshing = api
+      .post('/auth/refresh', { refresh_token: auth.refreshToken })
+      .then((res) => auth.setToken(res.data.access_token, res.data.refresh_token))
+      .finally(() => {
+        refreshing = null
+      })
+  }
+  return refreshing
+}
+
 api.interceptors.response.use(
   (res) => res,
-  (err) => {
+  async (err) => {
     if (err.response?.status === 401) {
       const url = err.config?.url || ''
       // Don't redirect on login/register failures — let the page show the error
-      if (!url.includes('/auth/login') && !url.includes('/auth/register')) {
+      if (!url.includes('/auth/login') && !url.includes('/auth/register') && !url.includes('/auth/refresh')) {
         const auth = useAuthStore()
+        // Short-lived access tokens (JWT_STATELESS): refresh once and retry the request
+        if (auth.refreshToken && !err.config._retried) {
+          try {
+            await refreshTokens(auth)
+            err.config._retried = true
+            return api(err.config)
+          } catch {
+            // fall through to logout
+          }
+        }
         auth.logout()
         window.location.href = '/login'
       }
@@ -33,6 +58,7 @@ api.interceptors.response.use(
 export const login = (data) => api.post('/auth/login', data)
 export const register = (data) => api.post('/auth/register', data)
 export const getMe = () => api.get('/auth/me')
+export const logout = (data) => api.post('/auth/logout', data)
 
 // Skills
 export const getSkills = (params) => api.get('/skills', { params })
@@ -45,7 +71,7 @@ export const unsubscribeSkill = (name) => api.delete(`/skills/${name}/subscribe`
 export const getSkillEditLogs = (name, params) => api.get(`/skills/${name}/edit-logs`, { params })
 
 // Versions
-export const getVersions = (name) => api.get(`/skills/${name}/versions`)
+export const getVersions = (name, params) => api.get(`/skills/${name}/versions`, { params })
 export const getVersion = (name, ver) => api.get(`/skills/${name}/versions/${ver}`)
 export const createVersion = (name, data) => api.post(`/skills/${name}/versions`, data)
 export const parseSkillMd = (content) => api.post('/skills/parse-skill-md', { content })
@@ -1,20 +1,35 @@
 import { defineStore } from 'pinia'
 import { ref } from 'vue'
-import { getMe } from '../api'
+import { getMe, logout as revokeTokens } from '../api'
 
 export const useAuthStore = defineStore('auth', () => {
   const token = ref(localStorage.getItem('token') || '')
+  const refreshToken = ref(localStorage.getItem('refresh_token') || '')
   const user = ref(null)
 
-  function setToken(t) {
+  function setToken(t, refresh = null) {
     token.value = t
     localStorage.setItem('token', t)
+    if (refresh) {
+      refreshToken.value = refresh
+      localStorage.setItem('refresh_token', refresh)
+    }
   }
 
   function logout() {
     token.value = ''
+    refreshToken.value = ''
     user.value = null
     localStorage.removeItem('token')
+    localStorage.removeItem('refresh_token')
+  }
+
+  // Revoke the tokens server-side before dropping them; failures don't block logging out
+  async function signOut() {
+    if (token.value) {
+      await revokeTokens(refreshToken.value ? { refresh_token: refreshToken.value } : null).catch(() => {})
+    }
+    logout()
   }
 
   async function fetchUser() {
@@ -27,5 +42,5 @@ export const useAuthStore = defineStore('auth', () => {
     }
   }
 
-  return { token, user, setToken, logout, fetchUser }
+  return { token, refreshToken, user, setToken, logout, signOut, fetchUser }
 })
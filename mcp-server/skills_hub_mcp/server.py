@@ -11,6 +11,7 @@ Environment variables:
 """
 
 import argparse
+import json
 import os
 import sys
 
@@ -22,6 +23,9 @@ mcp = FastMCP("skills-hub")
 _client: httpx.AsyncClient | None = None
 _base_url: str = ""
 _api_key: str = ""
+_catalog_cache: tuple[str, dict] | None = None  # (etag, catalog)
+_skill_cache: dict[str, dict] = {}  # spec -> last resolved skill payload
+SEARCH_LIMIT = 50  # search results requested from the catalog
 
 
 def _get_client() -> httpx.AsyncClient:
@@ -35,16 +39,30 @@ def _get_client() -> httpx.AsyncClient:
     return _client
 
 
+async def _fetch_catalog() -> dict:
+    """Fetch the catalog, revalidating the cached copy with its ETag."""
+    global _catalog_cache
+    client = _get_client()
+    headers = {}
+    if _catalog_cache is not None:
+        headers["If-None-Match"] = _catalog_cache[0]
+    resp = await client.get("/api/v1/skills/catalog", headers=headers)
+    if resp.status_code == 304 and _catalog_cache is not None:
+        return _catalog_cache[1]
+    resp.raise_for_status()
+    data = resp.json()
+    etag = resp.headers.get("etag")
+    _catalog_cache = (etag, data) if etag else None
+    return data
+
+
 @mcp.tool()
 async def list_skills() -> str:
     """List all available skills from the Skills Hub catalog.
 
     Returns a formatted list of skills with their names, descriptions, versions, and tags.
     """
-    client = _get_client()
-    resp = await client.get("/api/v1/skills/catalog")
-    resp.raise_for_status()
-    data = resp.json()
+    data = await _fetch_catalog()
 
     if not data["skills"]:
         return "No skills available in the catalog."
@@ -79,25 +97,63 @@ async def get_skill(name: str, version: str | None = None) -> str:
     return f"# Skill: {data['name']} (v{data['version']})\n\n{data['content']}"
 
 
+async def _resolve_stream(client: httpx.AsyncClient, body: dict) -> dict:
+    """POST /skills/resolve in NDJSON streaming mode, collecting lines into a ResolveResponse dict."""
+    data = {"skills": [], "unchanged": [], "revoked": []}
+    async with client.stream(
+        "POST", "/api/v1/skills/resolve", json=body, headers={"Accept": "application/x-ndjson"},
+    ) as resp:
+        resp.raise_for_status()
+        if not resp.headers.get("content-type", "").startswith("application/x-ndjson"):
+            return json.loads(await resp.aread())  # server without streaming support
+        complete = False
+        async for line in resp.aiter_lines():
+            if not line:
+                continue
+            item = json.loads(line)
+            if "name" in item:
+                data["skills"].append(item)
+            else:
+                data.update(item)
+                complete = True
+    if not complete:
+        raise RuntimeError("Skill resolve stream ended before completion")
+    return data
+
+
 @mcp.tool()
 async def resolve_skills(skills: list[str]) -> str:
     """Batch resolve multiple skills by name, returning their full content.
 
     Args:
-        skills: List of skill specs, e.g. ["deploy-k8s", "code-review@1.2.0"]
+        skills: List of skill specs, e.g. ["deploy-k8s", "code-review@1.2.0", "lint-rules@^2.1"]
 
     Returns the full content of all resolved skills.
     """
     client = _get_client()
-    resp = await client.post("/api/v1/skills/resolve", json={"skills": skills})
-    resp.raise_for_status()
-    data = resp.json()
+    specs = list(dict.fromkeys(skills))
+    known = {spec: _skill_cache[spec]["version"] for spec in specs if spec in _skill_cache}
+    data = await _resolve_stream(client, {"skills": specs, "known": known})
 
-    if not data["skills"]:
+    # Delta mode: only changed specs carry content; the rest come from the local copy.
+    fresh = {}
+    for skill in data["skills"]:
+        spec = skill.get("spec") or skill["name"]
+        fresh[spec] = _skill_cache[spec] = skill
+    for spec in data.get("revoked", []):
+        _skill_cache.pop(spec, None)
+    unchanged = set(data.get("unchanged", []))
+    resolved = [
+        fresh[spec] if spec in fresh else _skill_cache[spec]
+        for spec in specs
+        if spec in fresh or (spec in unchanged and spec in _skill_cache)
+    ]
+
+    if not resolved:
         return "No skills could be resolved from the provided list."
 
     parts = []
-    for skill in data["skills"]:
+    for skill in resolved:
         header = f"# Skill: {skill['name']} (v{skill['version']})"
         parts.append(f"{header}\n\n{skill['content']}")
         if skill.get("files"):
@@ -116,19 +172,12 @@ async def search_skills(query: str) -> str:
 
     Returns matching skills from the catalog.
     """
+    # Matching (names, descriptions and tags) is done by the server.
     client = _get_client()
-    resp = await client.get("/api/v1/skills/catalog")
+    resp = await client.get("/api/v1/skills/catalog", params={"q": query, "limit": SEARCH_LIMIT})
     resp.raise_for_status()
     data = resp.json()
-
-    query_lower = query.lower()
-    matches = []
-    for skill in data["skills"]:
-        name_match = query_lower in skill["name"].lower()
-        desc_match = skill.get("description") and query_lower in skill["description"].lower()
-        tag_match = any(query_lower in t.lower() for t in skill.get("tags", []))
-        if name_match or desc_match or tag_match:
-            matches.append(skill)
+    matches = data["skills"]
 
     if not matches:
         return f"No skills found matching '{query}'."
@@ -140,6 +189,8 @@ async def search_skills(query: str) -> str:
         lines.append(f"- **{skill['name']}** v{skill['version']}{tag_str}")
         if skill.get("description"):
             lines.append(f"  {skill['description']}")
+    if data.get("next_cursor"):
+        lines.append(f"(showing the first {SEARCH_LIMIT} matches; refine the query to narrow them down)")
     return "\n".join(lines)
 
 
@@ -210,10 +210,38 @@ if [[ -z "$SKILLS_HUB_API_KEY" ]]; then
 fi
 
 # 先拿订阅目录（只返回当前可用 skills）
-CATALOG_JSON="$(curl -s --max-time 8 \
+# 本地缓存目录 + ETag：目录未变化时服务端返回 304，直接复用本地副本
+CACHE_DIR="${XDG_CACHE_HOME:-$HOME/.cache}/skills-hub"
+CACHE_ID="$(printf '%s|%s' "$SKILLS_HUB_URL" "$SKILLS_HUB_API_KEY" | cksum | cut -d' ' -f1)"
+CATALOG_CACHE="$CACHE_DIR/catalog-$CACHE_ID.json"
+ETAG_CACHE="$CACHE_DIR/catalog-$CACHE_ID.etag"
+(umask 077 && mkdir -p "$CACHE_DIR") 2>/dev/null || true
+
+ETAG_ARGS=()
+if [[ -s "$CATALOG_CACHE" && -s "$ETAG_CACHE" ]]; then
+  ETAG_ARGS=(-H "If-None-Match: $(cat "$ETAG_CACHE")")
+fi
+
+HEADERS_FILE="$(mktemp)"
+BODY_FILE="$(mktemp)"
+HTTP_CODE="$(curl -s --max-time 8 -D "$HEADERS_FILE" -o "$BODY_FILE" -w '%{http_code}' \
+  ${ETAG_ARGS[@]+"${ETAG_ARGS[@]}"} \
   -H "Authorization: Bearer $SKILLS_HUB_API_KEY" \
   "$SKILLS_HUB_URL/api/v1/skills/catalog" 2>/dev/null || true)"
 
+CATALOG_JSON=""
+if [[ "$HTTP_CODE" == "304" ]]; then
+  CATALOG_JSON="$(cat "$CATALOG_CACHE" 2>/dev/null || true)"
+elif [[ "$HTTP_CODE" == "200" ]]; then
+  CATALOG_JSON="$(cat "$BODY_FILE")"
+  NEW_ETAG="$(grep -i '^etag:' "$HEADERS_FILE" | tail -n 1 | cut -d' ' -f2- | tr -d '\r' || true)"
+  if [[ -n "$NEW_ETAG" ]]; then
+    printf '%s' "$CATALOG_JSON" > "$CATALOG_CACHE" 2>/dev/null || true
+    printf '%s' "$NEW_ETAG" > "$ETAG_CACHE" 2>/dev/null || true
+  fi
+fi
+rm -f "$HEADERS_FILE" "$BODY_FILE"
+
 AVAILABLE_SKILLS="$(echo "$CATALOG_JSON" | jq -rc '.skills // []' 2>/dev/null || echo '[]')"
 
 # 从用户消息中提取 @skill-name